@@ -0,0 +1,101 @@
+"""
+Benchmark of item search: query latency by catalog size.
+
+Generates synthetic items whose names and descriptions use a vocabulary
+with a Zipf-like word distribution, builds an `ItemRepository` and times
+every query of a fixed set of whole-word, prefix and multi-word queries.
+Also times the incremental index update of `ItemRepository.put`.
+
+Usage:
+    python benchmarks/bench_search.py --items 10000 100000 1000000
+"""
+import argparse
+import itertools
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from repository import ItemRepository
+
+
+SYLLABLES = ["ka", "lo", "mi", "ne", "ru", "sa", "to", "vi", "be", "da", "fe", "go"]
+
+
+def generate_items(count, vocabulary_size=20000, seed=0):
+    """
+    Args:
+        count (int): Number of items.
+        vocabulary_size (int): Number of distinct words.
+        seed (int): Seed of the random generator.
+
+    Returns:
+        tuple[list[dict], list[str]]: The items and the vocabulary, most frequent words first.
+    """
+    rng = random.Random(seed)
+    vocabulary = list(dict.fromkeys(
+        "".join(rng.choices(SYLLABLES, k=rng.randint(2, 4))) for _ in range(vocabulary_size * 2)
+    ))[:vocabulary_size]
+    cum_weights = list(itertools.accumulate(1 / rank for rank in range(1, len(vocabulary) + 1)))
+    items = []
+    for item_id in range(count):
+        words = rng.choices(vocabulary, cum_weights=cum_weights, k=10)
+        items.append({
+            "id": item_id,
+            "name": " ".join(words[:2]),
+            "description": " ".join(words[2:]),
+            "price": round(rng.uniform(1, 1000), 2),
+        })
+    return items, vocabulary
+
+
+def make_queries(vocabulary, rng):
+    common, mid, rare = vocabulary[:10], vocabulary[100:1000], vocabulary[5000:]
+    return {
+        "common word": [rng.choice(common) for _ in range(20)],
+        "rare word": [rng.choice(rare) for _ in range(20)],
+        "prefix": [rng.choice(mid)[:3] for _ in range(20)],
+        "two words": [f"{rng.choice(common)} {rng.choice(mid)}" for _ in range(20)],
+        "word and prefix": [f"{rng.choice(mid)} {rng.choice(mid)[:2]}" for _ in range(20)],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args()
+
+    for count in args.items:
+        items, vocabulary = generate_items(count)
+        start = time.perf_counter()
+        repository = ItemRepository(items)
+        build = time.perf_counter() - start
+        del items
+        print(f"{count} items, index built in {build:.1f} s, {len(repository.search_index.terms)} terms", flush=True)
+
+        rng = random.Random(1)
+        for kind, queries in make_queries(vocabulary, rng).items():
+            timings = []
+            for query in queries:
+                start = time.perf_counter()
+                repository.search(query, args.limit)
+                timings.append((time.perf_counter() - start) * 1000)
+            print(f"  {kind:<16} median {statistics.median(timings):8.2f} ms  max {max(timings):8.2f} ms")
+
+        updates = [
+            {"id": rng.randrange(count), "name": " ".join(rng.sample(vocabulary[:1000], 2)),
+             "description": " ".join(rng.sample(vocabulary, 8)), "price": 1.0}
+            for _ in range(200)
+        ]
+        start = time.perf_counter()
+        for item in updates:
+            repository.put(item)
+        print(f"  {'put':<16} mean   {(time.perf_counter() - start) / len(updates) * 1000:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,19 @@
-from fastapi import FastAPI, Query
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from fastapi import FastAPI, Header, HTTPException, Query, Response
+from pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, PageCache, decode_cursor, encode_cursor, etag_matches
+from repository import ItemRepository
+
+# JSON file the catalog is loaded from.
+ITEMS_FILE = os.environ.get("ITEMS_FILE", os.path.join(os.path.dirname(os.path.abspath(__file__)), "items.json"))
+
+# The catalog is loaded and indexed once, when the application starts.
+repository = ItemRepository.load(ITEMS_FILE)
+
+# Encoded pages of `GET /items`, so repeated pages are not serialized again.
+page_cache = PageCache(int(os.environ.get("PAGE_CACHE_SIZE", 1024)))
 
 app = FastAPI()
 
@@ -7,32 +22,109 @@ def read_root():
     return {"message": "Hello, World!"}
 
 @app.get("/items")
-def get_items(skip: int = Query(0), limit: int = Query(10)):
+def get_items(
+    cursor: str | None = Query(None),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    min_price: float | None = Query(None),
+    max_price: float | None = Query(None),
+    if_none_match: str | None = Header(None),
+):
     """
-    Retrieves a list of items with pagination support.
+    Retrieves a page of items with cursor pagination.
 
-    This function returns a subset of available items based on the specified 
-    skip and limit values. It allows fetching a paginated list of items to 
-    optimize data retrieval.
+    Items are returned in id order or, if a price range is given, only the
+    items within it, from the cheapest; the range is found in the price
+    index with a binary search. The `next_cursor` of a page is passed as
+    `cursor` to get the next one, and is `null` on the last page. `skip`
+    jumps over a number of items, from the start or from the cursor; it is
+    an offset into the sorted index, so it costs no more than a cursor.
+
+    Pages are encoded to JSON once per catalog version and served from
+    `page_cache` afterwards. The response carries an `ETag`; a request
+    whose `If-None-Match` matches it gets `304 Not Modified`.
 
     Parameters:
-        skip (int, optional): The number of initial items to skip. Defaults to 0.
-        limit (int, optional): The maximum number of items to return. Defaults to 10.
+        cursor (str, optional): The `next_cursor` of the previous page.
+        skip (int, optional): The number of items to skip. Defaults to 0.
+        limit (int, optional): The maximum number of items to return. Defaults to 10, at most 100.
+        min_price (float, optional): Lowest price of the returned items, inclusive.
+        max_price (float, optional): Highest price of the returned items, inclusive.
+        if_none_match (str, optional): Entity tags the client already has.
 
     Returns:
-        dict: A dictionary containing the paginated list of items.
+        Response: A JSON object with `items`, the `total` number of matching
+        items and `next_cursor`.
 
     Example:
+        Requesting `get_items(limit=2)` would return the first and second items.
         Requesting `get_items(skip=1, limit=2)` would return the second and third items.
+        Requesting `get_items(min_price=5, max_price=50)` would return items 2, 1 and 5.
+
+    Raises:
+        HTTPException: If the cursor is not valid.
+    """
+    by_price = min_price is not None or max_price is not None
+    after = None if cursor is None else decode_cursor(cursor, 2 if by_price else 1)
+
+    def render():
+        if by_price:
+            items = repository.by_price(min_price, max_price, after, limit, skip)
+            total = repository.count_by_price(min_price, max_price)
+        else:
+            items = repository.page(None if after is None else after[0], limit, skip)
+            total = len(repository)
+        next_cursor = None
+        if len(items) == limit:
+            last = items[-1]
+            next_cursor = encode_cursor([last.price, last.id] if by_price else [last.id])
+        return {"items": [item.to_dict() for item in items], "total": total, "next_cursor": next_cursor}
+
+    body, etag = page_cache.get_or_render(
+        repository.version, (cursor, skip, limit, min_price, max_price), render,
+    )
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    return Response(content=body, media_type="application/json", headers={"ETag": etag})
+
+@app.get("/items/search")
+def search_items(q: str = Query(..., min_length=1), limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE)):
+    """
+    Searches items by name and description.
+
+    Every word of the query must be found in the name or description of an
+    item, whole or as the start of a word, case-insensitively. Items are
+    ranked by relevance: rare words, whole words and words of the name
+    count more.
+
+    Parameters:
+        q (str): The query.
+        limit (int, optional): The maximum number of items to return. Defaults to 10, at most 100.
+
+    Returns:
+        dict: The best matching `items` and the `total` number of matching items.
+
+    Example:
+        Requesting `search_items(q="rare")` would return item 3.
+    """
+    items, total = repository.search(q, limit)
+    return {"items": [item.to_dict() for item in items], "total": total}
+
+@app.get("/items/{item_id}")
+def get_item(item_id: int):
+    """
+    Retrieves a single item by its id.
+
+    Parameters:
+        item_id (int): The id of the item.
+
+    Returns:
+        dict: The item.
 
     Raises:
-        No exceptions are explicitly raised in this function.
+        HTTPException: If there is no item with this id.
     """
-    all_items = [
-        {"id": 1, "name": "item1", "description": "A fancy item", "price": 10.99},
-        {"id": 2, "name": "item2", "description": "A useful item", "price": 5.49},
-        {"id": 3, "name": "item3", "description": "A rare item", "price": 99.99},
-        {"id": 4, "name": "item4", "description": "A common item", "price": 1.99},
-        {"id": 5, "name": "item5", "description": "A premium item", "price": 49.99},
-    ]
-    return {"items": all_items[skip : skip + limit]}
+    item = repository.get(item_id)
+    if item is None:
+        raise HTTPException(status_code=404, detail="Item not found")
+    return item.to_dict()
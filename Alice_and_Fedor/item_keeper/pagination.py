@@ -0,0 +1,124 @@
+import base64
+import binascii
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+from fastapi import HTTPException
+
+
+# Page size used when the client does not ask for one.
+DEFAULT_PAGE_SIZE = 10
+
+# Largest page size a client can ask for.
+MAX_PAGE_SIZE = 100
+
+
+def encode_cursor(key):
+    """
+    Encodes the sort key of the last item of a page as an opaque cursor.
+
+    Parameters:
+        key (list): The sort key, such as `[id]` or `[price, id]`.
+
+    Returns:
+        str: The cursor.
+    """
+    return base64.urlsafe_b64encode(json.dumps(key, separators=(",", ":")).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor, length):
+    """
+    Decodes a cursor made by `encode_cursor`.
+
+    Parameters:
+        cursor (str): The cursor.
+        length (int): Expected number of values of the sort key.
+
+    Returns:
+        list: The sort key.
+
+    Raises:
+        HTTPException: If the cursor is not valid.
+    """
+    try:
+        key = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (binascii.Error, ValueError):
+        key = None
+    if (
+        not isinstance(key, list) or len(key) != length
+        or not all(isinstance(value, (int, float)) and not isinstance(value, bool) for value in key)
+    ):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return key
+
+
+def etag_matches(if_none_match, etag):
+    """
+    Checks an `If-None-Match` header against an entity tag.
+
+    Parameters:
+        if_none_match (str | None): The header value.
+        etag (str): The entity tag of the current content.
+
+    Returns:
+        bool: Whether the client already has the current content.
+    """
+    if not if_none_match:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or etag in tags or f"W/{etag}" in tags
+
+
+class PageCache:
+    """
+    LRU cache of encoded JSON pages and their entity tags.
+
+    Entries are only valid for the catalog version they were encoded from:
+    when the version changes, the whole cache is dropped on the next access.
+    """
+    def __init__(self, max_entries=1024):
+        """
+        Parameters:
+            max_entries (int): Maximum number of cached pages.
+        """
+        self.max_entries = max_entries
+        self.version = None
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_render(self, version, key, render):
+        """
+        Returns a cached page, encoding it with `render` on a miss.
+
+        Parameters:
+            version (int): Current catalog version.
+            key (tuple): Identifies the page within the version.
+            render (Callable[[], dict]): Builds the page content.
+
+        Returns:
+            tuple[bytes, str]: The JSON body and its entity tag.
+        """
+        with self._lock:
+            if version != self.version:
+                self._entries.clear()
+                self.version = version
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+            self.misses += 1
+
+        body = json.dumps(render(), separators=(",", ":")).encode()
+        entry = (body, f'"{hashlib.sha256(body).hexdigest()[:32]}"')
+
+        with self._lock:
+            if version == self.version:
+                self._entries[key] = entry
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return entry
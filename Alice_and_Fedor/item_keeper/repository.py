@@ -0,0 +1,245 @@
+import json
+from array import array
+from bisect import bisect_left, bisect_right
+
+from search import SearchIndex
+
+
+class Item:
+    """
+    A catalog item.
+
+    Attributes:
+        id (int): Unique identifier of the item.
+        name (str): Name of the item.
+        description (str): Description of the item.
+        price (float): Price of the item.
+    """
+    __slots__ = ("id", "name", "description", "price")
+
+    def __init__(self, id, name, description, price):
+        self.id = id
+        self.name = name
+        self.description = description
+        self.price = price
+
+    def to_dict(self):
+        """
+        Returns:
+            dict: The item as a JSON-serializable dictionary.
+        """
+        return {"id": self.id, "name": self.name, "description": self.description, "price": self.price}
+
+
+class ItemRepository:
+    """
+    In-memory catalog of items, loaded once and indexed by id and by price.
+
+    Items are stored column by column, in id order: ids and prices in typed
+    arrays, names and descriptions in lists. `Item` objects are only built
+    for the items a request returns.
+
+    Two indexes answer lookups with a binary search instead of a scan:
+
+    - the sorted `ids` array, for lookups by id;
+    - `sorted_prices`, the prices in increasing order, with the matching
+      ids in `price_ids`, for price ranges.
+
+    `search_index` is an inverted index of names and descriptions. `put`
+    and `remove` update all indexes in place and increase `version`.
+    """
+    def __init__(self, items=()):
+        """
+        Parameters:
+            items (Iterable[dict]): Items with `id`, `name`, `description` and `price`.
+
+        Raises:
+            ValueError: If two items have the same id.
+        """
+        items = sorted(items, key=lambda item: item["id"])
+        self.ids = array("q", (item["id"] for item in items))
+        self.prices = array("d", (item["price"] for item in items))
+        self.names = [item["name"] for item in items]
+        self.descriptions = [item["description"] for item in items]
+        for position in range(1, len(self.ids)):
+            if self.ids[position] == self.ids[position - 1]:
+                raise ValueError(f"Duplicate item id {self.ids[position]}")
+        self._build_price_index()
+        self.search_index = SearchIndex(zip(self.ids, self.names, self.descriptions))
+        # Changes whenever the catalog changes, for caches of its content.
+        self.version = 1
+
+    @classmethod
+    def load(cls, path):
+        """
+        Loads a catalog from a JSON file with a list of items.
+
+        Parameters:
+            path (str): Path of the JSON file.
+
+        Returns:
+            ItemRepository: The loaded catalog.
+        """
+        with open(path, encoding="utf-8") as file:
+            return cls(json.load(file))
+
+    def _build_price_index(self):
+        order = sorted(range(len(self.ids)), key=self.prices.__getitem__)
+        self.price_ids = array("q", (self.ids[position] for position in order))
+        self.sorted_prices = array("d", (self.prices[position] for position in order))
+
+    def _price_position(self, price, item_id):
+        # Items with the same price are in id order.
+        low = bisect_left(self.sorted_prices, price)
+        high = bisect_right(self.sorted_prices, price, low)
+        return bisect_left(self.price_ids, item_id, low, high)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _item(self, position):
+        return Item(self.ids[position], self.names[position], self.descriptions[position], self.prices[position])
+
+    def get(self, item_id):
+        """
+        Finds an item by id in O(log n).
+
+        Parameters:
+            item_id (int): The id.
+
+        Returns:
+            Item | None: The item, or `None` if there is none with this id.
+        """
+        position = bisect_left(self.ids, item_id)
+        if position < len(self.ids) and self.ids[position] == item_id:
+            return self._item(position)
+        return None
+
+    def page(self, after_id=None, limit=10, skip=0):
+        """
+        Returns items in id order, starting after an id.
+
+        Parameters:
+            after_id (int, optional): Id of the last item of the previous page.
+            limit (int): Maximum number of items.
+            skip (int): Number of items to skip after `after_id`, or from the start.
+
+        Returns:
+            list[Item]: The items.
+        """
+        start = (0 if after_id is None else bisect_right(self.ids, after_id)) + skip
+        return [self._item(position) for position in range(start, min(len(self.ids), start + limit))]
+
+    def _price_range(self, min_price, max_price):
+        low = 0 if min_price is None else bisect_left(self.sorted_prices, min_price)
+        high = len(self.sorted_prices) if max_price is None else bisect_right(self.sorted_prices, max_price)
+        return low, max(low, high)
+
+    def count_by_price(self, min_price=None, max_price=None):
+        """
+        Counts items with a price in a range in O(log n).
+
+        Parameters:
+            min_price (float, optional): Lowest price, inclusive.
+            max_price (float, optional): Highest price, inclusive.
+
+        Returns:
+            int: The number of matching items.
+        """
+        low, high = self._price_range(min_price, max_price)
+        return high - low
+
+    def by_price(self, min_price=None, max_price=None, after=None, limit=10, skip=0):
+        """
+        Returns items with a price in a range, from the cheapest.
+
+        Items with the same price are in id order. The range is found with
+        two binary searches in O(log n); only the returned items are read.
+
+        Parameters:
+            min_price (float, optional): Lowest price, inclusive.
+            max_price (float, optional): Highest price, inclusive.
+            after (tuple[float, int], optional): Price and id of the last item of the previous page.
+            limit (int): Maximum number of items.
+            skip (int): Number of matching items to skip after `after`, or from the cheapest.
+
+        Returns:
+            list[Item]: The matching items.
+        """
+        low, high = self._price_range(min_price, max_price)
+        start = low
+        if after is not None:
+            price, item_id = after
+            start = bisect_left(self.sorted_prices, price, low, high)
+            # Items with the same price as the last one are in id order.
+            start = bisect_right(self.price_ids, item_id, start, bisect_right(self.sorted_prices, price, start, high))
+        start += skip
+        return [self.get(self.price_ids[index]) for index in range(start, min(high, start + limit))]
+
+    def search(self, query, limit=10):
+        """
+        Finds the items whose name or description match a query, best first.
+
+        Parameters:
+            query (str): The query; see `SearchIndex`.
+            limit (int): Maximum number of items.
+
+        Returns:
+            tuple[list[Item], int]: The best matching items and the number of matching items.
+        """
+        matches, total = self.search_index.search(query, limit)
+        return [self.get(item_id) for item_id, _ in matches], total
+
+    def put(self, item):
+        """
+        Adds an item, or replaces the item with the same id.
+
+        Parameters:
+            item (dict): The item, with `id`, `name`, `description` and `price`.
+        """
+        item_id = item["id"]
+        position = bisect_left(self.ids, item_id)
+        if position < len(self.ids) and self.ids[position] == item_id:
+            self._unindex(position)
+            self.prices[position] = item["price"]
+            self.names[position] = item["name"]
+            self.descriptions[position] = item["description"]
+        else:
+            self.ids.insert(position, item_id)
+            self.prices.insert(position, item["price"])
+            self.names.insert(position, item["name"])
+            self.descriptions.insert(position, item["description"])
+        price_position = self._price_position(item["price"], item_id)
+        self.sorted_prices.insert(price_position, item["price"])
+        self.price_ids.insert(price_position, item_id)
+        self.search_index.add(item_id, item["name"], item["description"])
+        self.version += 1
+
+    def remove(self, item_id):
+        """
+        Removes an item.
+
+        Parameters:
+            item_id (int): The id of the item.
+
+        Returns:
+            bool: Whether there was an item with this id.
+        """
+        position = bisect_left(self.ids, item_id)
+        if position == len(self.ids) or self.ids[position] != item_id:
+            return False
+        self._unindex(position)
+        del self.ids[position]
+        del self.prices[position]
+        del self.names[position]
+        del self.descriptions[position]
+        self.version += 1
+        return True
+
+    def _unindex(self, position):
+        # Removes the item at `position` from the price and search indexes.
+        item_id = self.ids[position]
+        price_position = self._price_position(self.prices[position], item_id)
+        del self.sorted_prices[price_position]
+        del self.price_ids[price_position]
+        self.search_index.remove(item_id, self.names[position], self.descriptions[position])
@@ -0,0 +1,167 @@
+import heapq
+import math
+import re
+from bisect import bisect_left, insort
+
+
+# Weight of a token found in the name of an item; description tokens weigh 1.
+NAME_WEIGHT = 3
+
+# Score factor of a token that only matches a query token as a prefix.
+PREFIX_FACTOR = 0.5
+
+# Maximum number of index terms a query token expands to as a prefix.
+MAX_PREFIX_TERMS = 64
+
+_TOKEN = re.compile(r"\w+")
+
+
+def tokenize(text):
+    """
+    Splits text into lowercase word tokens.
+
+    Parameters:
+        text (str): The text.
+
+    Returns:
+        list[str]: The tokens, in order.
+    """
+    return _TOKEN.findall(text.lower())
+
+
+def _weights(name, description):
+    weights = {}
+    for token in tokenize(name):
+        weights[token] = weights.get(token, 0) + NAME_WEIGHT
+    for token in tokenize(description):
+        weights[token] = weights.get(token, 0) + 1
+    return weights
+
+
+class SearchIndex:
+    """
+    Inverted index over the names and descriptions of items.
+
+    Every token maps to the ids of the items that contain it, with the
+    weight of the token in the item. A sorted list of all tokens finds the
+    tokens that start with a prefix with a binary search.
+
+    Every query token must match a token of an item, either whole or as a
+    prefix. An item's score sums, for every query token, the best weight of
+    its matching tokens, multiplied by their inverse document frequency;
+    prefix matches count for `PREFIX_FACTOR` of a whole match.
+    """
+    def __init__(self, items=()):
+        """
+        Parameters:
+            items (Iterable[tuple[int, str, str]]): Ids, names and descriptions of items to index.
+        """
+        self.postings = {}
+        self.size = 0
+        for item_id, name, description in items:
+            for token, weight in _weights(name, description).items():
+                self.postings.setdefault(token, {})[item_id] = weight
+            self.size += 1
+        self.terms = sorted(self.postings)
+
+    def add(self, item_id, name, description):
+        """
+        Indexes an item.
+
+        Parameters:
+            item_id (int): The id of the item; must not be indexed yet.
+            name (str): The name of the item.
+            description (str): The description of the item.
+        """
+        for token, weight in _weights(name, description).items():
+            posting = self.postings.get(token)
+            if posting is None:
+                posting = self.postings[token] = {}
+                insort(self.terms, token)
+            posting[item_id] = weight
+        self.size += 1
+
+    def remove(self, item_id, name, description):
+        """
+        Removes an item, given the name and description it was indexed with.
+
+        Parameters:
+            item_id (int): The id of the item.
+            name (str): The indexed name of the item.
+            description (str): The indexed description of the item.
+        """
+        for token in _weights(name, description):
+            posting = self.postings[token]
+            del posting[item_id]
+            if not posting:
+                del self.postings[token]
+                del self.terms[bisect_left(self.terms, token)]
+        self.size -= 1
+
+    def _expand(self, token):
+        """
+        Finds the postings of the index terms a query token matches.
+
+        Returns:
+            list[tuple[dict[int, int], float]]: Postings of the matching terms
+            with the score factor of their weights.
+        """
+        start = bisect_left(self.terms, token)
+        end = bisect_left(self.terms, token + "\uffff", start)
+        matches = self.terms[start:end]
+        if len(matches) > MAX_PREFIX_TERMS:
+            # Keep the terms found in the most items.
+            matches = heapq.nlargest(MAX_PREFIX_TERMS, matches, key=lambda term: len(self.postings[term]))
+        expansion = []
+        for term in matches:
+            posting = self.postings[term]
+            idf = math.log(1 + self.size / len(posting))
+            expansion.append((posting, idf if term == token else idf * PREFIX_FACTOR))
+        return expansion
+
+    def search(self, query, limit=10):
+        """
+        Finds the items that match a query, best first.
+
+        Only the items of the query token with the fewest matches are
+        scored in full; the other tokens are looked up for those items.
+
+        Parameters:
+            query (str): The query.
+            limit (int): Maximum number of results.
+
+        Returns:
+            tuple[list[tuple[int, float]], int]: Ids and scores of the best
+            matches, in order of decreasing score and then id, and the number
+            of matching items.
+        """
+        tokens = list(dict.fromkeys(tokenize(query)))
+        if not tokens:
+            return [], 0
+        expansions = sorted(
+            (self._expand(token) for token in tokens),
+            key=lambda expansion: sum(len(posting) for posting, _ in expansion),
+        )
+
+        if len(expansions[0]) == 1:
+            posting, factor = expansions[0][0]
+            scores = {item_id: weight * factor for item_id, weight in posting.items()}
+        else:
+            scores = {}
+            for posting, factor in expansions[0]:
+                for item_id, weight in posting.items():
+                    score = weight * factor
+                    if score > scores.get(item_id, 0):
+                        scores[item_id] = score
+        for expansion in expansions[1:]:
+            matched = {}
+            for item_id, score in scores.items():
+                best = max((posting.get(item_id, 0) * factor for posting, factor in expansion), default=0)
+                if best:
+                    matched[item_id] = score + best
+            scores = matched
+            if not scores:
+                break
+
+        best = heapq.nsmallest(limit, scores.items(), key=lambda entry: (-entry[1], entry[0]))
+        return best, len(scores)
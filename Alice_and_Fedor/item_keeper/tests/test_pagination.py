@@ -0,0 +1,148 @@
+import os
+import sys
+from fastapi.testclient import TestClient
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from fastapi import HTTPException
+from main import app, repository
+from pagination import PageCache, decode_cursor, encode_cursor
+from repository import ItemRepository
+
+client = TestClient(app)
+
+
+def ids(items):
+    return [item.id for item in items]
+
+
+def test_cursor_round_trip():
+    """
+    Tests that cursors decode to the key they were built from.
+
+    Test Steps:
+        1. Encode id and price keys and decode them again.
+        2. Assert that malformed cursors and keys of the wrong length are rejected.
+
+    Expected Result:
+        The decoded keys equal the encoded ones; invalid cursors raise a 400 error.
+    """
+    for key in ([1], [5.49, 2], [0, 10 ** 12]):
+        assert decode_cursor(encode_cursor(key), len(key)) == key
+    for cursor, length in (("not a cursor", 1), (encode_cursor([1]), 2), (encode_cursor(["a"]), 1)):
+        try:
+            decode_cursor(cursor, length)
+            assert False, "The cursor should be rejected"
+        except HTTPException as error:
+            assert error.status_code == 400
+
+
+def test_price_order_with_ties():
+    """
+    Tests that price pages follow the price and then the id, across equal prices.
+
+    Test Steps:
+        1. Build a repository where several items share a price.
+        2. Page through a price range two items at a time.
+
+    Expected Result:
+        Items with equal prices are returned in id order, each exactly once.
+    """
+    prices = {1: 5.0, 2: 1.0, 3: 5.0, 4: 5.0, 5: 9.0, 6: 5.0, 7: 20.0}
+    repository = ItemRepository(
+        {"id": item_id, "name": f"item{item_id}", "description": "", "price": price}
+        for item_id, price in prices.items()
+    )
+    pages = []
+    after = None
+    while True:
+        page = repository.by_price(2.0, 10.0, after, 2)
+        if not page:
+            break
+        pages.append(ids(page))
+        after = (page[-1].price, page[-1].id)
+
+    assert pages == [[1, 3], [4, 6], [5]]
+    assert repository.count_by_price(2.0, 10.0) == 5
+    assert ids(repository.by_price(2.0, 10.0, skip=3, limit=10)) == [6, 5]
+
+
+def test_items_pages_and_skip():
+    """
+    Tests cursor pagination and `skip` on `/items`.
+
+    Test Steps:
+        1. Follow `next_cursor` through the catalog two items at a time.
+        2. Request a page with `skip` from the start and from a cursor.
+
+    Expected API Response:
+        Items 1-5 in pages of 2, 2 and 1; `skip=2` starts at item 3.
+    """
+    pages = []
+    params = {"limit": 2}
+    while True:
+        page = client.get("/items", params=params).json()
+        pages.append([item["id"] for item in page["items"]])
+        if page["next_cursor"] is None:
+            break
+        params["cursor"] = page["next_cursor"]
+    assert pages == [[1, 2], [3, 4], [5]]
+
+    assert [item["id"] for item in client.get("/items?skip=2&limit=2").json()["items"]] == [3, 4]
+    cursor = client.get("/items?limit=1").json()["next_cursor"]
+    response = client.get("/items", params={"cursor": cursor, "skip": 1, "limit": 2}).json()
+    assert [item["id"] for item in response["items"]] == [3, 4]
+    assert client.get("/items?skip=-1").status_code == 422
+
+
+def test_etag_and_cache_invalidation():
+    """
+    Tests conditional requests and cache invalidation after a write.
+
+    Test Steps:
+        1. Request a page and repeat the request with its `ETag` in `If-None-Match`.
+        2. Change an item of the page through the repository.
+        3. Repeat the conditional request.
+
+    Expected API Response:
+        304 before the change; 200 with the new price and a new `ETag` after it.
+    """
+    response = client.get("/items?limit=2")
+    etag = response.headers["ETag"]
+    assert client.get("/items?limit=2", headers={"If-None-Match": etag}).status_code == 304
+
+    original = repository.get(2).to_dict()
+    repository.put(dict(original, price=6.0))
+    try:
+        response = client.get("/items?limit=2", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.headers["ETag"] != etag
+        assert response.json()["items"][1]["price"] == 6.0
+    finally:
+        repository.put(original)
+
+
+def test_page_cache_eviction():
+    """
+    Tests the LRU eviction and version check of `PageCache`.
+
+    Test Steps:
+        1. Render three pages into a cache of two entries.
+        2. Render the first page again in the same and in a new version.
+
+    Expected Result:
+        The oldest page is evicted, and a new version renders every page again.
+    """
+    cache = PageCache(max_entries=2)
+    renders = []
+
+    def render(key):
+        return lambda: renders.append(key) or {"page": key}
+
+    for key in ("a", "b", "c", "a"):
+        cache.get_or_render(1, key, render(key))
+    cache.get_or_render(1, "c", render("c"))
+    cache.get_or_render(2, "c", render("c"))
+
+    assert renders == ["a", "b", "c", "a", "c"]
+    assert (cache.hits, cache.misses) == (1, 5)
@@ -0,0 +1,73 @@
+import os
+import sys
+from fastapi.testclient import TestClient
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from main import app
+from repository import ItemRepository
+
+client = TestClient(app)
+
+ITEMS = [
+    {"id": 3, "name": "item3", "description": "A rare item", "price": 99.99},
+    {"id": 1, "name": "item1", "description": "A fancy item", "price": 10.99},
+    {"id": 2, "name": "item2", "description": "A useful item", "price": 5.49},
+]
+
+
+def test_get_by_id():
+    """
+    Tests lookups by id in the repository and on `/items/{item_id}`.
+
+    Test Steps:
+        1. Build a repository from unsorted items and look items up by id.
+        2. Assert that duplicate ids are rejected.
+        3. Request an existing and a missing item from the API.
+
+    Expected API Response:
+        {"id": 1, "name": "item1", "description": "A fancy item", "price": 10.99}
+    """
+    repository = ItemRepository(ITEMS)
+    assert list(repository.ids) == [1, 2, 3]
+    assert repository.get(2).to_dict() == ITEMS[2]
+    assert repository.get(4) is None
+    try:
+        ItemRepository(ITEMS + [ITEMS[0]])
+        assert False, "Duplicate ids should be rejected"
+    except ValueError:
+        pass
+
+    response = client.get("/items/1")
+    assert response.status_code == 200
+    assert response.json() == {"id": 1, "name": "item1", "description": "A fancy item", "price": 10.99}
+    assert client.get("/items/999").status_code == 404
+
+
+def test_put_and_remove_keep_indexes_consistent():
+    """
+    Tests that `put` and `remove` update the id and price indexes in place.
+
+    Test Steps:
+        1. Add an item, replace one with a new price and remove another.
+        2. Compare the indexes with those of a repository built from the final items.
+        3. Assert that every change increased `version`.
+
+    Expected Result:
+        The updated repository equals one built from scratch.
+    """
+    repository = ItemRepository(ITEMS)
+    repository.put({"id": 5, "name": "item5", "description": "A premium item", "price": 49.99})
+    repository.put({"id": 1, "name": "item1", "description": "A fancy item", "price": 1.0})
+    assert repository.remove(3)
+    assert not repository.remove(3)
+
+    expected = ItemRepository([
+        {"id": 1, "name": "item1", "description": "A fancy item", "price": 1.0},
+        ITEMS[2],
+        {"id": 5, "name": "item5", "description": "A premium item", "price": 49.99},
+    ])
+    assert list(repository.ids) == list(expected.ids)
+    assert list(repository.price_ids) == list(expected.price_ids) == [1, 2, 5]
+    assert list(repository.sorted_prices) == list(expected.sorted_prices)
+    assert repository.version == 4
@@ -0,0 +1,110 @@
+import math
+import os
+import sys
+from fastapi.testclient import TestClient
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from main import app
+from search import NAME_WEIGHT, PREFIX_FACTOR, SearchIndex, tokenize
+
+client = TestClient(app)
+
+ITEMS = [
+    (1, "Red lamp", "A lamp for the desk"),
+    (2, "Desk", "A red oak desk"),
+    (3, "Lampshade", "Fits any lamp"),
+    (4, "Chair", "A red chair"),
+]
+
+
+def test_ranking():
+    """
+    Tests that name matches and rare words rank higher.
+
+    Test Steps:
+        1. Index four items and search for words found in names and descriptions.
+        2. Compare the scores with the documented formula.
+
+    Expected Result:
+        Items that have the word in their name come first; ties are in id order.
+    """
+    index = SearchIndex(ITEMS)
+    results, total = index.search("desk")
+    assert [item_id for item_id, _ in results] == [2, 1] and total == 2
+
+    idf = math.log(1 + 4 / 2)
+    assert results[0][1] == (NAME_WEIGHT + 1) * idf
+    assert results[1][1] == 1 * idf
+
+    results, total = index.search("red", limit=2)
+    assert [item_id for item_id, _ in results] == [1, 2] and total == 3
+
+
+def test_prefix_and_all_tokens_match():
+    """
+    Tests prefix matching and that every query token must match.
+
+    Test Steps:
+        1. Search for a prefix of indexed words.
+        2. Search for two words that only one item has both of.
+        3. Search for a word that no item has.
+
+    Expected Result:
+        Prefix matches count `PREFIX_FACTOR` of a whole match; items missing
+        a query token are left out.
+    """
+    index = SearchIndex(ITEMS)
+    results, total = index.search("lam")
+    assert total == 2
+    assert {item_id for item_id, _ in results} == {1, 3}
+    assert dict(index.search("lamp")[0])[1] > dict(results)[1]
+    assert dict(results)[3] == NAME_WEIGHT * math.log(1 + 4 / 1) * PREFIX_FACTOR
+
+    assert [item_id for item_id, _ in index.search("RED desk")[0]] == [2, 1]
+    assert index.search("red sofa") == ([], 0)
+    assert index.search("...") == ([], 0)
+    assert tokenize("Red-oak, DESK!") == ["red", "oak", "desk"]
+
+
+def test_index_updates():
+    """
+    Tests that added and removed items are found or left out of results.
+
+    Test Steps:
+        1. Add an item with a new word and search for it by prefix.
+        2. Remove it and the only item with another word.
+
+    Expected Result:
+        Removed words leave the sorted term list.
+    """
+    index = SearchIndex(ITEMS)
+    index.add(5, "Sofa", "A red sofa")
+    results, total = index.search("so")
+    assert [item_id for item_id, _ in results] == [5] and total == 1
+    assert index.search("red")[1] == 4
+
+    index.remove(5, "Sofa", "A red sofa")
+    index.remove(4, "Chair", "A red chair")
+    assert index.search("sofa") == ([], 0)
+    assert "chair" not in index.terms and "sofa" not in index.terms
+    assert index.terms == sorted(index.postings)
+
+
+def test_search_endpoint():
+    """
+    Tests the `/items/search` endpoint.
+
+    Test Steps:
+        1. Search the catalog for a word of one description and for a prefix.
+        2. Assert that an empty query is rejected.
+
+    Expected API Response:
+        {"items": [{"id": 3, "name": "item3", "description": "A rare item", "price": 99.99}], "total": 1}
+    """
+    response = client.get("/items/search?q=rare")
+    assert response.json() == {
+        "items": [{"id": 3, "name": "item3", "description": "A rare item", "price": 99.99}], "total": 1,
+    }
+    assert client.get("/items/search?q=item&limit=2").json()["total"] == 5
+    assert client.get("/items/search?q=").status_code == 422
@@ -0,0 +1,156 @@
+import hashlib
+import os
+import tempfile
+
+
+# Directory of the content-addressed store for uploaded files.
+BLOB_STORE_DIR = os.environ.get("BLOB_STORE_DIR", "./blobs")
+
+# Size of the chunks in which uploads are read and written.
+CHUNK_SIZE = 1024 * 1024
+
+
+class BlobWriter:
+    """
+    Writes one blob chunk by chunk while computing its SHA-256 hash.
+
+    Data goes to a temporary file first; `commit` moves it to its final
+    content-addressed location. Only the current chunk is ever held in memory.
+
+    Attributes:
+        size (int): Number of bytes written so far.
+        sha256 (str): Hex digest, available after `commit`.
+        temp_path (str): Temporary file holding the data until `commit`.
+    """
+    def __init__(self, store):
+        self.store = store
+        self.size = 0
+        self.sha256 = None
+        self._hash = hashlib.sha256()
+        fd, self.temp_path = tempfile.mkstemp(dir=store.temp_dir)
+        self._file = os.fdopen(fd, "wb")
+
+    def write(self, chunk):
+        """
+        Appends a chunk of data.
+
+        Args:
+            chunk (bytes): The data to append.
+        """
+        self._file.write(chunk)
+        self._hash.update(chunk)
+        self.size += len(chunk)
+
+    def flush(self):
+        """
+        Writes buffered data to the temporary file, so it can be read from
+        `temp_path` before `commit`.
+        """
+        self._file.flush()
+
+    def commit(self, expected_sha256=None):
+        """
+        Finishes the blob and moves it into the store.
+
+        If a blob with the same content already exists, the new copy is discarded.
+
+        Args:
+            expected_sha256 (str, optional): Digest the content must have.
+
+        Raises:
+            ValueError: If the digest is not `expected_sha256`; the blob is discarded.
+
+        Returns:
+            str: Hex SHA-256 digest of the blob, which is also its key.
+        """
+        self._file.close()
+        self.sha256 = self._hash.hexdigest()
+        if expected_sha256 is not None and self.sha256 != expected_sha256.lower():
+            os.remove(self.temp_path)
+            raise ValueError(f"SHA-256 of the content is {self.sha256}, expected {expected_sha256}")
+        path = self.store.path(self.sha256)
+        if os.path.exists(path):
+            os.remove(self.temp_path)
+        else:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.replace(self.temp_path, path)
+        return self.sha256
+
+    def abort(self):
+        """
+        Discards the partially written blob.
+        """
+        self._file.close()
+        if os.path.exists(self.temp_path):
+            os.remove(self.temp_path)
+
+
+class BlobStore:
+    """
+    Content-addressed file store on local disk.
+
+    Every blob is stored under its SHA-256 digest as `<dir>/ab/cd/abcd...`,
+    so identical uploads are stored once.
+    """
+    def __init__(self, directory=BLOB_STORE_DIR):
+        """
+        Args:
+            directory (str): Root directory of the store.
+        """
+        self.directory = directory
+        self.temp_dir = os.path.join(directory, "tmp")
+        os.makedirs(self.temp_dir, exist_ok=True)
+
+    def path(self, sha256):
+        """
+        Returns:
+            str: Location of the blob with the given digest.
+        """
+        return os.path.join(self.directory, sha256[:2], sha256[2:4], sha256)
+
+    def writer(self):
+        """
+        Returns:
+            BlobWriter: Writer for a new blob.
+        """
+        return BlobWriter(self)
+
+    def open(self, sha256):
+        """
+        Opens a stored blob for reading.
+
+        Returns:
+            BinaryIO: The blob file opened in binary mode.
+        """
+        return open(self.path(sha256), "rb")
+
+    def read_text(self, sha256, encoding="utf-8"):
+        """
+        Reads a whole blob as text.
+
+        Returns:
+            str: The decoded content.
+        """
+        with self.open(sha256) as blob:
+            return blob.read().decode(encoding)
+
+
+blob_store = BlobStore()
+
+
+def load_csv_content(entry):
+    """
+    Returns the CSV text of a stored upload.
+
+    Older entries keep their content in the `content` column; streamed
+    uploads keep it in the blob store.
+
+    Args:
+        entry (CSVData): The stored CSV entry.
+
+    Returns:
+        str: The CSV content.
+    """
+    if entry.content is not None:
+        return entry.content
+    return blob_store.read_text(entry.sha256)
@@ -0,0 +1,375 @@
+import csv
+import math
+from array import array
+from collections.abc import Mapping
+from datetime import date
+from app.parse_csv import _open_source
+
+
+# Column types in the order they are tried during inference.
+TYPES = ("int", "float", "bool", "date", "str")
+
+# Array typecodes used to store each typed column.
+TYPECODES = {"int": "q", "float": "d", "bool": "b", "date": "l"}
+
+BOOL_VALUES = {"true": 1, "false": 0}
+
+
+# Range of the int64 values an "int" column array can hold.
+INT_MIN, INT_MAX = -2 ** 63, 2 ** 63 - 1
+
+# Integers beyond this magnitude lose digits when stored as floats.
+FLOAT_EXACT_INT = 2 ** 53
+
+
+def _to_int(value):
+    number = int(value)
+    # Only canonical integers: "007" or "+5" stay strings (zip codes, phone numbers).
+    if str(number) != value:
+        raise ValueError(value)
+    if not INT_MIN <= number <= INT_MAX:
+        raise OverflowError(value)
+    return number
+
+
+def _to_float(value):
+    digits = value.lstrip("-")
+    # Leading zeros, signs and digit separators mean the value is an identifier, not a number.
+    if digits[:1] in ("+", "_") or "_" in digits or (digits[:1] == "0" and digits[1:2].isdigit()):
+        raise ValueError(value)
+    number = float(value)
+    # Long integers such as account numbers would come back with other digits.
+    if digits.isdigit() and abs(number) > FLOAT_EXACT_INT:
+        raise ValueError(value)
+    # NaN and infinity cannot be represented in JSON responses.
+    if not math.isfinite(number):
+        raise ValueError(value)
+    return number
+
+
+def _to_bool(value):
+    return BOOL_VALUES[value]
+
+
+def _to_date(value):
+    return date.fromisoformat(value).toordinal()
+
+
+CONVERTERS = {
+    "int": _to_int,
+    "float": _to_float,
+    "bool": _to_bool,
+    "date": _to_date,
+}
+
+DECODERS = {
+    "int": int,
+    "float": float,
+    "bool": bool,
+    "date": date.fromordinal,
+}
+
+# Render stored values back into the strings they are parsed from.
+RENDERERS = {
+    "int": str,
+    "float": repr,
+    "bool": lambda value: "true" if value else "false",
+    "date": lambda ordinal: date.fromordinal(ordinal).isoformat(),
+}
+
+# Types whose converter accepts several spellings of one value ("1.50" and
+# "1.5", "2024-01-01" and "20240101"); integers and booleans only have one.
+AMBIGUOUS_TYPES = frozenset({"float", "date"})
+
+
+def infer_type(values):
+    """
+    Infers the narrowest type that all non-empty sample values fit.
+
+    Parameters:
+        values (Iterable[str]): Sample values of a column.
+
+    Returns:
+        str: One of `TYPES`. Columns with only empty values are `"str"`.
+    """
+    values = [value for value in values if value != ""]
+    if not values:
+        return "str"
+    for type_name in TYPES[:-1]:
+        convert = CONVERTERS[type_name]
+        try:
+            for value in values:
+                convert(value)
+        except (ValueError, KeyError, OverflowError):
+            continue
+        return type_name
+    return "str"
+
+
+class Column:
+    """
+    A typed column stored in a compact array.
+
+    Empty values are stored as nulls: the array holds a placeholder and the
+    row is marked in the `nulls` bitmap. Values that would not render back
+    to their input string are also kept as read, so a fallback to `"str"`
+    restores the original text.
+
+    Attributes:
+        name (str): Column header.
+        type (str): One of `TYPES` except `"str"`.
+        values (array.array): Converted values.
+        nulls (bytearray): 1 for rows whose value is empty.
+        raw (dict[int, str]): Input strings by row, for values not in canonical spelling.
+    """
+    def __init__(self, name, type_name):
+        self.name = name
+        self.type = type_name
+        self.values = array(TYPECODES[type_name])
+        self.nulls = bytearray()
+        self.raw = {}
+        self._convert = CONVERTERS[type_name]
+        self._render = RENDERERS[type_name] if type_name in AMBIGUOUS_TYPES else None
+
+    def append(self, value):
+        """
+        Appends a raw string value.
+
+        Raises:
+            ValueError: If the value does not fit the column type.
+        """
+        if value == "":
+            self.values.append(0)
+            self.nulls.append(1)
+            return
+        try:
+            converted = self._convert(value)
+        except (KeyError, OverflowError) as error:
+            raise ValueError(value) from error
+        if self._render is not None and self._render(converted) != value:
+            self.raw[len(self.values)] = value
+        self.values.append(converted)
+        self.nulls.append(0)
+
+    def __len__(self):
+        return len(self.values)
+
+    def __getitem__(self, index):
+        if self.nulls[index]:
+            return None
+        return DECODERS[self.type](self.values[index])
+
+    def to_strings(self):
+        """
+        Returns the stored values as the strings they were read from, for a fallback to `"str"`.
+
+        Returns:
+            list[str]: One string per row; nulls become empty strings.
+        """
+        render = RENDERERS[self.type]
+        strings = []
+        for index, (value, null) in enumerate(zip(self.values, self.nulls)):
+            if null:
+                strings.append("")
+            elif index in self.raw:
+                strings.append(self.raw[index])
+            else:
+                strings.append(render(value))
+        return strings
+
+    def to_json(self):
+        """
+        Returns:
+            dict: JSON-serializable description of the column.
+        """
+        decode = DECODERS[self.type]
+        if self.type == "date":
+            values = [None if null else decode(value).isoformat() for value, null in zip(self.values, self.nulls)]
+        else:
+            values = [None if null else decode(value) for value, null in zip(self.values, self.nulls)]
+        return {"name": self.name, "type": self.type, "values": values}
+
+
+class DictColumn:
+    """
+    A string column stored with dictionary encoding.
+
+    Every distinct value is kept once in `dictionary`; rows store its index
+    in the `codes` array.
+    """
+    type = "str"
+
+    def __init__(self, name, values=()):
+        self.name = name
+        self.dictionary = []
+        self.codes = array("L")
+        self._index = {}
+        for value in values:
+            self.append(value)
+
+    def append(self, value):
+        """
+        Appends a string value.
+        """
+        code = self._index.get(value)
+        if code is None:
+            code = self._index[value] = len(self.dictionary)
+            self.dictionary.append(value)
+        self.codes.append(code)
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __getitem__(self, index):
+        return self.dictionary[self.codes[index]]
+
+    def to_json(self):
+        """
+        Returns:
+            dict: JSON-serializable description of the column.
+        """
+        return {"name": self.name, "type": "str", "dictionary": self.dictionary, "codes": self.codes.tolist()}
+
+
+class RowView(Mapping):
+    """
+    A lightweight read-only view of one row of a `ColumnarTable`.
+
+    It stores only the table and the row number; values are read from the
+    columns on access.
+    """
+    __slots__ = ("_table", "_index")
+
+    def __init__(self, table, index):
+        self._table = table
+        self._index = index
+
+    def __getitem__(self, name):
+        return self._table.columns[self._table.positions[name]][self._index]
+
+    def __iter__(self):
+        return iter(self._table.header)
+
+    def __len__(self):
+        return len(self._table.header)
+
+    def __repr__(self):
+        return f"RowView({dict(self)!r})"
+
+
+class ColumnarTable:
+    """
+    CSV data stored column by column with inferred types.
+
+    Attributes:
+        header (list[str]): Column names.
+        columns (list[Column | DictColumn]): One column per header entry.
+        num_rows (int): Number of rows.
+    """
+    def __init__(self, header, columns, num_rows):
+        self.header = header
+        self.columns = columns
+        self.num_rows = num_rows
+        self.positions = {name: position for position, name in enumerate(header)}
+
+    def row(self, index):
+        """
+        Returns:
+            RowView: View of the row with the given number.
+        """
+        if not 0 <= index < self.num_rows:
+            raise IndexError(index)
+        return RowView(self, index)
+
+    def __iter__(self):
+        return (RowView(self, index) for index in range(self.num_rows))
+
+    def __len__(self):
+        return self.num_rows
+
+    def to_json(self):
+        """
+        Returns:
+            dict: JSON-serializable representation with one entry per column.
+        """
+        return {"num_rows": self.num_rows, "columns": [column.to_json() for column in self.columns]}
+
+
+def _build_column(name, type_name):
+    if type_name == "str":
+        return DictColumn(name)
+    return Column(name, type_name)
+
+
+def parse_csv_columnar(source, sample_size=1000, encoding="utf-8"):
+    """
+    Parses CSV input into a `ColumnarTable` with one typed array per column.
+
+    Column types (int, float, bool, date or str) are inferred from the first
+    `sample_size` rows. If a later value does not fit, its column falls back
+    to str; values parsed before that keep the strings they were read from.
+    Values are whitespace-stripped like in `parse_csv`; empty values in typed
+    columns become nulls.
+
+    Parameters:
+        source (str | bytes | file-like): CSV input, as accepted by `iter_csv`.
+        sample_size (int): Number of rows used for type inference.
+        encoding (str): Encoding used for bytes and binary files.
+
+    Returns:
+        ColumnarTable: The parsed table.
+
+    Example:
+        table = parse_csv_columnar("name,age\\nAlice,25\\nBob,30")
+        table.columns[1].type    # "int"
+        table.row(0)["age"]      # 25
+    """
+    reader = csv.reader(_open_source(source, encoding))
+    header = None
+    sample = []
+    for row in reader:
+        if not row:
+            continue
+        if header is None:
+            header = row
+            continue
+        sample.append(row)
+        if len(sample) >= sample_size:
+            break
+    if header is None:
+        return ColumnarTable([], [], 0)
+
+    width = len(header)
+
+    def cells(row):
+        values = [value.strip() for value in row[:width]]
+        values.extend([""] * (width - len(values)))
+        return values
+
+    sample = [cells(row) for row in sample]
+    columns = [
+        _build_column(name, infer_type(row[position] for row in sample))
+        for position, name in enumerate(header)
+    ]
+
+    num_rows = 0
+
+    def append_row(values):
+        for position, value in enumerate(values):
+            column = columns[position]
+            try:
+                column.append(value)
+            except ValueError:
+                columns[position] = DictColumn(column.name, column.to_strings())
+                columns[position].append(value)
+
+    for values in sample:
+        append_row(values)
+        num_rows += 1
+    for row in reader:
+        if not row:
+            continue
+        append_row(cells(row))
+        num_rows += 1
+
+    return ColumnarTable(header, columns, num_rows)
@@ -1,14 +1,176 @@
-from sqlalchemy import create_engine
+import os
+import time
+from sqlalchemy import create_engine, event, inspect, literal, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 
 # Database configuration and connection setup.
-DATABASE_URL = "sqlite:///./test.db"
+# Both can be overridden through the environment, e.g. to point the tests at another file.
+DATABASE_URL = os.environ.get("DATABASE_URL", "sqlite:///./test.db")
+
+# The same database opened through the aiosqlite driver, used by the API routes.
+ASYNC_DATABASE_URL = os.environ.get(
+    "ASYNC_DATABASE_URL", DATABASE_URL.replace("sqlite://", "sqlite+aiosqlite://", 1)
+)
+
+# PRAGMA settings applied to every new SQLite connection, by profile.
+# - `default`: SQLite defaults (rollback journal, synchronous=FULL, writers block readers).
+# - `tuned`: WAL lets readers run alongside a writer; with WAL, synchronous=NORMAL is still
+#   safe against corruption and only syncs on checkpoints. Reads are served from a
+#   256 MB memory map and a 64 MB page cache, and a busy writer is waited for up to
+#   5 seconds instead of failing with "database is locked".
+SQLITE_PROFILES = {
+    "default": {},
+    "tuned": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "mmap_size": 256 * 1024 * 1024,
+        "cache_size": -64 * 1024,
+        "busy_timeout": 5000,
+        "temp_store": "MEMORY",
+    },
+}
+
+# Profile used by the application engines.
+DB_PROFILE = os.environ.get("DB_PROFILE", "tuned")
+
+# Connection pool settings of the application engines.
+DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", "16"))
+DB_POOL_TIMEOUT = float(os.environ.get("DB_POOL_TIMEOUT", "30"))
+
+
+def apply_sqlite_profile(engine, profile=DB_PROFILE):
+    """
+    Applies the PRAGMA settings of a profile to every new connection of an engine.
+
+    Args:
+        engine (Engine): Synchronous engine, or `AsyncEngine.sync_engine`.
+        profile (str): Key of `SQLITE_PROFILES`.
+
+    Raises:
+        ValueError: If the profile is unknown.
+    """
+    if profile not in SQLITE_PROFILES:
+        raise ValueError(f"Unknown database profile {profile!r}; expected one of {', '.join(SQLITE_PROFILES)}")
+    pragmas = SQLITE_PROFILES[profile]
+    if not pragmas:
+        return
+
+    @event.listens_for(engine, "connect")
+    def set_pragmas(dbapi_connection, _):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+
+class TimedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """
+    Async queue pool that records how long every checkout waited.
+
+    The wait in seconds is stored in `connection_record.info["pool_wait"]`,
+    where listeners of the pool `checkout` event can read it.
+    """
+    def _do_get(self):
+        start = time.perf_counter()
+        record = super()._do_get()
+        record.info["pool_wait"] = time.perf_counter() - start
+        return record
+
+
+def _pool_options(url):
+    """
+    Returns the pool arguments for an engine URL.
+
+    In-memory SQLite databases live in a single connection, so they keep the
+    pool SQLAlchemy picks for them.
+    """
+    url = make_url(url)
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        return {}
+    return {"pool_size": DB_POOL_SIZE, "max_overflow": 0, "pool_timeout": DB_POOL_TIMEOUT}
+
+
+def create_db_engine(url=DATABASE_URL, profile=DB_PROFILE):
+    """
+    Creates a synchronous engine with the given profile and the pool settings.
+
+    Args:
+        url (str): Database URL.
+        profile (str): Key of `SQLITE_PROFILES`, used for SQLite URLs.
+
+    Returns:
+        Engine: The configured engine.
+    """
+    connect_args = {}
+    if make_url(url).get_backend_name() == "sqlite":
+        # Allows connections to be used by the threads of the pool.
+        connect_args["check_same_thread"] = False
+    engine = create_engine(url, connect_args=connect_args, **_pool_options(url))
+    if engine.dialect.name == "sqlite":
+        apply_sqlite_profile(engine, profile)
+    return engine
+
+
+def create_async_db_engine(url=ASYNC_DATABASE_URL, profile=DB_PROFILE):
+    """
+    Creates an async engine with the given profile and the pool settings.
+
+    Args:
+        url (str): Database URL with an async driver, e.g. `sqlite+aiosqlite://`.
+        profile (str): Key of `SQLITE_PROFILES`, used for SQLite URLs.
+
+    Returns:
+        AsyncEngine: The configured engine.
+    """
+    options = _pool_options(url)
+    if options:
+        options["poolclass"] = TimedAsyncQueuePool
+    engine = create_async_engine(url, **options)
+    if engine.dialect.name == "sqlite":
+        apply_sqlite_profile(engine.sync_engine, profile)
+    return engine
+
+
+def add_missing_columns(engine, metadata):
+    """
+    Adds the columns of the models that existing tables lack.
+
+    `create_all` creates missing tables but never alters existing ones, so a
+    database created by an older version would miss the columns added since.
+    Running this after `create_all` is idempotent: present columns are skipped.
+    Added columns get their scalar default for existing rows, and indexes of
+    the models are created if they do not exist.
+
+    Args:
+        engine (Engine): Synchronous engine of the database.
+        metadata (MetaData): Metadata of the models, e.g. `Base.metadata`.
+    """
+    with engine.begin() as connection:
+        inspector = inspect(connection)
+        for table in metadata.sorted_tables:
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            missing = [column for column in table.columns if column.name not in existing]
+            for column in missing:
+                ddl = f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column.type.compile(engine.dialect)}"
+                if column.default is not None and column.default.is_scalar:
+                    value = literal(column.default.arg).compile(
+                        dialect=engine.dialect, compile_kwargs={"literal_binds": True}
+                    )
+                    ddl += f" DEFAULT {value}"
+                connection.execute(text(ddl))
+            if missing:
+                for index in table.indexes:
+                    index.create(connection, checkfirst=True)
+
 
 # Creates a database engine that manages the connection to the SQLite database.
-# The `check_same_thread=False` argument allows multiple threads to access the same database connection.
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+# It is used for table creation, scripts and tests; the API routes use `async_engine`.
+engine = create_db_engine()
 
 # Configures a session factory that provides database sessions.
 # - `autocommit=False`: Transactions are managed manually to ensure data integrity.
@@ -16,6 +178,15 @@ engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
 # - `bind=engine`: Binds the session to the created database engine.
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Creates the async engine and session factory used by the API routes.
+# Queries run in the aiosqlite worker thread, so awaiting them does not block the event loop.
+# The pool holds a fixed set of `DB_POOL_SIZE` connections: overflow connections would
+# be opened and closed (with their worker threads) on every burst of requests.
+# - `expire_on_commit=False`: Objects stay readable after commit without another query,
+#   since lazy loading is not available in async sessions.
+async_engine = create_async_db_engine()
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
 # Base class for defining ORM models.
 # All database models should inherit from this class to be recognized by SQLAlchemy.
 Base = declarative_base()
@@ -0,0 +1,223 @@
+import contextvars
+import logging
+import os
+import threading
+import time
+from collections import Counter
+from fastapi import Request
+from sqlalchemy import event
+from app.database import AsyncSessionLocal, async_engine
+
+
+# Enables logging of N+1 query patterns.
+DB_DEBUG = os.environ.get("DB_DEBUG", "") not in ("", "0")
+
+# Number of executions of the same SELECT in one request reported as an N+1 pattern.
+N_PLUS_ONE_THRESHOLD = int(os.environ.get("N_PLUS_ONE_THRESHOLD", "10"))
+
+# Upper bounds (in seconds) of the histogram buckets.
+TIME_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+# Upper bounds of the buckets of the queries-per-request histogram.
+QUERY_BUCKETS = (1, 2, 5, 10, 25, 50, 100)
+
+logger = logging.getLogger(__name__)
+
+
+class RequestStats:
+    """
+    Database activity of one request.
+
+    Attributes:
+        queries (int): Number of executed statements.
+        db_time (float): Seconds spent executing statements.
+        pool_wait (float): Seconds spent waiting for pooled connections.
+        statements (Counter): Executions per SQL statement, for N+1 detection.
+    """
+    __slots__ = ("queries", "db_time", "pool_wait", "statements")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.pool_wait = 0.0
+        self.statements = Counter()
+
+
+# Statistics of the request being handled; set by `get_db`.
+_current_stats = contextvars.ContextVar("db_request_stats", default=None)
+
+
+class Histogram:
+    """
+    Cumulative histogram in the Prometheus format.
+    """
+    def __init__(self, name, help, buckets):
+        self.name = name
+        self.help = help
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        """
+        Records one observation.
+        """
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[index] += 1
+        self.sum += value
+        self.count += 1
+
+    def render(self):
+        """
+        Returns:
+            list[str]: Lines of the Prometheus text exposition format.
+        """
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for bound, count in zip(self.buckets, self.counts):
+            lines.append(f'{self.name}_bucket{{le="{bound}"}} {count}')
+        lines.append(f'{self.name}_bucket{{le="+Inf"}} {self.count}')
+        lines.append(f"{self.name}_sum {self.sum}")
+        lines.append(f"{self.name}_count {self.count}")
+        return lines
+
+
+class DBMetrics:
+    """
+    Process-wide database metrics collected from finished request sessions.
+    """
+    def __init__(self):
+        self.active_sessions = 0
+        self.sessions_total = 0
+        self.queries_total = 0
+        self.n_plus_one_total = 0
+        self.db_time = Histogram("db_request_seconds", "Time spent executing statements per request.", TIME_BUCKETS)
+        self.pool_wait = Histogram("db_pool_wait_seconds", "Time spent waiting for a pooled connection per request.",
+                                   TIME_BUCKETS)
+        self.queries = Histogram("db_request_queries", "Number of statements executed per request.", QUERY_BUCKETS)
+        self._lock = threading.Lock()
+
+    def session_started(self):
+        with self._lock:
+            self.active_sessions += 1
+
+    def session_finished(self, stats, n_plus_one):
+        """
+        Records the statistics of a finished request.
+
+        Args:
+            stats (RequestStats): Database activity of the request.
+            n_plus_one (int): Number of N+1 patterns detected in the request.
+        """
+        with self._lock:
+            self.active_sessions -= 1
+            self.sessions_total += 1
+            self.queries_total += stats.queries
+            self.n_plus_one_total += n_plus_one
+            self.db_time.observe(stats.db_time)
+            self.pool_wait.observe(stats.pool_wait)
+            self.queries.observe(stats.queries)
+
+    def render(self):
+        """
+        Renders all metrics in the Prometheus text exposition format.
+
+        Returns:
+            str: The metrics page.
+        """
+        with self._lock:
+            lines = [
+                "# HELP db_sessions_active Request sessions currently open.",
+                "# TYPE db_sessions_active gauge",
+                f"db_sessions_active {self.active_sessions}",
+                "# HELP db_sessions_total Request sessions opened.",
+                "# TYPE db_sessions_total counter",
+                f"db_sessions_total {self.sessions_total}",
+                "# HELP db_queries_total Statements executed by request sessions.",
+                "# TYPE db_queries_total counter",
+                f"db_queries_total {self.queries_total}",
+                "# HELP db_n_plus_one_total Repeated statements detected as N+1 patterns.",
+                "# TYPE db_n_plus_one_total counter",
+                f"db_n_plus_one_total {self.n_plus_one_total}",
+            ]
+            for histogram in (self.db_time, self.pool_wait, self.queries):
+                lines.extend(histogram.render())
+        return "\n".join(lines) + "\n"
+
+
+metrics = DBMetrics()
+
+
+def instrument_engine(engine):
+    """
+    Registers the listeners that attribute statements and pool waits to the current request.
+
+    Args:
+        engine (Engine): Synchronous engine, or `AsyncEngine.sync_engine`.
+    """
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start"].pop()
+        stats = _current_stats.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.db_time += elapsed
+            stats.statements[statement] += 1
+
+    @event.listens_for(engine.pool, "checkout")
+    def checkout(dbapi_connection, connection_record, connection_proxy):
+        stats = _current_stats.get()
+        if stats is not None:
+            stats.pool_wait += connection_record.info.pop("pool_wait", 0.0)
+
+
+instrument_engine(async_engine.sync_engine)
+
+
+def _find_n_plus_one(stats):
+    """
+    Returns:
+        list[tuple[str, int]]: SELECT statements executed at least
+        `N_PLUS_ONE_THRESHOLD` times, with their counts.
+    """
+    return [
+        (statement, count) for statement, count in stats.statements.items()
+        if count >= N_PLUS_ONE_THRESHOLD and statement.lstrip().upper().startswith("SELECT")
+    ]
+
+
+async def get_db(request: Request):
+    """
+    Dependency to get an async database session.
+
+    Statements executed while the request is handled are counted and timed;
+    the totals are added to `metrics` when the session closes. With
+    `DB_DEBUG` set, statements repeated `N_PLUS_ONE_THRESHOLD` or more
+    times in one request are logged as N+1 patterns.
+
+    Args:
+        request (Request): The current request, used in log messages.
+
+    Yields:
+        AsyncSession: SQLAlchemy async database session.
+    """
+    stats = RequestStats()
+    _current_stats.set(stats)
+    metrics.session_started()
+    try:
+        async with AsyncSessionLocal() as db:
+            yield db
+    finally:
+        repeated = _find_n_plus_one(stats)
+        metrics.session_finished(stats, len(repeated))
+        if DB_DEBUG:
+            for statement, count in repeated:
+                logger.warning(
+                    "N+1 query pattern in %s %s: executed %d times: %s",
+                    request.method, request.url.path, count, " ".join(statement.split()),
+                )
@@ -0,0 +1,69 @@
+import json
+from app.models import CSVRow
+
+
+# Number of rows sent to the database in one `executemany` call.
+ROW_BATCH_SIZE = 5000
+
+
+class RowIngestor:
+    """
+    Stores parsed CSV rows in the `csv_rows` table in batches.
+
+    Rows are collected into batches of `batch_size` and every batch is
+    inserted with a single `executemany` over the Core table, skipping the
+    creation of an ORM object per row. Nothing is committed here: all
+    batches of one upload belong to the caller's transaction.
+
+    The methods take a synchronous session, so with an `AsyncSession` they
+    are called through `run_sync`.
+
+    Attributes:
+        row_count (int): Number of rows added so far.
+
+    Example:
+        ingestor = RowIngestor(csv_id)
+        await db.run_sync(ingestor.add, rows)
+        await db.run_sync(ingestor.flush)
+        await db.commit()
+    """
+    def __init__(self, csv_id, batch_size=ROW_BATCH_SIZE):
+        """
+        Parameters:
+            csv_id (int): ID of the `CSVData` entry the rows belong to.
+            batch_size (int): Number of rows per insert.
+        """
+        self.csv_id = csv_id
+        self.batch_size = batch_size
+        self.row_count = 0
+        self._batch = []
+        self._insert = CSVRow.__table__.insert()
+
+    def add(self, db, rows):
+        """
+        Adds parsed rows, inserting every full batch.
+
+        Parameters:
+            db (Session): Database session used for the inserts.
+            rows (Iterable[dict[str, str]]): Rows in file order.
+        """
+        for row in rows:
+            self._batch.append({
+                "csv_id": self.csv_id,
+                "row_number": self.row_count,
+                "data": json.dumps(row, separators=(",", ":"), ensure_ascii=False),
+            })
+            self.row_count += 1
+            if len(self._batch) >= self.batch_size:
+                self.flush(db)
+
+    def flush(self, db):
+        """
+        Inserts the rows collected since the previous batch.
+
+        Parameters:
+            db (Session): Database session used for the insert.
+        """
+        if self._batch:
+            db.execute(self._insert, self._batch)
+            self._batch = []
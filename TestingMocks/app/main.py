@@ -3,14 +3,19 @@ import sys
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from app.routes import users, files
-from app.database import Base, engine
+from app.database import Base, add_missing_columns, engine
+from app.db_session import metrics
+from app.parse_cache import parse_cache
 import uvicorn
 
 
 # Initialize database tables.
 # This command ensures that all database models inheriting from `Base` are created.
 Base.metadata.create_all(bind=engine)
+# Databases created by earlier versions lack the columns added to the models since.
+add_missing_columns(engine, Base.metadata)
 
 # Create a FastAPI application instance with a custom title.
 app = FastAPI(title="FastAPI CSV API")
@@ -31,6 +36,17 @@ async def root():
     """
     return {"message": "FastAPI is running"}
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """
+    Endpoint exposing database and parse cache metrics in the Prometheus text format.
+
+    Returns:
+        PlainTextResponse: Per-request DB time, query counts and pool wait
+        histograms, and the parse cache counters.
+    """
+    return PlainTextResponse(metrics.render() + parse_cache.render_metrics(), media_type="text/plain; version=0.0.4")
+
 # Entry point for running the FastAPI application with Uvicorn.
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=8000)
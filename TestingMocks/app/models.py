@@ -1,5 +1,5 @@
 from app.database import Base
-from sqlalchemy import Column, Integer, String, ForeignKey
+from sqlalchemy import Boolean, Column, Integer, String, ForeignKey, Index
 from sqlalchemy.orm import relationship
 
 
@@ -10,7 +10,7 @@ class User(Base):
     Attributes:
         id (int): Primary key, unique identifier for each user.
         username (str): Unique username for the user, indexed for faster lookups.
-        password (str): Hashed password for authentication purposes.
+        password (str): Encoded password hash with its algorithm and parameters (see `app.passwords`).
     """
     __tablename__ = "users"
     __table_args__ = {'extend_existing': True}
@@ -27,7 +27,13 @@ class CSVData(Base):
     Attributes:
         id (int): Primary key, unique identifier for each CSV entry.
         user_id (int): Foreign key referencing the `id` column in the `users` table.
-        content (str): The content of the CSV file stored as a string.
+        content (str): The content of the CSV file stored as a string. Empty for
+            streamed uploads, whose content is kept in the blob store.
+        sha256 (str): SHA-256 digest of the file, the key of its blob in the blob store.
+        size (int): File size in bytes.
+        row_count (int): Number of data rows in the file.
+        header (str): JSON-encoded list of column headers.
+        rows_stored (bool): Whether the rows of the file are stored in `csv_rows`.
         user (User): Relationship linking each CSV entry to its associated user.
     """
     __tablename__ = "csv_data"
@@ -35,7 +41,79 @@ class CSVData(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"))
-    content = Column(String)
+    content = Column(String, nullable=True)
+    sha256 = Column(String, index=True)
+    size = Column(Integer)
+    row_count = Column(Integer)
+    header = Column(String)
+    rows_stored = Column(Boolean, default=False)
 
     # Establish a relationship between CSVData and User
     user = relationship("User")
+
+
+class CSVRow(Base):
+    """
+    Database model representing one data row of an uploaded CSV file.
+
+    Rows are stored only for uploads ingested in the `rows` mode, so single
+    rows and ranges of rows can be queried without loading the whole file.
+
+    Attributes:
+        id (int): Primary key, unique identifier for each row.
+        csv_id (int): Foreign key referencing the `id` column in the `csv_data` table.
+        row_number (int): Position of the row in the file, starting at 0.
+        data (str): JSON-encoded dictionary mapping column headers to values.
+    """
+    __tablename__ = "csv_rows"
+    __table_args__ = (
+        # Rows of one file are always read by their position.
+        Index("ix_csv_rows_csv_id_row_number", "csv_id", "row_number", unique=True),
+        {'extend_existing': True},
+    )
+
+    id = Column(Integer, primary_key=True)
+    csv_id = Column(Integer, ForeignKey("csv_data.id"), nullable=False)
+    row_number = Column(Integer, nullable=False)
+    data = Column(String, nullable=False)
+
+
+class UploadSession(Base):
+    """
+    Database model representing a chunked upload in progress.
+
+    The chunks are written to a part file of the upload store (see
+    `app.upload_sessions`) at their offsets, so they can arrive in any order
+    and in parallel. When all of them are received, the upload is completed
+    like a single-shot one and the session is deleted.
+
+    Attributes:
+        id (str): Primary key, random identifier of the session.
+        user_id (int): Foreign key referencing the `id` column in the `users` table.
+        size (int): Total file size in bytes.
+        chunk_size (int): Size of every chunk but the last one.
+        ingest (str): Ingestion mode of the completed file, `"blob"` or `"rows"`.
+    """
+    __tablename__ = "upload_sessions"
+    __table_args__ = {'extend_existing': True}
+
+    id = Column(String, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"))
+    size = Column(Integer, nullable=False)
+    chunk_size = Column(Integer, nullable=False)
+    ingest = Column(String, nullable=False, default="blob")
+
+
+class UploadChunk(Base):
+    """
+    Database model representing a chunk received by an upload session.
+
+    Attributes:
+        upload_id (str): Foreign key referencing the `id` column in the `upload_sessions` table.
+        offset (int): Position of the chunk in the file, in bytes.
+    """
+    __tablename__ = "upload_chunks"
+    __table_args__ = {'extend_existing': True}
+
+    upload_id = Column(String, ForeignKey("upload_sessions.id"), primary_key=True)
+    offset = Column(Integer, primary_key=True)
@@ -0,0 +1,91 @@
+import base64
+import binascii
+import json
+from fastapi import HTTPException
+
+
+# Page size used when the caller does not pass `limit`.
+DEFAULT_PAGE_SIZE = 100
+
+# Maximum page size accepted from callers.
+MAX_PAGE_SIZE = 1000
+
+# Number of rows fetched from the database per round trip when streaming.
+STREAM_BATCH_SIZE = 500
+
+# Response header with the cursor of the next page.
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(last_id):
+    """
+    Encodes the ID of the last returned row as an opaque cursor.
+
+    Parameters:
+        last_id (int): ID of the last row of the page.
+
+    Returns:
+        str: URL-safe cursor string.
+    """
+    return base64.urlsafe_b64encode(str(last_id).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    """
+    Decodes a cursor produced by `encode_cursor`.
+
+    Parameters:
+        cursor (str | None): The cursor, or `None` for the first page.
+
+    Raises:
+        HTTPException: If the cursor is malformed.
+
+    Returns:
+        int: ID after which the next page starts; 0 for the first page.
+    """
+    if not cursor:
+        return 0
+    try:
+        return int(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode())
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def parse_fields(fields, allowed, default):
+    """
+    Parses a comma-separated `fields=` projection.
+
+    Parameters:
+        fields (str | None): Requested field names, e.g. `"id,size"`.
+        allowed (Iterable[str]): Field names the endpoint can return.
+        default (list[str]): Fields returned when nothing is requested.
+
+    Raises:
+        HTTPException: If an unknown field is requested.
+
+    Returns:
+        list[str]: The requested field names in the requested order.
+    """
+    if not fields:
+        return default
+    names = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = [name for name in names if name not in allowed]
+    if unknown or not names:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown fields: {', '.join(unknown)}; allowed: {', '.join(allowed)}",
+        )
+    return names
+
+
+def ndjson_line(item):
+    """
+    Renders one item as a line of newline-delimited JSON.
+
+    Parameters:
+        item (dict): Item to render.
+
+    Returns:
+        str: The JSON document followed by a line break.
+    """
+    return json.dumps(item, separators=(",", ":"), ensure_ascii=False) + "\n"
@@ -0,0 +1,355 @@
+import codecs
+import csv
+import json
+import multiprocessing
+import os
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from app.parse_csv import MAX_RECORD_SIZE, _iter_lines, parse_csv
+
+
+# Inputs of at least this many characters are parsed in the process pool.
+PARALLEL_PARSE_THRESHOLD = int(os.environ.get("PARALLEL_PARSE_THRESHOLD", 8 * 1024 * 1024))
+
+# Number of worker processes of the parsing pool.
+PARSE_WORKERS = int(os.environ.get("PARSE_WORKERS", os.cpu_count() or 1))
+
+# Largest range of a file, in bytes, that a worker parses at once.
+FILE_RANGE_SIZE = 8 * 1024 * 1024
+
+# Size of the blocks in which files are scanned for record boundaries.
+SCAN_BLOCK_SIZE = 1024 * 1024
+
+
+def _next_boundary(text, position, end, quotes=0):
+    """
+    Finds the first record boundary at or after `position`.
+
+    A line break ends a record only if the number of quote characters since
+    the start of the record is even; `quotes` is the number already seen
+    between the start of the record and `position`.
+
+    Returns:
+        int: Position right after the line break that ends the record, or `end`.
+    """
+    start = position
+    while True:
+        newline = text.find("\n", start, end)
+        if newline == -1:
+            return end
+        quotes += text.count('"', start, newline)
+        if quotes % 2 == 0:
+            return newline + 1
+        start = newline + 1
+
+
+def split_records(text, parts, start=0):
+    """
+    Splits CSV text into about `parts` ranges that start and end on record boundaries.
+
+    A line break inside a quoted field is not a boundary, so every range
+    holds whole records. Quotes are counted with `str.count`, so the split
+    costs one fast pass over the text.
+
+    Parameters:
+        text (str): The CSV text.
+        parts (int): Desired number of ranges.
+        start (int): Position of the first record to include; must be a record boundary.
+
+    Returns:
+        list[tuple[int, int]]: Start and end positions of consecutive ranges.
+    """
+    end = len(text)
+    step = max(1, (end - start) // max(1, parts))
+    ranges = []
+    position = start
+    while position < end:
+        target = min(end, position + step)
+        boundary = _next_boundary(text, target, end, text.count('"', position, target))
+        ranges.append((position, boundary))
+        position = boundary
+    return ranges
+
+
+def _read_header(text):
+    """
+    Reads the header record of CSV text.
+
+    Returns:
+        tuple[list[str] | None, int]: The header (`None` if there is no record)
+        and the position right after it.
+    """
+    position = 0
+    while position < len(text):
+        end = _next_boundary(text, position, len(text))
+        rows = [row for row in csv.reader(_iter_lines(text[position:end])) if row]
+        if rows:
+            return rows[0], end
+        position = end
+    return None, len(text)
+
+
+def _parse_chunk(text, header):
+    """
+    Parses CSV records without a header, like `iter_csv` does after the header.
+    """
+    return [
+        {col_name: value.strip() for col_name, value in zip(header, row)}
+        for row in csv.reader(_iter_lines(text)) if row
+    ]
+
+
+def _serialize_chunk(text, header):
+    """
+    Parses CSV records without a header and serializes them as JSON array items.
+
+    Returns:
+        bytes: Comma-separated JSON objects, without the enclosing brackets.
+    """
+    return ",".join(
+        json.dumps(row, separators=(",", ":"), ensure_ascii=False) for row in _parse_chunk(text, header)
+    ).encode()
+
+
+def _read_file_header(path, max_record_size=MAX_RECORD_SIZE):
+    """
+    Reads the header record of a UTF-8 CSV file.
+
+    Returns:
+        tuple[list[str] | None, int]: The header (`None` if there is no record)
+        and the byte offset right after it.
+
+    Raises:
+        UnicodeDecodeError: If the file is not valid UTF-8.
+        ValueError: If the header is longer than `max_record_size`.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    text = ""
+    with open(path, "rb") as file:
+        while True:
+            block = file.read(SCAN_BLOCK_SIZE)
+            text += decoder.decode(block, final=not block)
+            header, end = _read_header(text)
+            # Without a line break after it, the record may continue in the next block.
+            if not block or end < len(text):
+                return header, len(text[:end].encode())
+            if len(text) > max_record_size:
+                raise ValueError(f"CSV record is longer than {max_record_size} characters")
+
+
+def _iter_file_ranges(path, start, step, max_record_size=MAX_RECORD_SIZE):
+    """
+    Yields ranges of a CSV file of about `step` bytes that start and end on record boundaries.
+
+    Like `split_records`, but the file is scanned block by block, so it is
+    never held in memory. Quote characters and line breaks never occur inside
+    UTF-8 multibyte sequences, so the bytes are scanned without decoding.
+
+    Parameters:
+        path (str): The CSV file.
+        start (int): Byte offset of the first record; must be a record boundary.
+        step (int): Desired range size in bytes.
+        max_record_size (int): Longest a record may run past the end of a range.
+
+    Yields:
+        tuple[int, int]: Start and end offsets of consecutive ranges.
+
+    Raises:
+        ValueError: If no record ends within `max_record_size` bytes after a
+            range's desired end, e.g. because of an unclosed quote.
+    """
+    size = os.path.getsize(path)
+    begin = start
+    target = begin + step
+    position = start
+    # Quote characters between `start` and `position`; every boundary has an even count.
+    quotes = 0
+    with open(path, "rb") as file:
+        file.seek(start)
+        while block := file.read(SCAN_BLOCK_SIZE):
+            scanned = block_quotes = 0
+            search = max(0, target - position)
+            while search < len(block):
+                newline = block.find(b"\n", search)
+                if newline == -1:
+                    break
+                block_quotes += block.count(b'"', scanned, newline)
+                scanned = newline
+                if (quotes + block_quotes) % 2 == 0:
+                    yield begin, position + newline + 1
+                    begin = position + newline + 1
+                    target = begin + step
+                    search = max(newline + 1, target - position)
+                else:
+                    search = newline + 1
+            position += len(block)
+            quotes += block_quotes + block.count(b'"', scanned)
+            if position < size and position - target > max_record_size:
+                raise ValueError(f"CSV record is longer than {max_record_size} characters")
+    if begin < size:
+        yield begin, size
+
+
+def _parse_file_range(path, begin, end, header, rows):
+    """
+    Parses a byte range of a CSV file that holds whole records.
+
+    Returns:
+        list[dict[str, str]] | int: The rows, or only their number if `rows` is false.
+    """
+    with open(path, "rb") as file:
+        file.seek(begin)
+        text = file.read(end - begin).decode("utf-8")
+    if rows:
+        return _parse_chunk(text, header)
+    return sum(1 for row in csv.reader(_iter_lines(text)) if row)
+
+
+class ParallelParser:
+    """
+    Parses large CSV inputs in a pool of worker processes.
+
+    Pure-Python parsing holds the GIL, so in the server process it would stall
+    every other request. Inputs of at least `threshold` characters are split
+    on record boundaries into chunks, the chunks are parsed in worker
+    processes, and the results are merged in input order. Smaller inputs are
+    parsed inline, where the cost of sending them to a process would outweigh
+    the gain.
+    """
+    def __init__(self, workers=PARSE_WORKERS, threshold=PARALLEL_PARSE_THRESHOLD, chunks_per_worker=2,
+                 range_size=FILE_RANGE_SIZE, max_record_size=MAX_RECORD_SIZE):
+        """
+        Parameters:
+            workers (int): Number of worker processes.
+            threshold (int): Minimum input length in characters for the pool.
+            chunks_per_worker (int): Chunks per worker, for an even load when records differ in size.
+            range_size (int): Largest range of a file, in bytes, parsed by one task of `parse_file`.
+            max_record_size (int): Longest record of a file; see `MAX_RECORD_SIZE`.
+        """
+        self.workers = workers
+        self.threshold = threshold
+        self.chunks_per_worker = chunks_per_worker
+        self.range_size = range_size
+        self.max_record_size = max_record_size
+        self._executor = None
+        self._lock = threading.Lock()
+
+    @property
+    def executor(self):
+        """
+        The process pool, started on first use.
+
+        Workers are spawned rather than forked, since forking a process with
+        running threads (such as the server's) is unsafe.
+        """
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._executor
+
+    def pooled(self, size):
+        """
+        Tells whether an input of the given size is parsed in the pool.
+
+        Parameters:
+            size (int): Input length in characters, or bytes for files.
+
+        Returns:
+            bool: `True` if the input reaches `threshold` and there are several workers.
+        """
+        return size >= self.threshold and self.workers >= 2
+
+    def _map_chunks(self, text, function):
+        header, start = _read_header(text)
+        if header is None:
+            return None, []
+        ranges = split_records(text, self.workers * self.chunks_per_worker, start)
+        futures = [self.executor.submit(function, text[begin:end], header) for begin, end in ranges]
+        return header, [future.result() for future in futures]
+
+    def parse(self, csv_string):
+        """
+        Parses a CSV string like `parse_csv`, in the pool if it is large.
+
+        Parameters:
+            csv_string (str): The raw CSV content.
+
+        Returns:
+            list[dict[str, str]]: The rows.
+        """
+        text = csv_string.strip()
+        if not self.pooled(len(text)):
+            return parse_csv(text)
+        _, chunks = self._map_chunks(text, _parse_chunk)
+        return [row for chunk in chunks for row in chunk]
+
+    def serialize(self, csv_string):
+        """
+        Parses a CSV string like `parse_csv` and serializes the rows as a JSON array.
+
+        In the pool, every chunk is also serialized by its worker, so only
+        JSON bytes are sent back and the merge is a concatenation.
+
+        Parameters:
+            csv_string (str): The raw CSV content.
+
+        Returns:
+            bytes: The JSON document.
+        """
+        text = csv_string.strip()
+        if not self.pooled(len(text)):
+            return json.dumps(parse_csv(text), separators=(",", ":"), ensure_ascii=False).encode()
+        _, chunks = self._map_chunks(text, _serialize_chunk)
+        return b"[" + b",".join(chunk for chunk in chunks if chunk) + b"]"
+
+    def parse_file(self, path, rows=True):
+        """
+        Parses a UTF-8 CSV file in the pool, range by range.
+
+        The file is split on record boundaries into ranges of about
+        `range_size` bytes, which the workers read and parse themselves, so
+        the file is never loaded into the server process. At most
+        `workers * chunks_per_worker` ranges are in flight at a time.
+
+        Parameters:
+            path (str): The CSV file.
+            rows (bool): Return the rows of every range; otherwise only their number.
+
+        Returns:
+            tuple[list[str] | None, Iterator[list[dict[str, str]] | int]]: The header
+            and the results of the ranges in file order. Iterating raises
+            `UnicodeDecodeError` or `ValueError` for invalid files, like
+            `CSVStreamParser`.
+        """
+        header, start = _read_file_header(path, self.max_record_size)
+        return header, self._map_file(path, header, start, rows)
+
+    def _map_file(self, path, header, start, rows):
+        if header is None:
+            return
+        pending = deque()
+        try:
+            for begin, end in _iter_file_ranges(path, start, self.range_size, self.max_record_size):
+                pending.append(self.executor.submit(_parse_file_range, path, begin, end, header, rows))
+                if len(pending) >= self.workers * self.chunks_per_worker:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()
+
+    def shutdown(self):
+        """
+        Stops the worker processes.
+        """
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
+
+
+parallel_parser = ParallelParser()
@@ -0,0 +1,168 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+
+
+# Version of the parsed representations; part of every key, so changing
+# the parsers invalidates cached results and ETags held by clients.
+PARSER_VERSION = 1
+
+
+class ParseCache:
+    """
+    Bounded LRU cache of serialized parse results with a time to live.
+
+    Results are stored as the JSON bytes sent to clients, so a hit returns
+    them without parsing or serializing again. Keys are hashes of the input,
+    which also serve as ETags. The cache holds at most `max_entries` results
+    and `max_bytes` bytes; the least recently used results are evicted first.
+
+    Entries are never invalidated explicitly: a key names the exact input
+    bytes (or the content hash of a stored blob) and the parser version, so
+    a cached result cannot go stale. Changed content gets another key, and
+    the old result ages out through the LRU bounds and the TTL.
+
+    Attributes:
+        hits (int): Lookups answered from the cache.
+        misses (int): Lookups of missing or expired entries.
+        evictions (int): Entries dropped to stay within the bounds.
+        expirations (int): Entries dropped because their TTL passed.
+        not_modified (int): Requests answered with 304 Not Modified.
+    """
+    def __init__(self, max_entries=256, max_bytes=64 * 1024 * 1024, ttl=300.0):
+        """
+        Parameters:
+            max_entries (int): Maximum number of cached results.
+            max_bytes (int): Maximum total size of cached results.
+            ttl (float): Seconds a result stays valid.
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.not_modified = 0
+        self.size = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(data, format):
+        """
+        Computes the cache key of an input in a representation.
+
+        Parameters:
+            data (bytes): The input, or a unique name of it such as a blob hash.
+            format (str): Name of the representation, e.g. `"rows"`.
+
+        Returns:
+            str: Hex digest identifying the parse result.
+        """
+        digest = hashlib.sha256(f"{PARSER_VERSION}:{format}:".encode())
+        digest.update(data)
+        return digest.hexdigest()
+
+    def get(self, key):
+        """
+        Returns a cached result and marks it as recently used.
+
+        Returns:
+            bytes | None: The serialized result, or `None` if it is missing or expired.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] < time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, body):
+        """
+        Stores a serialized result.
+
+        Parameters:
+            key (str): Key from `ParseCache.key`.
+            body (bytes): The serialized result.
+        """
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (body, time.monotonic() + self.ttl)
+            self.size += len(body)
+            while len(self._entries) > self.max_entries or self.size > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def record_not_modified(self):
+        """
+        Counts a request answered with 304 Not Modified.
+        """
+        with self._lock:
+            self.not_modified += 1
+
+    def _remove(self, key):
+        body, _ = self._entries.pop(key)
+        self.size -= len(body)
+
+    def render_metrics(self):
+        """
+        Renders the cache counters in the Prometheus text exposition format.
+
+        Returns:
+            str: The metrics.
+        """
+        counters = {
+            "hits": "Lookups answered from the cache.",
+            "misses": "Lookups of missing or expired entries.",
+            "evictions": "Entries evicted to stay within the size bounds.",
+            "expirations": "Entries dropped after their TTL.",
+            "not_modified": "Requests answered with 304 Not Modified.",
+        }
+        lines = []
+        with self._lock:
+            for name, help in counters.items():
+                lines += [f"# HELP parse_cache_{name}_total {help}", f"# TYPE parse_cache_{name}_total counter",
+                          f"parse_cache_{name}_total {getattr(self, name)}"]
+            lines += ["# HELP parse_cache_entries Cached parse results.", "# TYPE parse_cache_entries gauge",
+                      f"parse_cache_entries {len(self._entries)}",
+                      "# HELP parse_cache_bytes Size of the cached parse results.", "# TYPE parse_cache_bytes gauge",
+                      f"parse_cache_bytes {self.size}"]
+        return "\n".join(lines) + "\n"
+
+
+def etag_matches(if_none_match, etag):
+    """
+    Checks an `If-None-Match` header against an ETag.
+
+    Parameters:
+        if_none_match (str | None): Value of the request header.
+        etag (str): Quoted ETag of the current result.
+
+    Returns:
+        bool: Whether the client already has the current result.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # Weak comparison, as required for If-None-Match.
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+
+parse_cache = ParseCache(
+    max_entries=int(os.environ.get("PARSE_CACHE_SIZE", 256)),
+    max_bytes=int(os.environ.get("PARSE_CACHE_MAX_BYTES", 64 * 1024 * 1024)),
+    ttl=float(os.environ.get("PARSE_CACHE_TTL", 300)),
+)
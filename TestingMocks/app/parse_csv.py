@@ -1,11 +1,209 @@
+import codecs
 import csv
+import io
+
+
+def _iter_lines(text):
+    """
+    Yields the lines of a string one by one, keeping line endings.
+
+    Unlike `str.split`, this does not build a list of all lines, so the
+    input is never copied as a whole.
+
+    Parameters:
+        text (str): The text to split.
+
+    Yields:
+        str: The next line of the text.
+    """
+    start = 0
+    while True:
+        end = text.find("\n", start)
+        if end == -1:
+            if start < len(text):
+                yield text[start:]
+            return
+        yield text[start:end + 1]
+        start = end + 1
+
+
+def _open_source(source, encoding):
+    """
+    Turns a CSV source into an iterable of text lines for `csv.reader`.
+
+    Parameters:
+        source (str | bytes | file-like): CSV text, encoded CSV bytes, or a text
+            or binary file object.
+        encoding (str): Encoding of byte input.
+
+    Returns:
+        Iterable[str]: Lines of the CSV input.
+    """
+    if isinstance(source, str):
+        return _iter_lines(source)
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        source = io.BytesIO(source)
+    if isinstance(source.read(0), bytes):
+        return io.TextIOWrapper(source, encoding=encoding, newline="")
+    return source
+
+
+def iter_csv(source, encoding="utf-8"):
+    """
+    Parses CSV input lazily, yielding one dictionary per row.
+
+    The input is read incrementally, so memory use does not depend on its
+    size. Quoting is handled by the `csv` module, so quoted fields may contain
+    commas and newlines. Blank lines are skipped.
+
+    Parameters:
+        source (str | bytes | file-like): CSV text, encoded CSV bytes, or a text
+            or binary file object opened for reading.
+        encoding (str): Encoding used for bytes and binary files. Defaults to UTF-8.
+
+    Yields:
+        dict[str, str]: The next row, with column headers as keys and
+        whitespace-stripped values.
+
+    Example:
+        with open("data.csv", "rb") as file:
+            for row in iter_csv(file):
+                print(row["name"])
+    """
+    reader = csv.reader(_open_source(source, encoding))
+    header = None
+    for row in reader:
+        if not row:
+            continue  # Skip blank lines
+        if header is None:
+            header = row  # Extract the header row
+            continue
+        yield {col_name: value.strip() for col_name, value in zip(header, row)}
+
+# Longest incomplete record, in characters, that `CSVStreamParser` keeps
+# waiting for its end. An unclosed quote would otherwise buffer the whole rest
+# of the input.
+MAX_RECORD_SIZE = 16 * 1024 * 1024
+
+
+class CSVStreamParser:
+    """
+    Incremental CSV parser for data that arrives in chunks.
+
+    Chunks of bytes are fed as they arrive; every call returns the rows
+    completed so far. A record split between chunks (including a quoted
+    field with line breaks) is kept until the rest of it arrives, so only
+    the current chunk and at most one incomplete record are held in memory.
+    Each chunk is scanned once: the quote parity of the incomplete record is
+    carried over between calls instead of being recounted.
+
+    Attributes:
+        header (list[str] | None): Column headers, once the first record is complete.
+        row_count (int): Number of data rows parsed so far.
+
+    Example:
+        parser = CSVStreamParser()
+        for chunk in chunks:
+            rows = parser.feed(chunk)
+        rows = parser.close()
+    """
+    def __init__(self, encoding="utf-8", max_record_size=MAX_RECORD_SIZE):
+        """
+        Parameters:
+            encoding (str): Encoding of the fed bytes. Defaults to UTF-8.
+            max_record_size (int): Longest record in characters; see `MAX_RECORD_SIZE`.
+        """
+        self.header = None
+        self.row_count = 0
+        self.max_record_size = max_record_size
+        self._decoder = codecs.getincrementaldecoder(encoding)()
+        # Pieces of the incomplete record, their total length and quote count.
+        self._pending = []
+        self._pending_size = 0
+        self._pending_quotes = 0
+
+    def feed(self, chunk):
+        """
+        Parses the next chunk of input.
+
+        Parameters:
+            chunk (bytes): The next piece of the CSV data.
+
+        Returns:
+            list[dict[str, str]]: Rows completed by this chunk.
+
+        Raises:
+            UnicodeDecodeError: If the data is not valid in the given encoding.
+            ValueError: If a record grows beyond `max_record_size`, e.g. because
+                of an unclosed quote.
+        """
+        return self._parse(self._decoder.decode(chunk), final=False)
+
+    def close(self):
+        """
+        Parses whatever is left after the last chunk.
+
+        Returns:
+            list[dict[str, str]]: The remaining rows.
+        """
+        return self._parse(self._decoder.decode(b"", final=True), final=True)
+
+    def _record_boundary(self, text):
+        """
+        Finds the end of the last complete record in `text`, which continues
+        the incomplete record.
+
+        A line break ends a record only if the incomplete record and the
+        text before the line break hold an even number of quote characters.
+
+        Returns:
+            int: Position in `text` right after the last complete record, or 0.
+        """
+        end = text.rfind("\n")
+        if end == -1:
+            return 0
+        quotes = self._pending_quotes + text.count('"', 0, end)
+        while quotes % 2:
+            previous = text.rfind("\n", 0, end)
+            if previous == -1:
+                return 0
+            quotes -= text.count('"', previous, end)
+            end = previous
+        return end + 1
+
+    def _parse(self, text, final):
+        boundary = len(text) if final else self._record_boundary(text)
+        complete = None
+        if boundary or final:
+            self._pending.append(text[:boundary])
+            complete = "".join(self._pending)
+            text = text[boundary:]
+            self._pending, self._pending_size, self._pending_quotes = [], 0, 0
+        self._pending.append(text)
+        self._pending_size += len(text)
+        self._pending_quotes += text.count('"')
+        if self._pending_size > self.max_record_size:
+            raise ValueError(f"CSV record is longer than {self.max_record_size} characters")
+        if complete is None:
+            return []
+
+        rows = []
+        for row in csv.reader(_iter_lines(complete)):
+            if not row:
+                continue  # Skip blank lines
+            if self.header is None:
+                self.header = row
+                continue
+            rows.append({col_name: value.strip() for col_name, value in zip(self.header, row)})
+        self.row_count += len(rows)
+        return rows
+
 
 def parse_csv(csv_string):
     """
     Parses a CSV-formatted string into a list of dictionaries.
 
-    This function takes a CSV string, splits it into lines, and processes it into
-    a structured format where each row is represented as a dictionary with column
+    This function takes a CSV string and processes it into a structured format where each row is represented as a dictionary with column
     names as keys.
 
     Parameters:
@@ -27,20 +225,9 @@ def parse_csv(csv_string):
 
     Raises:
         No explicit exceptions are raised, but malformed CSV input may cause unexpected behavior.
-    """
-    data = []
-    lines = csv_string.strip().split("\n")
-
-    if not lines:
-        return data  # Return an empty list if there are no lines
-
-    reader = csv.reader(lines)
-    header = next(reader)  # Extract the header row
 
-    for row in reader:
-        row_dict = {}
-        for col_name, value in zip(header, row):
-            row_dict[col_name] = value.strip()  # Strip whitespace from values
-        data.append(row_dict)
-
-    return data
+    Note:
+        This is a thin wrapper around `iter_csv`, which should be used directly
+        for large inputs so that rows are not all kept in memory.
+    """
+    return list(iter_csv(csv_string.strip()))
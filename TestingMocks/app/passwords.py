@@ -0,0 +1,262 @@
+import asyncio
+import base64
+import hashlib
+import hmac
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+
+def _b64encode(data):
+    return base64.b64encode(data).decode().rstrip("=")
+
+
+def _b64decode(text):
+    return base64.b64decode(text + "=" * (-len(text) % 4))
+
+
+def _parse_params(text):
+    return {name: int(value) for name, value in (item.split("=") for item in text.split(","))}
+
+
+class ScryptHasher:
+    """
+    Password hasher based on scrypt.
+
+    Hashes are encoded as `scrypt$n=<n>,r=<r>,p=<p>$<salt>$<hash>`, so the
+    cost parameters of every hash are known when it is verified.
+    """
+    algorithm = "scrypt"
+
+    def __init__(self, n=2 ** 14, r=8, p=1, dklen=32):
+        """
+        Parameters:
+            n (int): CPU/memory cost, a power of two.
+            r (int): Block size.
+            p (int): Parallelization.
+            dklen (int): Length of the derived key in bytes.
+        """
+        self.n = n
+        self.r = r
+        self.p = p
+        self.dklen = dklen
+
+    def _derive(self, password, salt, n, r, p, dklen):
+        # scrypt needs 128 * n * r bytes; leave headroom above that.
+        return hashlib.scrypt(
+            password.encode(), salt=salt, n=n, r=r, p=p, dklen=dklen, maxmem=256 * n * r + 1024 * 1024,
+        )
+
+    def hash(self, password):
+        """
+        Hashes a password with a new random salt.
+
+        Returns:
+            str: The encoded hash.
+        """
+        salt = os.urandom(16)
+        key = self._derive(password, salt, self.n, self.r, self.p, self.dklen)
+        return f"{self.algorithm}$n={self.n},r={self.r},p={self.p}${_b64encode(salt)}${_b64encode(key)}"
+
+    def verify(self, password, encoded):
+        """
+        Checks a password against an encoded hash, using the parameters stored in it.
+
+        Returns:
+            bool: Whether the password matches.
+        """
+        _, params, salt, key = encoded.split("$")
+        params = _parse_params(params)
+        key = _b64decode(key)
+        derived = self._derive(password, _b64decode(salt), params["n"], params["r"], params["p"], len(key))
+        return hmac.compare_digest(derived, key)
+
+    def needs_update(self, encoded):
+        """
+        Returns:
+            bool: Whether the hash was made with other parameters than the current ones.
+        """
+        _, params, _, key = encoded.split("$")
+        params = _parse_params(params)
+        return (params["n"], params["r"], params["p"], len(_b64decode(key))) != (self.n, self.r, self.p, self.dklen)
+
+
+class PBKDF2Hasher:
+    """
+    Password hasher based on PBKDF2-HMAC-SHA256.
+
+    Hashes are encoded as `pbkdf2_sha256$i=<iterations>$<salt>$<hash>`.
+    """
+    algorithm = "pbkdf2_sha256"
+
+    def __init__(self, iterations=600000, dklen=32):
+        """
+        Parameters:
+            iterations (int): Number of iterations.
+            dklen (int): Length of the derived key in bytes.
+        """
+        self.iterations = iterations
+        self.dklen = dklen
+
+    def hash(self, password):
+        """
+        Hashes a password with a new random salt.
+
+        Returns:
+            str: The encoded hash.
+        """
+        salt = os.urandom(16)
+        key = hashlib.pbkdf2_hmac("sha256", password.encode(), salt, self.iterations, self.dklen)
+        return f"{self.algorithm}$i={self.iterations}${_b64encode(salt)}${_b64encode(key)}"
+
+    def verify(self, password, encoded):
+        """
+        Checks a password against an encoded hash, using the parameters stored in it.
+
+        Returns:
+            bool: Whether the password matches.
+        """
+        _, params, salt, key = encoded.split("$")
+        key = _b64decode(key)
+        derived = hashlib.pbkdf2_hmac("sha256", password.encode(), _b64decode(salt), _parse_params(params)["i"], len(key))
+        return hmac.compare_digest(derived, key)
+
+    def needs_update(self, encoded):
+        """
+        Returns:
+            bool: Whether the hash was made with other parameters than the current ones.
+        """
+        _, params, _, key = encoded.split("$")
+        return (_parse_params(params)["i"], len(_b64decode(key))) != (self.iterations, self.dklen)
+
+
+class LegacySHA256Hasher:
+    """
+    Verifier of the unsalted SHA-256 hex digests stored before hashes were encoded.
+
+    It never creates hashes; matching passwords are rehashed on login.
+    """
+    algorithm = "sha256"
+
+    def verify(self, password, encoded):
+        return hmac.compare_digest(hashlib.sha256(password.encode()).hexdigest(), encoded)
+
+    def needs_update(self, encoded):
+        return True
+
+
+def build_hasher(name=None):
+    """
+    Creates the hasher configured in the environment.
+
+    `PASSWORD_HASHER` selects `scrypt` (default) or `pbkdf2`; the cost is set
+    with `SCRYPT_N`, `SCRYPT_R`, `SCRYPT_P` or `PBKDF2_ITERATIONS`.
+
+    Parameters:
+        name (str, optional): Hasher name overriding `PASSWORD_HASHER`.
+
+    Raises:
+        ValueError: If the hasher name is unknown.
+
+    Returns:
+        ScryptHasher | PBKDF2Hasher: The hasher.
+    """
+    name = name or os.environ.get("PASSWORD_HASHER", "scrypt")
+    if name == "scrypt":
+        return ScryptHasher(
+            n=int(os.environ.get("SCRYPT_N", 2 ** 14)),
+            r=int(os.environ.get("SCRYPT_R", 8)),
+            p=int(os.environ.get("SCRYPT_P", 1)),
+        )
+    if name == "pbkdf2":
+        return PBKDF2Hasher(iterations=int(os.environ.get("PBKDF2_ITERATIONS", 600000)))
+    raise ValueError(f"Unknown password hasher {name!r}; expected 'scrypt' or 'pbkdf2'")
+
+
+class PasswordManager:
+    """
+    Hashes and verifies passwords in a bounded thread pool.
+
+    scrypt and PBKDF2 release the GIL while they run, so a thread pool of
+    `max_workers` threads hashes in parallel while the event loop keeps
+    serving other requests. New hashes are made with `hasher`; existing
+    hashes are verified with the hasher named in their prefix, so the cost
+    (or the algorithm) can be changed at any time and old hashes are
+    replaced on the next successful login.
+    """
+    def __init__(self, hasher=None, max_workers=None):
+        """
+        Parameters:
+            hasher (ScryptHasher | PBKDF2Hasher, optional): Hasher for new
+                hashes; `build_hasher()` by default.
+            max_workers (int, optional): Size of the hashing pool; by default
+                `PASSWORD_HASH_WORKERS` or the number of CPUs, at most 8.
+        """
+        self.hasher = hasher or build_hasher()
+        if max_workers is None:
+            max_workers = int(os.environ.get("PASSWORD_HASH_WORKERS", min(8, os.cpu_count() or 1)))
+        self.max_workers = max_workers
+        self.verifiers = {
+            verifier.algorithm: verifier
+            for verifier in (ScryptHasher(), PBKDF2Hasher(), LegacySHA256Hasher(), self.hasher)
+        }
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="password-hash")
+        # Hash checked for unknown users, so their logins take as long as real ones.
+        self._dummy_hash = self.hasher.hash("")
+
+    def _verifier(self, encoded):
+        algorithm = encoded.split("$", 1)[0] if "$" in encoded else LegacySHA256Hasher.algorithm
+        return self.verifiers[algorithm]
+
+    def hash(self, password):
+        """
+        Hashes a password in the calling thread.
+
+        Returns:
+            str: The encoded hash.
+        """
+        return self.hasher.hash(password)
+
+    def verify_and_update(self, password, encoded):
+        """
+        Checks a password in the calling thread and rehashes it if needed.
+
+        Parameters:
+            password (str): The password to check.
+            encoded (str | None): The stored hash; `None` for an unknown user.
+
+        Returns:
+            tuple[bool, str | None]: Whether the password matches, and a new
+            hash to store if the stored one uses outdated parameters.
+        """
+        if encoded is None:
+            self.hasher.verify(password, self._dummy_hash)
+            return False, None
+        verifier = self._verifier(encoded)
+        if not verifier.verify(password, encoded):
+            return False, None
+        if verifier is not self.hasher or self.hasher.needs_update(encoded):
+            return True, self.hasher.hash(password)
+        return True, None
+
+    async def hash_async(self, password):
+        """
+        Hashes a password in the hashing pool.
+
+        Returns:
+            str: The encoded hash.
+        """
+        return await asyncio.get_running_loop().run_in_executor(self._executor, self.hash, password)
+
+    async def verify_and_update_async(self, password, encoded):
+        """
+        Runs `verify_and_update` in the hashing pool.
+
+        Returns:
+            tuple[bool, str | None]: See `verify_and_update`.
+        """
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor, self.verify_and_update, password, encoded,
+        )
+
+
+passwords = PasswordManager()
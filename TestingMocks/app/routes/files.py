@@ -1,55 +1,533 @@
-from fastapi import APIRouter, UploadFile, File, Depends
-from sqlalchemy.orm import Session
-from app.database import SessionLocal
-from app.models import CSVData
-from app.parse_csv import parse_csv
+import json
+import uuid
+from typing import Literal
+from fastapi import APIRouter, UploadFile, File, Depends, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import delete, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.blob_store import CHUNK_SIZE, blob_store, load_csv_content
+from app.columnar import parse_csv_columnar
+from app.db_session import get_db
+from app.ingest import RowIngestor
+from app.models import CSVData, CSVRow, UploadChunk, UploadSession
+from app.parallel_parse import parallel_parser
+from app.parse_cache import etag_matches, parse_cache
+from app.parse_csv import CSVStreamParser, parse_csv
+from app.upload_sessions import MAX_UPLOAD_CHUNK_SIZE, MAX_UPLOAD_SIZE, UPLOAD_CHUNK_SIZE, chunk_offsets, upload_store
 
 router = APIRouter()
 
 
-def get_db():
+async def store_upload(db, user_id, ingest, read, expected_sha256=None):
     """
-    Dependency to get a database session.
-    
-    Yields:
-        Session: SQLAlchemy database session.
+    Stores an uploaded CSV file in the blob store, reading it chunk by chunk.
+
+    Each chunk is written to a content-addressed blob and parsed
+    incrementally, so memory use does not depend on the file size. Writing,
+    hashing and parsing run in the threadpool, so the event loop keeps
+    serving other requests while a file is parsed. Once a file reaches the
+    threshold of `parallel_parser`, its remaining chunks are only written,
+    and the written file is parsed in the process pool (see
+    `parse_in_pool`), so large files do not hold the server's GIL. Only
+    metadata (size, row count, header and hash) is stored in the database.
+    In the `rows` mode the parsed rows are also stored in the `csv_rows`
+    table, in batches within the same transaction.
+
+    Args:
+        db (AsyncSession): Database session.
+        user_id (int): ID of the user uploading the file.
+        ingest (str): `"blob"` to store the file only, `"rows"` to also store its rows.
+        read (callable): Coroutine function returning the next chunk, or `b""` at the end.
+        expected_sha256 (str, optional): Digest the file must have.
+
+    Raises:
+        HTTPException: If the file is not valid UTF-8 text, has a record longer
+            than `MAX_RECORD_SIZE` or does not match `expected_sha256`.
+
+    Returns:
+        dict: Confirmation message of successful upload with the file metadata.
+    """
+    db_entry = CSVData(user_id=user_id, rows_stored=ingest == "rows")
+    ingestor = None
+    if ingest == "rows":
+        # The rows reference the entry, so its ID is needed before parsing.
+        db.add(db_entry)
+        await db.flush()
+        ingestor = RowIngestor(db_entry.id)
+
+    writer = blob_store.writer()
+    parser = CSVStreamParser()
+    pooled = False
+
+    def consume(chunk):
+        writer.write(chunk)
+        return [] if pooled else parser.feed(chunk)
+
+    try:
+        while chunk := await read():
+            rows = await run_in_threadpool(consume, chunk)
+            if ingestor is not None:
+                await db.run_sync(ingestor.add, rows)
+            pooled = pooled or parallel_parser.pooled(writer.size)
+        if pooled:
+            await run_in_threadpool(writer.flush)
+            header, row_count = await parse_in_pool(db, writer.temp_path, ingestor, parser.row_count)
+        else:
+            rows = await run_in_threadpool(parser.close)
+            if ingestor is not None:
+                await db.run_sync(ingestor.add, rows)
+            header, row_count = parser.header, parser.row_count
+        if ingestor is not None:
+            await db.run_sync(ingestor.flush)
+        sha256 = writer.commit(expected_sha256)
+    except UnicodeDecodeError:
+        writer.abort()
+        await db.rollback()
+        raise HTTPException(status_code=400, detail="File is not valid UTF-8 text")
+    except ValueError as error:
+        writer.abort()
+        await db.rollback()
+        raise HTTPException(status_code=400, detail=str(error))
+    except BaseException:
+        writer.abort()
+        await db.rollback()
+        raise
+
+    db_entry.sha256 = sha256
+    db_entry.size = writer.size
+    db_entry.row_count = row_count
+    db_entry.header = json.dumps(header or [])
+    db.add(db_entry)
+    await db.commit()
+    return {
+        "message": "File uploaded successfully",
+        "id": db_entry.id,
+        "sha256": sha256,
+        "size": writer.size,
+        "row_count": row_count,
+    }
+
+
+async def parse_in_pool(db, path, ingestor, skip):
+    """
+    Parses a written upload in the process pool of `parallel_parser`.
+
+    Ranges of the file are parsed by the workers and their results are
+    awaited in file order, so the event loop is never blocked.
+
+    Args:
+        db (AsyncSession): Database session.
+        path (str): The written file.
+        ingestor (RowIngestor, optional): Receives the rows in the `rows` mode.
+        skip (int): Number of leading rows the ingestor already received from
+            the incremental parser.
+
+    Raises:
+        UnicodeDecodeError: If the file is not valid UTF-8 text.
+        ValueError: If the file has a record longer than `MAX_RECORD_SIZE`.
+
+    Returns:
+        tuple[list[str] | None, int]: The header and the number of data rows.
     """
-    db = SessionLocal()
+    header, results = await run_in_threadpool(parallel_parser.parse_file, path, ingestor is not None)
+    row_count = 0
     try:
-        yield db
+        while (result := await run_in_threadpool(next, results, None)) is not None:
+            if ingestor is None:
+                row_count += result
+                continue
+            row_count += len(result)
+            if skip:
+                result, skip = result[skip:], max(0, skip - len(result))
+            await db.run_sync(ingestor.add, result)
     finally:
-        db.close()
+        results.close()
+    return header, row_count
 
 
 @router.post("/upload")
-async def upload_file(user_id: int, file: UploadFile = File(...), db: Session = Depends(get_db)):
+async def upload_file(
+    user_id: int,
+    file: UploadFile = File(...),
+    ingest: Literal["blob", "rows"] = Query("blob"),
+    db: AsyncSession = Depends(get_db),
+):
     """
-    Endpoint to upload a CSV file and store its content in the database.
+    Endpoint to upload a CSV file and store it in the blob store.
+
+    The file is read in chunks of `CHUNK_SIZE` bytes and stored by
+    `store_upload`, so memory use per upload does not depend on the file size.
     
     Args:
         user_id (int): ID of the user uploading the file.
         file (UploadFile): The uploaded CSV file.
-        db (Session): Database session dependency.
+        ingest (str): `"blob"` (default) to store the file only, `"rows"` to
+            also store its rows.
+        db (AsyncSession): Database session dependency.
+
+    Raises:
+        HTTPException: If the file is not valid UTF-8 text.
     
     Returns:
-        dict: Confirmation message of successful upload.
+        dict: Confirmation message of successful upload with the file metadata.
     """
-    content = await file.read()
-    db_entry = CSVData(user_id=user_id, content=content.decode())
-    db.add(db_entry)
-    db.commit()
-    return {"message": "File uploaded successfully"}
+    return await store_upload(db, user_id, ingest, lambda: file.read(CHUNK_SIZE))
+
+
+def render_upload_session(upload, received):
+    """
+    Describes an upload session and the chunks it still needs.
+
+    Args:
+        upload (UploadSession): The session.
+        received (Iterable[int]): Offsets of the received chunks.
+
+    Returns:
+        dict: The session with the offsets of its `missing` chunks.
+    """
+    received = set(received)
+    return {
+        "upload_id": upload.id,
+        "size": upload.size,
+        "chunk_size": upload.chunk_size,
+        "missing": [offset for offset in chunk_offsets(upload.size, upload.chunk_size) if offset not in received],
+    }
+
+
+async def get_upload_session(db, upload_id):
+    """
+    Raises:
+        HTTPException: If the session is not found.
+
+    Returns:
+        UploadSession: The upload session.
+    """
+    upload = await db.get(UploadSession, upload_id)
+    if not upload:
+        raise HTTPException(status_code=404, detail="Upload session not found")
+    return upload
+
+
+async def received_offsets(db, upload_id):
+    """
+    Returns:
+        ScalarResult[int]: Offsets of the chunks received by the session.
+    """
+    return await db.scalars(select(UploadChunk.offset).where(UploadChunk.upload_id == upload_id))
+
+
+@router.post("/uploads")
+async def create_upload_session(
+    user_id: int,
+    size: int = Query(..., ge=0, le=MAX_UPLOAD_SIZE),
+    chunk_size: int = Query(UPLOAD_CHUNK_SIZE, ge=1, le=MAX_UPLOAD_CHUNK_SIZE),
+    ingest: Literal["blob", "rows"] = Query("blob"),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Endpoint to start a chunked, resumable upload of a CSV file.
+
+    The file is then sent in chunks of `chunk_size` bytes (the last one may
+    be shorter) with `PUT /files/uploads/{upload_id}?offset=...`, in any
+    order and in parallel, and stored with
+    `POST /files/uploads/{upload_id}/complete`. Chunks are written straight
+    to a part file on disk, so memory use per session does not depend on
+    the file size. After an interruption, `GET /files/uploads/{upload_id}`
+    lists the chunks still missing.
+
+    Args:
+        user_id (int): ID of the user uploading the file.
+        size (int): File size in bytes, at most `MAX_UPLOAD_SIZE`.
+        chunk_size (int): Size of the chunks; defaults to `UPLOAD_CHUNK_SIZE`.
+        ingest (str): `"blob"` (default) or `"rows"`, like in `upload_file`.
+        db (AsyncSession): Database session dependency.
+
+    Returns:
+        dict: The new session with the offsets of its `missing` chunks.
+    """
+    upload = UploadSession(id=uuid.uuid4().hex, user_id=user_id, size=size, chunk_size=chunk_size, ingest=ingest)
+    await run_in_threadpool(upload_store.create, upload.id, size)
+    db.add(upload)
+    await db.commit()
+    return render_upload_session(upload, ())
+
+
+@router.get("/uploads/{upload_id}")
+async def get_upload_status(upload_id: str, db: AsyncSession = Depends(get_db)):
+    """
+    Endpoint to return the state of an upload session.
+
+    Args:
+        upload_id (str): ID of the session.
+        db (AsyncSession): Database session dependency.
+
+    Raises:
+        HTTPException: If the session is not found.
+
+    Returns:
+        dict: The session with the offsets of its `missing` chunks.
+    """
+    upload = await get_upload_session(db, upload_id)
+    return render_upload_session(upload, await received_offsets(db, upload_id))
+
+
+@router.put("/uploads/{upload_id}")
+async def upload_chunk(
+    request: Request,
+    upload_id: str,
+    offset: int = Query(..., ge=0),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Endpoint to receive one chunk of an upload session as the raw request body.
+
+    The body is written to the part file at `offset` as it arrives. Sending
+    a chunk again overwrites it, so failed chunks can simply be retried.
+
+    Args:
+        request (Request): The current request, whose body is the chunk.
+        upload_id (str): ID of the session.
+        offset (int): Position of the chunk; a multiple of the session's chunk size.
+        db (AsyncSession): Database session dependency.
+
+    Raises:
+        HTTPException: If the session is not found, the offset is not a chunk
+            offset or the body does not have the size of the chunk.
+
+    Returns:
+        dict: The offset and size of the received chunk.
+    """
+    upload = await get_upload_session(db, upload_id)
+    if offset % upload.chunk_size or offset >= upload.size:
+        raise HTTPException(status_code=400, detail="Offset is not the start of a chunk")
+    length = min(upload.chunk_size, upload.size - offset)
+    if not await upload_store.write(upload_id, offset, length, request.stream()):
+        raise HTTPException(status_code=400, detail=f"Chunk at offset {offset} must be {length} bytes")
+    if await db.get(UploadChunk, (upload_id, offset)) is None:
+        db.add(UploadChunk(upload_id=upload_id, offset=offset))
+        try:
+            await db.commit()
+        except IntegrityError:
+            # The same chunk was received concurrently.
+            await db.rollback()
+    return {"offset": offset, "size": length}
+
+
+@router.post("/uploads/{upload_id}/complete")
+async def complete_upload(upload_id: str, sha256: str, db: AsyncSession = Depends(get_db)):
+    """
+    Endpoint to store the file of an upload session once all its chunks are received.
+
+    The part file is read back in chunks of `CHUNK_SIZE` bytes and stored
+    like a single-shot upload by `store_upload`; then the session is deleted.
+
+    Args:
+        upload_id (str): ID of the session.
+        sha256 (str): Hex SHA-256 digest of the whole file, checked before it is stored.
+        db (AsyncSession): Database session dependency.
+
+    Raises:
+        HTTPException: If the session is not found, chunks are missing, the
+            checksum does not match or the file is not valid UTF-8 text.
+
+    Returns:
+        dict: Confirmation message of successful upload with the file metadata.
+    """
+    upload = await get_upload_session(db, upload_id)
+    missing = render_upload_session(upload, await received_offsets(db, upload_id))["missing"]
+    if missing:
+        raise HTTPException(status_code=409, detail=f"{len(missing)} chunks are missing")
+    user_id, ingest = upload.user_id, upload.ingest
+
+    with upload_store.open(upload_id) as part:
+        result = await store_upload(
+            db, user_id, ingest, lambda: run_in_threadpool(part.read, CHUNK_SIZE), expected_sha256=sha256,
+        )
+    await db.execute(delete(UploadChunk).where(UploadChunk.upload_id == upload_id))
+    await db.execute(delete(UploadSession).where(UploadSession.id == upload_id))
+    await db.commit()
+    await run_in_threadpool(upload_store.remove, upload_id)
+    return result
+
+
+@router.delete("/uploads/{upload_id}")
+async def delete_upload_session(upload_id: str, db: AsyncSession = Depends(get_db)):
+    """
+    Endpoint to abandon an upload session and delete its part file.
+
+    Args:
+        upload_id (str): ID of the session.
+        db (AsyncSession): Database session dependency.
+
+    Raises:
+        HTTPException: If the session is not found.
+
+    Returns:
+        dict: Confirmation message.
+    """
+    await get_upload_session(db, upload_id)
+    await db.execute(delete(UploadChunk).where(UploadChunk.upload_id == upload_id))
+    await db.execute(delete(UploadSession).where(UploadSession.id == upload_id))
+    await db.commit()
+    await run_in_threadpool(upload_store.remove, upload_id)
+    return {"message": "Upload session deleted"}
+
+
+def render_csv(content, format):
+    """
+    Parses CSV content into the requested JSON representation.
+
+    Args:
+        content (str): The CSV content.
+        format (str): `"rows"` for a list of row dictionaries, `"columnar"` for
+            typed columns with dictionary-encoded strings.
+
+    Returns:
+        list[dict] | dict: Parsed representation of the CSV content.
+    """
+    if format == "columnar":
+        return parse_csv_columnar(content.strip()).to_json()
+    return parse_csv(content)
+
+
+def serialize_csv(content, format):
+    """
+    Parses CSV content and serializes the result as JSON.
+
+    Large inputs in the `rows` format are parsed and serialized in the
+    process pool of `parallel_parser`, so they do not hold the server's GIL.
+
+    Args:
+        content (str): The CSV content.
+        format (str): `"rows"` or `"columnar"`, see `render_csv`.
+
+    Returns:
+        bytes: The JSON document.
+    """
+    if format == "rows":
+        return parallel_parser.serialize(content)
+    return json.dumps(render_csv(content, format), separators=(",", ":"), ensure_ascii=False).encode()
+
+
+async def cached_json_response(request, key, produce):
+    """
+    Returns a parse result from `parse_cache`, producing it on a miss.
+
+    The cache key is sent as the ETag. If the request's `If-None-Match`
+    already names it, 304 Not Modified is returned without looking at the
+    cache or parsing anything.
+
+    Args:
+        request (Request): The current request.
+        key (str): Key from `ParseCache.key`.
+        produce (callable): Returns the serialized result; run in the threadpool on a miss.
+
+    Returns:
+        Response: The JSON result or an empty 304 response.
+    """
+    etag = f'"{key}"'
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        parse_cache.record_not_modified()
+        return Response(status_code=304, headers={"ETag": etag})
+    body = parse_cache.get(key)
+    if body is None:
+        body = await run_in_threadpool(produce)
+        parse_cache.put(key, body)
+    return Response(body, media_type="application/json", headers={"ETag": etag})
 
 
 @router.get("/json/{string}")
-def get_json(string: str):
+async def get_json(request: Request, string: str, format: Literal["rows", "columnar"] = Query("rows")):
     """
     Endpoint to process a CSV string and return parsed JSON data.
+
+    Results are cached by a hash of the string and sent with an ETag, so
+    polling clients can use `If-None-Match` to get 304 Not Modified.
     
     Args:
+        request (Request): The current request.
         string (str): The CSV string to be parsed.
+        format (str): `"rows"` (default) or `"columnar"`.
     
     Returns:
-        dict: Parsed JSON representation of the CSV string.
+        Response: Parsed JSON representation of the CSV string.
+    """
+    key = parse_cache.key(string.encode(), format)
+    return await cached_json_response(request, key, lambda: serialize_csv(string, format))
+
+
+@router.get("/{file_id}/json")
+async def get_file_json(
+    request: Request,
+    file_id: int,
+    format: Literal["rows", "columnar"] = Query("rows"),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Endpoint to return a stored CSV upload as parsed JSON data.
+
+    Results are cached like in `get_json`, keyed by the blob hash of the
+    upload. Stored entries never change and a blob is named by its content,
+    so the cached result of a key is always current; uploads of the same
+    content share it.
+
+    Args:
+        request (Request): The current request.
+        file_id (int): ID of the stored CSV entry.
+        format (str): `"rows"` (default) or `"columnar"`.
+        db (AsyncSession): Database session dependency.
+
+    Raises:
+        HTTPException: If the file is not found.
+
+    Returns:
+        Response: Parsed JSON representation of the stored CSV file.
+    """
+    entry = await db.get(CSVData, file_id)
+    if not entry:
+        raise HTTPException(status_code=404, detail="File not found")
+    # Older entries without a blob are keyed by their content.
+    source = f"blob:{entry.sha256}".encode() if entry.sha256 else entry.content.encode()
+    key = parse_cache.key(source, format)
+    # Reading the blob and parsing it are blocking, so they run in the threadpool.
+    return await cached_json_response(request, key, lambda: serialize_csv(load_csv_content(entry), format))
+
+
+@router.get("/{file_id}/rows")
+async def get_file_rows(
+    file_id: int,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Endpoint to return a range of rows of a stored CSV upload.
+
+    Only uploads ingested in the `rows` mode can be read this way; the range
+    is looked up by the row number index, without loading the whole file.
+
+    Args:
+        file_id (int): ID of the stored CSV entry.
+        offset (int): Number of the first row, starting at 0.
+        limit (int): Maximum number of rows to return.
+        db (AsyncSession): Database session dependency.
+
+    Raises:
+        HTTPException: If the file is not found or its rows are not stored.
+
+    Returns:
+        list[dict[str, str]]: The requested rows.
     """
-    return parse_csv(string)
+    entry = await db.get(CSVData, file_id)
+    if not entry:
+        raise HTTPException(status_code=404, detail="File not found")
+    if not entry.rows_stored:
+        raise HTTPException(status_code=409, detail="Rows of this file are not stored; upload it with ingest=rows")
+    data = await db.scalars(
+        select(CSVRow.data)
+        .where(CSVRow.csv_id == file_id, CSVRow.row_number >= offset)
+        .order_by(CSVRow.row_number)
+        .limit(limit)
+    )
+    return [json.loads(row) for row in data]
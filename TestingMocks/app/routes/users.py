@@ -1,78 +1,374 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from app.database import SessionLocal
+import asyncio
+import json
+from typing import Any, Literal
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.blob_store import load_csv_content
+from app.database import AsyncSessionLocal
+from app.db_session import get_db
 from app.models import User, CSVData
-from app.schemas import UserCreate
-import hashlib
+from app.pagination import (
+    DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, NEXT_CURSOR_HEADER, STREAM_BATCH_SIZE,
+    decode_cursor, encode_cursor, ndjson_line, parse_fields,
+)
+from app.passwords import passwords
+from app.schemas import UserCreate, UserLogin
 
 router = APIRouter()
 
+# Number of users registered in one transaction by the bulk endpoint.
+REGISTER_BATCH_SIZE = 500
 
-def get_db():
-    """
-    Dependency to get a database session.
-    
-    Yields:
-        Session: SQLAlchemy database session.
-    """
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+# Content types read as newline-delimited JSON by the bulk endpoint.
+NDJSON_CONTENT_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+
+# INSERT constructs that support ON CONFLICT DO NOTHING, by dialect.
+UPSERT_INSERTS = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}
 
 
 @router.post("/register")
-def register_user(user: UserCreate, db: Session = Depends(get_db)):
+async def register_user(user: UserCreate, db: AsyncSession = Depends(get_db)):
     """
     Endpoint to register a new user with a hashed password.
     
     Args:
         user (UserCreate): User registration data.
-        db (Session): Database session dependency.
+        db (AsyncSession): Database session dependency.
     
     Returns:
         dict: Confirmation message of successful registration.
     """
-    hashed_password = hashlib.sha256(user.password.encode()).hexdigest()
+    # Hashing runs in the password hashing pool, off the event loop.
+    hashed_password = await passwords.hash_async(user.password)
     db_user = User(username=user.username, password=hashed_password)
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
     return {"message": "User registered successfully"}
 
+
+async def _iter_ndjson(request):
+    """
+    Reads a request body as newline-delimited JSON without loading it whole.
+
+    Yields:
+        bytes: One non-empty line per item.
+    """
+    buffer = b""
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield line
+    if buffer.strip():
+        yield buffer
+
+
+async def _register_batch(db, batch, parse):
+    """
+    Registers one batch of users in a single transaction.
+
+    Items that fail validation are reported as `invalid`. Usernames that are
+    already taken, or repeated within the request, are reported as
+    `conflict`. The remaining passwords are hashed in parallel in the
+    hashing pool and the users are inserted with one statement; the insert
+    skips usernames registered concurrently by other requests, which are
+    reported as conflicts too.
+
+    Args:
+        db (AsyncSession): Database session.
+        batch (list[tuple[int, Any]]): Items with their positions in the request.
+        parse (callable): Turns an item into a `UserCreate`.
+
+    Returns:
+        list[dict]: One result per item, in request order.
+    """
+    results = {}
+    valid = []
+    for index, item in batch:
+        try:
+            valid.append((index, parse(item)))
+        except ValidationError as error:
+            results[index] = {"index": index, "status": "invalid", "detail": error.errors()[0]["msg"]}
+
+    taken = set(await db.scalars(select(User.username).where(User.username.in_({user.username for _, user in valid}))))
+    fresh = []
+    for index, user in valid:
+        if user.username in taken:
+            results[index] = {"index": index, "username": user.username, "status": "conflict"}
+        else:
+            taken.add(user.username)
+            fresh.append((index, user))
+
+    if fresh:
+        hashes = await asyncio.gather(*(passwords.hash_async(user.password) for _, user in fresh))
+        table = User.__table__
+        insert = UPSERT_INSERTS[db.bind.dialect.name](table).on_conflict_do_nothing(index_elements=["username"])
+        inserted = await db.execute(
+            insert.returning(table.c.id, table.c.username),
+            [{"username": user.username, "password": hashed} for (_, user), hashed in zip(fresh, hashes)],
+        )
+        ids = {username: user_id for user_id, username in inserted}
+        await db.commit()
+        for index, user in fresh:
+            if user.username in ids:
+                results[index] = {"index": index, "username": user.username, "status": "created",
+                                  "id": ids[user.username]}
+            else:
+                results[index] = {"index": index, "username": user.username, "status": "conflict"}
+    return [results[index] for index, _ in batch]
+
+
+@router.post("/register/bulk")
+async def register_users_bulk(request: Request, db: AsyncSession = Depends(get_db)):
+    """
+    Endpoint to register many users in one request.
+
+    The body is either a JSON array of `UserCreate` objects or, with an NDJSON
+    content type (`application/x-ndjson`), one object per line; NDJSON
+    bodies are read incrementally. Users are registered in transactions of
+    `REGISTER_BATCH_SIZE`; a failed item does not affect the others.
+
+    Args:
+        request (Request): The request with the users in its body.
+        db (AsyncSession): Database session dependency.
+
+    Raises:
+        HTTPException: If a JSON body is not an array.
+
+    Returns:
+        dict: Counts of created, conflicting and invalid items, and one
+        result per item with its index, status and the ID of a created user.
+    """
+    if request.headers.get("content-type", "").split(";")[0].strip() in NDJSON_CONTENT_TYPES:
+        items = _iter_ndjson(request)
+        parse = UserCreate.model_validate_json
+    else:
+        try:
+            body = json.loads(await request.body())
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Body must be a JSON array or NDJSON")
+        if not isinstance(body, list):
+            raise HTTPException(status_code=400, detail="Body must be a JSON array or NDJSON")
+
+        async def iterate(body):
+            for item in body:
+                yield item
+        items = iterate(body)
+        parse = UserCreate.model_validate
+
+    results = []
+    batch = []
+    index = 0
+    async for item in items:
+        batch.append((index, item))
+        index += 1
+        if len(batch) >= REGISTER_BATCH_SIZE:
+            results.extend(await _register_batch(db, batch, parse))
+            batch = []
+    if batch:
+        results.extend(await _register_batch(db, batch, parse))
+
+    counts = {"created": 0, "conflict": 0, "invalid": 0}
+    for result in results:
+        counts[result["status"]] += 1
+    return {"created": counts["created"], "conflicts": counts["conflict"], "invalid": counts["invalid"],
+            "results": results}
+
+
+@router.post("/login")
+async def login_user(user: UserLogin, db: AsyncSession = Depends(get_db)):
+    """
+    Endpoint to check a user's credentials.
+
+    If the stored hash was made with an older algorithm or cost, it is
+    replaced with a hash made with the current settings.
+
+    Args:
+        user (UserLogin): User credentials.
+        db (AsyncSession): Database session dependency.
+
+    Raises:
+        HTTPException: If the username or the password is wrong.
+
+    Returns:
+        dict: Confirmation message with the ID of the user.
+    """
+    db_user = await db.scalar(select(User).where(User.username == user.username))
+    valid, new_hash = await passwords.verify_and_update_async(user.password, db_user.password if db_user else None)
+    if not valid:
+        raise HTTPException(status_code=401, detail="Invalid username or password")
+    if new_hash is not None:
+        db_user.password = new_hash
+        await db.commit()
+    return {"message": "Login successful", "id": db_user.id}
+
+
+def _page_query(columns, id_column, after_id, limit, *criteria):
+    """
+    Builds a keyset-paginated query ordered by ID.
+
+    Args:
+        columns (list): Columns to select; the ID column must be among them.
+        id_column (Column): Primary key the pages are ordered by.
+        after_id (int): ID of the last row of the previous page.
+        limit (int | None): Maximum number of rows, or `None` for all.
+        *criteria: Additional filter conditions.
+
+    Returns:
+        Select: The query.
+    """
+    query = select(*columns).where(id_column > after_id, *criteria).order_by(id_column)
+    if limit is not None:
+        query = query.limit(limit)
+    return query
+
+
+async def _paginated_response(db, query, limit, render, response, format):
+    """
+    Runs a paginated query in the requested response format.
+
+    In the `json` format one page is loaded and returned as a list; if the
+    page is full, the cursor of the next page is set in the `X-Next-Cursor`
+    header. In the `ndjson` format rows are streamed from the database in
+    batches of `STREAM_BATCH_SIZE` using a session owned by the stream.
+
+    Args:
+        db (AsyncSession): Database session used for JSON pages.
+        query (Select): Query built by `_page_query`.
+        limit (int | None): Page size requested by the caller.
+        render (callable): Coroutine function that turns a result row into a response item.
+        response (Response): Response used to set the cursor header.
+        format (str): `"json"` or `"ndjson"`.
+
+    Returns:
+        list[dict] | StreamingResponse: The page or the stream.
+    """
+    if format == "ndjson":
+        async def stream():
+            async with AsyncSessionLocal() as stream_db:
+                rows = await stream_db.stream(query.execution_options(yield_per=STREAM_BATCH_SIZE))
+                async for row in rows:
+                    yield ndjson_line(await render(row))
+        return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+    rows = (await db.execute(query)).all()
+    items = [await render(row) for row in rows]
+    if len(rows) == limit:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(rows[-1].id)
+    return items
+
+
+# Fields of a user that can be requested with `fields=`.
+USER_FIELDS = {"id": User.id, "username": User.username}
+
+
 @router.get("/", response_model=list[dict[str, str]])
-async def get_users(db: Session = Depends(get_db)):
+async def get_users(
+    response: Response,
+    limit: int | None = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = None,
+    format: Literal["json", "ndjson"] = Query("json"),
+    fields: str | None = None,
+    db: AsyncSession = Depends(get_db),
+):
     """
-    Endpoint to retrieve a list of all registered users.
+    Endpoint to retrieve registered users, one page at a time.
+
+    Users are ordered by ID and paginated with a cursor: pass the value of
+    the `X-Next-Cursor` response header as `cursor` to get the next page.
+    With `format=ndjson` all users after the cursor (or `limit` of them)
+    are streamed as newline-delimited JSON.
     
     Args:
-        db (Session): Database session dependency.
+        response (Response): Response used to set the cursor header.
+        limit (int, optional): Page size; `DEFAULT_PAGE_SIZE` for JSON pages.
+        cursor (str, optional): Cursor of the page to return.
+        format (str): `"json"` (default) or `"ndjson"`.
+        fields (str, optional): Comma-separated fields to return: `id`, `username`.
+        db (AsyncSession): Database session dependency.
     
     Returns:
         list[dict[str, str]]: List of user dictionaries containing username and ID.
     """
-    users = db.query(User).all()
-    return [{"username": user.username, "id": str(user.id)} for user in users]
-@router.get("/{user_id}/data", response_model=list[dict[str, str]])
+    names = parse_fields(fields, USER_FIELDS, ["username", "id"])
+    if limit is None and format == "json":
+        limit = DEFAULT_PAGE_SIZE
+    columns = [USER_FIELDS[name] for name in names if name != "id"] + [User.id]
+    query = _page_query(columns, User.id, decode_cursor(cursor), limit)
+
+    async def render(row):
+        return {name: str(getattr(row, name)) for name in names}
+    return await _paginated_response(db, query, limit, render, response, format)
+
 
-async def get_user_data(user_id: int, db: Session = Depends(get_db)):
+# Fields of a CSV entry that can be requested with `fields=`.
+CSV_DATA_FIELDS = ("id", "content", "sha256", "size", "row_count", "header")
+
+
+@router.get("/{user_id}/data", response_model=list[dict[str, Any]])
+async def get_user_data(
+    user_id: int,
+    response: Response,
+    limit: int | None = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = None,
+    format: Literal["json", "ndjson"] = Query("json"),
+    fields: str | None = None,
+    db: AsyncSession = Depends(get_db),
+):
     """
-    Endpoint to retrieve all CSV data entries associated with a specific user.
+    Endpoint to retrieve CSV data entries associated with a specific user,
+    one page at a time.
+
+    Pagination and formats work as in `get_users`. The file content is the
+    largest field; request e.g. `fields=id,size,row_count` to skip it.
     
     Args:
         user_id (int): ID of the user whose data is being retrieved.
-        db (Session): Database session dependency.
+        response (Response): Response used to set the cursor header.
+        limit (int, optional): Page size; `DEFAULT_PAGE_SIZE` for JSON pages.
+        cursor (str, optional): Cursor of the page to return.
+        format (str): `"json"` (default) or `"ndjson"`.
+        fields (str, optional): Comma-separated fields to return, from
+            `CSV_DATA_FIELDS`. Defaults to `id,content`.
+        db (AsyncSession): Database session dependency.
     
     Raises:
         HTTPException: If the user is not found.
     
     Returns:
-        list[dict[str, str]]: List of CSV data entries containing ID and content.
+        list[dict]: List of CSV data entries with the requested fields.
     """
-    user = db.query(User).filter(User.id == user_id).first()
+    names = parse_fields(fields, CSV_DATA_FIELDS, ["id", "content"])
+    user = await db.scalar(select(User.id).where(User.id == user_id))
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
-    data = db.query(CSVData).filter(CSVData.user_id == user_id).all()
-    return [{"id": str(entry.id), "content": entry.content} for entry in data]
\ No newline at end of file
+    if limit is None and format == "json":
+        limit = DEFAULT_PAGE_SIZE
+    selected = {"id", *names}
+    if "content" in selected:
+        # The content of streamed uploads is read from the blob store by its hash.
+        selected.add("sha256")
+    columns = [getattr(CSVData, name) for name in CSV_DATA_FIELDS if name in selected]
+    query = _page_query(columns, CSVData.id, decode_cursor(cursor), limit, CSVData.user_id == user_id)
+
+    async def render(row):
+        item = {}
+        for name in names:
+            if name == "id":
+                item["id"] = str(row.id)
+            elif name == "content":
+                # Only streamed uploads need a blob read, which is file I/O and runs in the threadpool.
+                item["content"] = row.content if row.content is not None else await run_in_threadpool(load_csv_content, row)
+            elif name == "header":
+                item["header"] = json.loads(row.header) if row.header else None
+            else:
+                item[name] = getattr(row, name)
+        return item
+    return await _paginated_response(db, query, limit, render, response, format)
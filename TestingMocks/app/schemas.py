@@ -15,6 +15,18 @@ class UserCreate(BaseModel):
     password: str
 
 
+class UserLogin(BaseModel):
+    """
+    Schema for checking a user's credentials.
+
+    Attributes:
+        username (str): The username of the user.
+        password (str): The password of the user account.
+    """
+    username: str
+    password: str
+
+
 class CSVDataResponse(BaseModel):
     """
     Schema for returning CSV data associated with a user.
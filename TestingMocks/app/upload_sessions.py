@@ -0,0 +1,121 @@
+import os
+from fastapi.concurrency import run_in_threadpool
+from app.blob_store import BLOB_STORE_DIR, CHUNK_SIZE
+
+
+# Chunk size of upload sessions when the client does not ask for one.
+UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+
+# Largest chunk size a client can ask for.
+MAX_UPLOAD_CHUNK_SIZE = 64 * 1024 * 1024
+
+# Largest file a client can start an upload session for; its part file is created at this size.
+MAX_UPLOAD_SIZE = 16 * 1024 * 1024 * 1024
+
+
+def chunk_offsets(size, chunk_size):
+    """
+    Lists the chunk offsets of a file.
+
+    Args:
+        size (int): File size in bytes.
+        chunk_size (int): Size of every chunk but the last one.
+
+    Returns:
+        range: Offsets of the chunks.
+    """
+    return range(0, size, chunk_size)
+
+
+class UploadStore:
+    """
+    Part files of chunked uploads on local disk.
+
+    The part file of a session is created at its final size, and every
+    chunk is written in place at its offset as it is received, so chunks
+    can arrive in any order and at most `CHUNK_SIZE` bytes of a chunk are
+    held in memory.
+
+    The methods do blocking file I/O; async routes call them through
+    `run_in_threadpool`, and `write` does so itself.
+    """
+    def __init__(self, directory=os.path.join(BLOB_STORE_DIR, "uploads")):
+        """
+        Args:
+            directory (str): Directory of the part files.
+        """
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, upload_id):
+        """
+        Returns:
+            str: Location of the part file of the session.
+        """
+        return os.path.join(self.directory, upload_id)
+
+    def create(self, upload_id, size):
+        """
+        Creates the part file of a session, sparse where the file system allows it.
+
+        Args:
+            upload_id (str): Identifier of the session.
+            size (int): File size in bytes.
+        """
+        with open(self.path(upload_id), "wb") as part:
+            part.truncate(size)
+
+    async def write(self, upload_id, offset, length, stream):
+        """
+        Writes a chunk at its offset as it is received.
+
+        Args:
+            upload_id (str): Identifier of the session.
+            offset (int): Position of the chunk in the file.
+            length (int): Expected chunk size.
+            stream (AsyncIterator[bytes]): The chunk data.
+
+        Received pieces are collected up to `CHUNK_SIZE` bytes and written
+        in the threadpool, so the event loop never waits for the disk.
+
+        Returns:
+            bool: Whether exactly `length` bytes were received. On `False`,
+            the region may be partly written and the chunk must be sent again.
+        """
+        written = 0
+        buffer = bytearray()
+        part = await run_in_threadpool(open, self.path(upload_id), "r+b")
+        try:
+            await run_in_threadpool(part.seek, offset)
+            async for piece in stream:
+                if written + len(buffer) + len(piece) > length:
+                    return False
+                buffer += piece
+                if len(buffer) >= CHUNK_SIZE:
+                    await run_in_threadpool(part.write, buffer)
+                    written += len(buffer)
+                    buffer = bytearray()
+            await run_in_threadpool(part.write, buffer)
+            written += len(buffer)
+        finally:
+            await run_in_threadpool(part.close)
+        return written == length
+
+    def open(self, upload_id):
+        """
+        Opens the part file of a session for reading.
+
+        Returns:
+            BinaryIO: The part file opened in binary mode.
+        """
+        return open(self.path(upload_id), "rb")
+
+    def remove(self, upload_id):
+        """
+        Deletes the part file of a session, if it exists.
+        """
+        if os.path.exists(self.path(upload_id)):
+            os.remove(self.path(upload_id))
+
+
+upload_store = UploadStore()
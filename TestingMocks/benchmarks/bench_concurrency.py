@@ -0,0 +1,143 @@
+"""
+Benchmark of API throughput under concurrent clients: requests per second.
+
+Starts the API under uvicorn in a subprocess on a copy of the database,
+then runs a fixed number of concurrent clients against it, one level at a
+time, and reports requests per second and p99 latency:
+
+    python benchmarks/bench_concurrency.py --concurrency 1 16 128 --duration 5
+
+The request mix alternates between a page of `/users` and a page of
+`/users/{user_id}/data`. Use `--url` to benchmark a server that is already
+running instead.
+"""
+import argparse
+import asyncio
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+APP_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(APP_DIR)
+
+
+def seed(directory, users, files_per_user):
+    """
+    Creates a database with users and uploads for the benchmark.
+
+    Args:
+        directory (str): Working directory of the server; `test.db` is created there.
+        users (int): Number of users.
+        files_per_user (int): Number of uploads of the first user.
+    """
+    code = (
+        "from app.database import Base, SessionLocal, engine\n"
+        "from app.models import CSVData, User\n"
+        "Base.metadata.create_all(bind=engine)\n"
+        "db = SessionLocal()\n"
+        f"db.add_all(User(username=f'user{{i}}', password='') for i in range({users}))\n"
+        f"db.add_all(CSVData(user_id=1, content='id,name\\n1,Test', size=15, row_count=1) for _ in range({files_per_user}))\n"
+        "db.commit()\n"
+    )
+    subprocess.run([sys.executable, "-c", code], cwd=directory, check=True,
+                   env={**os.environ, "PYTHONPATH": APP_DIR})
+
+
+async def client_loop(client, paths, deadline, latencies, errors):
+    """
+    Sends requests one after another until the deadline.
+
+    Latencies of successful requests are appended to `latencies`; failed
+    requests are counted in `errors["count"]`.
+    """
+    index = 0
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        try:
+            response = await client.get(paths[index % len(paths)])
+        except httpx.TimeoutException:
+            response = None
+        if response is not None and response.is_success:
+            latencies.append(time.perf_counter() - start)
+        else:
+            errors["count"] += 1
+        index += 1
+
+
+async def run_level(url, concurrency, duration, paths):
+    """
+    Runs `concurrency` clients for `duration` seconds.
+
+    Returns:
+        tuple[float, float, int]: Successful requests per second, their p99
+        latency in milliseconds and the number of failed requests.
+    """
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=60) as client:
+        latencies = []
+        errors = {"count": 0}
+        start = time.perf_counter()
+        deadline = start + duration
+        await asyncio.gather(*(client_loop(client, paths, deadline, latencies, errors) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+    latencies.sort()
+    p99 = latencies[int(len(latencies) * 0.99) - 1] * 1000 if latencies else 0.0
+    return len(latencies) / elapsed, p99, errors["count"]
+
+
+def wait_for_server(url, timeout=30):
+    """
+    Waits until the server answers on its root endpoint.
+    """
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(url + "/")
+            return
+        except httpx.TransportError:
+            time.sleep(0.2)
+    raise RuntimeError(f"Server at {url} did not start")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 16, 128])
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--files", type=int, default=200)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--url", help="benchmark a running server instead of starting one")
+    args = parser.parse_args()
+
+    paths = ["/users/?limit=50", "/users/1/data?limit=50"]
+    directory = None
+    server = None
+    url = args.url
+    if url is None:
+        directory = tempfile.mkdtemp()
+        seed(directory, args.users, args.files)
+        url = f"http://127.0.0.1:{args.port}"
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(args.port), "--log-level", "warning"],
+            cwd=directory, env={**os.environ, "PYTHONPATH": APP_DIR}, stderr=subprocess.DEVNULL,
+        )
+    try:
+        wait_for_server(url)
+        for concurrency in args.concurrency:
+            rps, p99, errors = asyncio.run(run_level(url, concurrency, args.duration, paths))
+            print(f"concurrency {concurrency:>4} {rps:10.0f} req/sec  p99 {p99:8.1f} ms  {errors:6d} errors")
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+        if directory is not None:
+            shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    main()
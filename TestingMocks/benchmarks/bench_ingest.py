@@ -0,0 +1,111 @@
+"""
+Benchmark of CSV row ingestion into SQLite: rows per second.
+
+Generates rows like the ones produced by the upload parser and stores them
+in the `csv_rows` table of a fresh database file in two ways:
+
+    orm           one ORM object per row, `session.add` and a single commit
+    executemany   `RowIngestor`: batched Core inserts in a single transaction
+
+Usage:
+    python benchmarks/bench_ingest.py --rows 200000 --batch-size 5000
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.database import Base
+from app.ingest import RowIngestor
+from app.models import CSVData, CSVRow, User
+
+
+def generate_rows(count):
+    """
+    Args:
+        count (int): Number of rows.
+
+    Returns:
+        list[dict[str, str]]: Parsed CSV rows.
+    """
+    return [
+        {"id": str(i), "name": f"user{i}", "city": f"City {i % 97}", "score": str(i % 1000 / 10)}
+        for i in range(count)
+    ]
+
+
+def ingest_orm(db, csv_id, rows):
+    """
+    Stores every row as an ORM object and commits once.
+    """
+    for row_number, row in enumerate(rows):
+        db.add(CSVRow(csv_id=csv_id, row_number=row_number, data=json.dumps(row)))
+    db.commit()
+
+
+def ingest_executemany(db, csv_id, rows, batch_size):
+    """
+    Stores the rows with `RowIngestor` and commits once.
+    """
+    ingestor = RowIngestor(csv_id, batch_size=batch_size)
+    ingestor.add(db, rows)
+    ingestor.flush(db)
+    db.commit()
+
+
+def run_mode(mode, rows, batch_size):
+    """
+    Ingests the rows into a new database file.
+
+    Args:
+        mode (str): ``"orm"`` or ``"executemany"``.
+        rows (list[dict[str, str]]): Rows to store.
+        batch_size (int): Rows per insert in the ``executemany`` mode.
+
+    Returns:
+        float: Elapsed seconds.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(f"sqlite:///{os.path.join(directory, 'bench.db')}")
+        Base.metadata.create_all(bind=engine)
+        db = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+        user = User(username="bench", password="")
+        db.add(user)
+        db.flush()
+        entry = CSVData(user_id=user.id, rows_stored=True)
+        db.add(entry)
+        db.commit()
+
+        start = time.perf_counter()
+        if mode == "orm":
+            ingest_orm(db, entry.id, rows)
+        else:
+            ingest_executemany(db, entry.id, rows, batch_size)
+        elapsed = time.perf_counter() - start
+
+        assert db.query(CSVRow).count() == len(rows)
+        db.close()
+        engine.dispose()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--batch-size", type=int, default=5000)
+    args = parser.parse_args()
+
+    rows = generate_rows(args.rows)
+    for mode in ("orm", "executemany"):
+        elapsed = run_mode(mode, rows, args.batch_size)
+        print(f"{mode:<12} {len(rows) / elapsed:12.0f} rows/sec")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+Benchmark of process-pool CSV parsing: throughput by number of workers.
+
+Generates a CSV file of the requested size and parses and serializes it to
+JSON with `ParallelParser.serialize`, the path used by `/files/{id}/json`,
+once per worker count. One worker means the inline path.
+
+Usage:
+    python benchmarks/bench_parallel_parse.py --size-mb 300 --workers 1 2 4 8
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.parallel_parse import ParallelParser
+from bench_parse_csv import generate_csv
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size-mb", type=int, default=300)
+    parser.add_argument("--workers", type=int, nargs="+", default=sorted({1, 2, 4, os.cpu_count() or 1}))
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "bench.csv")
+        generate_csv(path, args.size_mb)
+        with open(path, newline="") as file:
+            text = file.read()
+    size_mb = len(text) / 1024 / 1024
+    print(f"input: {size_mb:.0f} MB, {os.cpu_count()} CPUs")
+
+    for workers in args.workers:
+        parallel = ParallelParser(workers=workers, threshold=0)
+        if workers > 1:
+            # Start the worker processes before timing.
+            list(parallel.executor.map(abs, range(workers)))
+        start = time.perf_counter()
+        parallel.serialize(text)
+        elapsed = time.perf_counter() - start
+        parallel.shutdown()
+        print(f"workers {workers:>3} {size_mb / elapsed:8.1f} MB/sec {elapsed:8.2f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Benchmark of CSV parsing: peak memory and rows per second.
+
+Generates a CSV file of the requested size and parses it in separate
+processes, so the peak RSS of every mode is measured independently:
+
+    parse_csv     the whole file read into a string, parsed into a list
+    iter_csv      rows streamed from the open file and discarded
+
+Usage:
+    python benchmarks/bench_parse_csv.py --size-mb 100
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.parse_csv import iter_csv, parse_csv
+
+
+def generate_csv(path, size_mb):
+    """
+    Writes a CSV file with a header and rows until it reaches the given size.
+
+    Args:
+        path (str): Destination file.
+        size_mb (int): Approximate size in megabytes.
+    """
+    target = size_mb * 1024 * 1024
+    with open(path, "w", newline="") as file:
+        file.write("id,name,city,score,comment\n")
+        written = 0
+        row = 0
+        while written < target:
+            lines = "".join(
+                f'{i},user{i},City {i % 97},{i % 1000 / 10},"note, with comma {i}"\n'
+                for i in range(row, row + 10000)
+            )
+            file.write(lines)
+            written += len(lines)
+            row += 10000
+
+
+def run_mode(mode, path):
+    """
+    Parses the file in the current process.
+
+    Args:
+        mode (str): ``"parse_csv"`` or ``"iter_csv"``.
+        path (str): CSV file.
+
+    Returns:
+        dict: Rows, elapsed seconds and peak RSS in megabytes.
+    """
+    start = time.perf_counter()
+    if mode == "parse_csv":
+        with open(path) as file:
+            rows = len(parse_csv(file.read()))
+    else:
+        rows = 0
+        with open(path, "rb") as file:
+            for _ in iter_csv(file):
+                rows += 1
+    elapsed = time.perf_counter() - start
+    # ru_maxrss is reported in kilobytes on Linux.
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return {"rows": rows, "seconds": elapsed, "peak_mb": peak_mb}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size-mb", type=int, default=100)
+    parser.add_argument("--worker", nargs=2, metavar=("MODE", "PATH"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_mode(*args.worker)))
+        return
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "bench.csv")
+        generate_csv(path, args.size_mb)
+        print(f"input: {os.path.getsize(path) / 1024 / 1024:.0f} MB")
+        for mode in ("parse_csv", "iter_csv"):
+            output = subprocess.run(
+                [sys.executable, __file__, "--worker", mode, path],
+                check=True, capture_output=True, text=True,
+            ).stdout
+            result = json.loads(output)
+            print(
+                f"{mode:<10} {result['rows'] / result['seconds']:12.0f} rows/sec"
+                f" {result['peak_mb']:10.1f} MB peak RSS"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Benchmark of SQLite engine profiles under a mixed read/write workload.
+
+For every profile in `SQLITE_PROFILES` a fresh database file is created and
+reader and writer threads run against it for a fixed time:
+
+    readers   read a page of `csv_data` entries of a user, like `/users/{id}/data`
+    writers   insert an upload entry and commit, like `/files/upload`
+
+Reported are reads and writes per second and the number of operations that
+failed with "database is locked".
+
+Usage:
+    python benchmarks/bench_sqlite_profile.py --readers 8 --writers 2 --duration 5
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from sqlalchemy import select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+from app.database import SQLITE_PROFILES, Base, create_db_engine
+from app.models import CSVData, User
+
+
+def seed(Session, files):
+    """
+    Creates a user with `files` uploads.
+    """
+    with Session() as db:
+        db.add(User(username="bench", password=""))
+        db.flush()
+        db.add_all(CSVData(user_id=1, content="id,name\n1,Test", size=15, row_count=1) for _ in range(files))
+        db.commit()
+
+
+def reader(Session, deadline, counts):
+    """
+    Reads pages of uploads until the deadline.
+    """
+    while time.perf_counter() < deadline:
+        try:
+            with Session() as db:
+                db.execute(
+                    select(CSVData.id, CSVData.size).where(CSVData.user_id == 1).order_by(CSVData.id.desc()).limit(50)
+                ).all()
+            counts["reads"] += 1
+        except OperationalError:
+            counts["errors"] += 1
+
+
+def writer(Session, deadline, counts):
+    """
+    Inserts uploads one transaction at a time until the deadline.
+    """
+    while time.perf_counter() < deadline:
+        try:
+            with Session() as db:
+                db.add(CSVData(user_id=1, content="id,name\n1,Test", size=15, row_count=1))
+                db.commit()
+            counts["writes"] += 1
+        except OperationalError:
+            counts["errors"] += 1
+
+
+def run_profile(profile, readers, writers, duration, files):
+    """
+    Runs the workload against a new database with the given profile.
+
+    Returns:
+        dict: Reads, writes and errors counted during the run.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_db_engine(f"sqlite:///{os.path.join(directory, 'bench.db')}", profile)
+        Base.metadata.create_all(bind=engine)
+        Session = sessionmaker(bind=engine)
+        seed(Session, files)
+
+        # Every thread has its own counters; they are summed after the run.
+        targets = [reader] * readers + [writer] * writers
+        thread_counts = [{"reads": 0, "writes": 0, "errors": 0} for _ in targets]
+        deadline = time.perf_counter() + duration
+        threads = [
+            threading.Thread(target=target, args=(Session, deadline, counts))
+            for target, counts in zip(targets, thread_counts)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        engine.dispose()
+    return {key: sum(counts[key] for counts in thread_counts) for key in ("reads", "writes", "errors")}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--files", type=int, default=10000)
+    args = parser.parse_args()
+
+    for profile in SQLITE_PROFILES:
+        counts = run_profile(profile, args.readers, args.writers, args.duration, args.files)
+        print(
+            f"{profile:<8} {counts['reads'] / args.duration:10.0f} reads/sec"
+            f" {counts['writes'] / args.duration:10.0f} writes/sec {counts['errors']:6d} locked"
+        )
+
+
+if __name__ == "__main__":
+    main()
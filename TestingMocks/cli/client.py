@@ -1,8 +1,34 @@
+import argparse
+import glob
+import hashlib
+import json
+import os
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import requests
+from requests.adapters import HTTPAdapter
 
 # Base URL of the FastAPI server
 BASE_URL = "http://127.0.0.1:8000"
 
+# Response statuses of failures worth retrying.
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# File name of the manifest of completed uploads.
+MANIFEST_NAME = ".upload_manifest.json"
+
+# File name of the record of unfinished chunked uploads.
+SESSIONS_NAME = ".upload_sessions.json"
+
+# Size of the blocks files are hashed in.
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# Default chunk size of chunked uploads.
+UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+
 def register():
     """
     Registers a new user by sending a POST request to the API.
@@ -55,17 +81,407 @@ def upload():
             f"{BASE_URL}/files/upload", files={"file": file}, data={"user_id": user_id})
     print(response.json())
 
+def make_session(pool_size):
+    """
+    Creates a session whose connection pool is shared by concurrent uploads.
+
+    Args:
+        pool_size (int): Maximum number of kept-alive connections to the server.
+
+    Returns:
+        requests.Session: The session.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+def find_files(source):
+    """
+    Lists the files to upload.
+
+    Args:
+        source (str): A directory, whose `*.csv` files are taken, or a glob pattern.
+
+    Returns:
+        list[str]: Paths of the files, sorted.
+    """
+    pattern = os.path.join(source, "*.csv") if os.path.isdir(source) else source
+    return sorted(path for path in glob.glob(pattern, recursive=True) if os.path.isfile(path))
+
+def file_sha256(path):
+    """
+    Args:
+        path (str): Path of a file.
+
+    Returns:
+        str: Hex SHA-256 digest of the file content.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        while block := file.read(HASH_CHUNK_SIZE):
+            digest.update(block)
+    return digest.hexdigest()
+
+class UploadManifest:
+    """
+    Local record of completed uploads, keyed by the SHA-256 of the file content.
+
+    The manifest is rewritten after every completed upload, through a
+    temporary file, so an interrupted run loses no progress and never
+    leaves a truncated manifest.
+    """
+    def __init__(self, path):
+        """
+        Args:
+            path (str): Path of the manifest file; it is created if missing.
+        """
+        self.path = path
+        self.entries = {}
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as file:
+                self.entries = json.load(file)
+
+    def is_uploaded(self, sha256, user_id):
+        """
+        Returns:
+            bool: Whether content with this hash was uploaded for the user.
+        """
+        entry = self.entries.get(sha256)
+        return entry is not None and entry["user_id"] == user_id
+
+    def record(self, sha256, entry):
+        """
+        Records a completed upload and saves the manifest.
+
+        Args:
+            sha256 (str): Hash of the uploaded content.
+            entry (dict): Details of the upload, with the `user_id`.
+        """
+        with self._lock:
+            self.entries[sha256] = entry
+            self._save()
+
+    def forget(self, sha256):
+        """
+        Removes the entry of a hash, if any, and saves the manifest.
+
+        Args:
+            sha256 (str): Hash of the content.
+        """
+        with self._lock:
+            if self.entries.pop(sha256, None) is not None:
+                self._save()
+
+    def _save(self):
+        temporary = f"{self.path}.tmp"
+        with open(temporary, "w", encoding="utf-8") as file:
+            json.dump(self.entries, file, indent=2, sort_keys=True)
+        os.replace(temporary, self.path)
+
+class TransientUploadError(Exception):
+    """
+    An upload failure that may succeed when retried.
+    """
+
+def send_with_retries(send, retries=3, backoff=0.5):
+    """
+    Sends a request, retrying connection errors, timeouts and transient statuses.
+
+    Retries wait exponentially longer, with random jitter so that concurrent
+    uploads do not retry in lockstep. Other error statuses are not retried.
+
+    Args:
+        send (callable): Sends the request and returns the response; called once per attempt.
+        retries (int): Maximum number of retries.
+        backoff (float): Delay before the first retry, in seconds.
+
+    Raises:
+        TransientUploadError: If the last attempt failed with a transient error.
+        requests.HTTPError: If the server rejected the request.
+
+    Returns:
+        dict: The server's response.
+    """
+    for attempt in range(retries + 1):
+        if attempt:
+            time.sleep(backoff * 2 ** (attempt - 1) * random.uniform(0.5, 1.5))
+        try:
+            response = send()
+        except (requests.ConnectionError, requests.Timeout) as error:
+            failure = TransientUploadError(str(error))
+            continue
+        if response.status_code in RETRY_STATUSES:
+            failure = TransientUploadError(f"HTTP {response.status_code}")
+            continue
+        response.raise_for_status()
+        return response.json()
+    raise failure
+
+def upload_file_with_retries(session, path, user_id, retries=3, backoff=0.5, base_url=BASE_URL, timeout=300):
+    """
+    Uploads a file in one request, retried by `send_with_retries`.
+
+    Args:
+        session (requests.Session): The session to upload with.
+        path (str): Path of the file.
+        user_id (int): ID of the user who owns the file.
+        retries (int): Maximum number of retries.
+        backoff (float): Delay before the first retry, in seconds.
+        base_url (str): Base URL of the server.
+        timeout (float): Timeout of each attempt, in seconds.
+
+    Raises:
+        TransientUploadError: If the last attempt failed with a transient error.
+        requests.HTTPError: If the server rejected the file.
+
+    Returns:
+        dict: The server's response.
+    """
+    def send():
+        with open(path, "rb") as file:
+            return session.post(
+                f"{base_url}/files/upload", params={"user_id": user_id},
+                files={"file": (os.path.basename(path), file, "text/csv")}, timeout=timeout,
+            )
+
+    return send_with_retries(send, retries, backoff)
+
+def upload_file_chunked(
+    session, path, user_id, sessions, chunk_size=UPLOAD_CHUNK_SIZE, workers=4,
+    retries=3, backoff=0.5, base_url=BASE_URL, timeout=300, sha256=None,
+):
+    """
+    Uploads a file through a resumable upload session, in parallel chunks.
+
+    The session of every unfinished upload is kept in `sessions` under the
+    hash of the file. If the same file is uploaded again, for example after
+    an interruption, the server is asked which chunks it is missing and
+    only those are sent. Each chunk is read from disk when it is sent and
+    retried on its own.
+
+    Args:
+        session (requests.Session): The session to upload with.
+        path (str): Path of the file.
+        user_id (int): ID of the user who owns the file.
+        sessions (UploadManifest): Record of unfinished upload sessions.
+        chunk_size (int): Size of the chunks of a new session, in bytes.
+        workers (int): Maximum number of chunks sent at once.
+        retries (int): Maximum number of retries per request.
+        backoff (float): Delay before the first retry, in seconds.
+        base_url (str): Base URL of the server.
+        timeout (float): Timeout of each attempt, in seconds.
+        sha256 (str, optional): Hash of the file, if already known.
+
+    Raises:
+        TransientUploadError: If a request still failed with a transient error.
+        requests.HTTPError: If the server rejected a request.
+
+    Returns:
+        dict: The server's response to the completed upload.
+    """
+    sha256 = sha256 or file_sha256(path)
+    uploads_url = f"{base_url}/files/uploads"
+    state = None
+    entry = sessions.entries.get(sha256)
+    if entry is not None and entry["user_id"] == user_id:
+        try:
+            state = send_with_retries(
+                lambda: session.get(f"{uploads_url}/{entry['upload_id']}", timeout=timeout), retries, backoff,
+            )
+        except requests.HTTPError as error:
+            # The session expired or was completed; start a new one.
+            if error.response is None or error.response.status_code != 404:
+                raise
+    if state is None:
+        params = {"user_id": user_id, "size": os.path.getsize(path), "chunk_size": chunk_size}
+        state = send_with_retries(lambda: session.post(uploads_url, params=params, timeout=timeout), retries, backoff)
+        sessions.record(sha256, {"path": path, "user_id": user_id, "upload_id": state["upload_id"]})
+    upload_url = f"{uploads_url}/{state['upload_id']}"
+
+    def send_chunk(offset):
+        def send():
+            with open(path, "rb") as file:
+                file.seek(offset)
+                chunk = file.read(state["chunk_size"])
+            return session.put(
+                upload_url, params={"offset": offset}, data=chunk,
+                headers={"Content-Type": "application/octet-stream"}, timeout=timeout,
+            )
+
+        return send_with_retries(send, retries, backoff)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for future in as_completed([executor.submit(send_chunk, offset) for offset in state["missing"]]):
+            future.result()
+
+    result = send_with_retries(
+        lambda: session.post(f"{upload_url}/complete", params={"sha256": sha256}, timeout=timeout), retries, backoff,
+    )
+    sessions.forget(sha256)
+    return result
+
+def upload_dir(
+    source, user_id, workers=4, retries=3, backoff=0.5, manifest_path=None,
+    base_url=BASE_URL, session=None, chunk_size=None,
+):
+    """
+    Uploads a directory of CSV files, or the files matching a glob, concurrently.
+
+    Up to `workers` files are uploaded at once over one pooled session.
+    Files whose content is in the manifest for the user are skipped, so a
+    rerun only uploads what is left. With `chunk_size`, files larger than a
+    chunk are sent by `upload_file_chunked`, so an interrupted file resumes
+    where it stopped. A line is printed per file, with the throughput so far.
+
+    Args:
+        source (str): A directory or a glob pattern.
+        user_id (int): ID of the user who owns the files.
+        workers (int): Maximum number of concurrent uploads.
+        retries (int): Maximum number of retries per file.
+        backoff (float): Delay before the first retry, in seconds.
+        manifest_path (str, optional): Path of the manifest. Defaults to
+            `MANIFEST_NAME` in the directory, or in the working directory for a glob.
+        base_url (str): Base URL of the server.
+        session (requests.Session, optional): Session to upload with.
+        chunk_size (int, optional): Chunk size of chunked uploads, in bytes.
+            Unfinished sessions are kept in `SESSIONS_NAME` next to the manifest.
+
+    Returns:
+        dict: Numbers of `uploaded`, `skipped` and `failed` files and of uploaded `bytes`.
+    """
+    paths = find_files(source)
+    if manifest_path is None:
+        manifest_path = os.path.join(source if os.path.isdir(source) else ".", MANIFEST_NAME)
+    manifest = UploadManifest(manifest_path)
+    sessions = UploadManifest(os.path.join(os.path.dirname(manifest_path), SESSIONS_NAME))
+    session = session or make_session(workers)
+    summary = {"uploaded": 0, "skipped": 0, "failed": 0, "bytes": 0}
+    lock = threading.Lock()
+    start = time.perf_counter()
+
+    def report(status, path, detail=""):
+        with lock:
+            summary[status] += 1
+            done = summary["uploaded"] + summary["skipped"] + summary["failed"]
+            rate = summary["bytes"] / 1024 / 1024 / max(time.perf_counter() - start, 1e-9)
+            line = f"[{done}/{len(paths)}] {status:<8} {path}"
+            print(f"{line} {detail} ({rate:.1f} MB/s)" if detail else f"{line} ({rate:.1f} MB/s)")
+
+    def upload_one(path):
+        try:
+            sha256 = file_sha256(path)
+            if manifest.is_uploaded(sha256, user_id):
+                report("skipped", path)
+                return
+            if chunk_size and os.path.getsize(path) > chunk_size:
+                # Files are already uploaded in parallel, so their chunks are sent one at a time.
+                result = upload_file_chunked(
+                    session, path, user_id, sessions, chunk_size, workers=1,
+                    retries=retries, backoff=backoff, base_url=base_url, sha256=sha256,
+                )
+            else:
+                result = upload_file_with_retries(session, path, user_id, retries, backoff, base_url)
+        except (OSError, TransientUploadError, requests.HTTPError) as error:
+            report("failed", path, str(error))
+            return
+        size = os.path.getsize(path)
+        manifest.record(sha256, {"path": path, "user_id": user_id, "file_id": result.get("id"), "size": size})
+        with lock:
+            summary["bytes"] += size
+        report("uploaded", path, f"{size / 1024 / 1024:.1f} MB")
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for future in as_completed([executor.submit(upload_one, path) for path in paths]):
+            future.result()
+
+    elapsed = time.perf_counter() - start
+    print(
+        f"{summary['uploaded']} uploaded, {summary['skipped']} skipped, {summary['failed']} failed, "
+        f"{summary['bytes'] / 1024 / 1024:.1f} MB in {elapsed:.1f} s"
+    )
+    return summary
+
+def main(argv=None):
+    """
+    Non-interactive command-line interface.
+
+    Commands:
+        upload-dir SOURCE --user-id ID: Uploads the CSV files of a directory
+            or matching a glob; see `upload_dir`.
+        upload-file PATH --user-id ID: Uploads one file in parallel chunks,
+            resuming an interrupted upload of it; see `upload_file_chunked`.
+
+    Args:
+        argv (list[str], optional): Arguments. Defaults to `sys.argv[1:]`.
+
+    Returns:
+        int: Exit status, 1 if any upload failed.
+    """
+    parser = argparse.ArgumentParser(description="Client of the CSV upload API.")
+    parser.add_argument("--base-url", default=BASE_URL)
+    commands = parser.add_subparsers(dest="command", required=True)
+    upload_dir_parser = commands.add_parser("upload-dir", help="Upload the CSV files of a directory or glob.")
+    upload_dir_parser.add_argument("source", help="Directory or glob pattern (quote it).")
+    upload_dir_parser.add_argument("--user-id", type=int, required=True)
+    upload_dir_parser.add_argument("--workers", type=int, default=4)
+    upload_dir_parser.add_argument("--retries", type=int, default=3)
+    upload_dir_parser.add_argument("--backoff", type=float, default=0.5)
+    upload_dir_parser.add_argument("--manifest")
+    upload_dir_parser.add_argument(
+        "--chunk-size-mb", type=float, help="Upload files larger than this in resumable chunks.",
+    )
+    upload_file_parser = commands.add_parser("upload-file", help="Upload a file in resumable, parallel chunks.")
+    upload_file_parser.add_argument("path")
+    upload_file_parser.add_argument("--user-id", type=int, required=True)
+    upload_file_parser.add_argument("--workers", type=int, default=4)
+    upload_file_parser.add_argument("--retries", type=int, default=3)
+    upload_file_parser.add_argument("--backoff", type=float, default=0.5)
+    upload_file_parser.add_argument("--chunk-size-mb", type=float, default=UPLOAD_CHUNK_SIZE / 1024 / 1024)
+    upload_file_parser.add_argument("--sessions", default=SESSIONS_NAME)
+    args = parser.parse_args(argv)
+
+    chunk_size = int(args.chunk_size_mb * 1024 * 1024) if args.chunk_size_mb else None
+    if args.command == "upload-file":
+        start = time.perf_counter()
+        try:
+            result = upload_file_chunked(
+                make_session(args.workers), args.path, args.user_id, UploadManifest(args.sessions),
+                chunk_size, workers=args.workers, retries=args.retries, backoff=args.backoff, base_url=args.base_url,
+            )
+        except requests.HTTPError as error:
+            # Checked first: HTTPError is an OSError, but sending the file again would be rejected again.
+            print(f"Upload rejected by the server: {error}")
+            return 1
+        except (OSError, TransientUploadError) as error:
+            print(f"Upload failed, run the command again to resume: {error}")
+            return 1
+        elapsed = time.perf_counter() - start
+        print(f"{result} ({os.path.getsize(args.path) / 1024 / 1024 / max(elapsed, 1e-9):.1f} MB/s)")
+        return 0
+
+    summary = upload_dir(
+        args.source, args.user_id, workers=args.workers, retries=args.retries,
+        backoff=args.backoff, manifest_path=args.manifest, base_url=args.base_url, chunk_size=chunk_size,
+    )
+    return 1 if summary["failed"] else 0
+
 if __name__ == "__main__":
     """
     Simple command-line interface to interact with the API.
 
-    The script presents a menu with the following options:
+    With arguments, the non-interactive commands of `main` are run.
+    Otherwise the script presents a menu with the following options:
         1. Register a new user.
         2. Upload a CSV file.
         3. Exit the program.
 
     The user selects an option, and the corresponding function is executed.
     """
+    if len(sys.argv) > 1:
+        sys.exit(main())
     while True:
         print("\n1. Register\n2. Upload CSV\n3. Exit")
         choice = input("Select option: ")
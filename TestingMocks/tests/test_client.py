@@ -1,5 +1,8 @@
+import hashlib
+import os
 import requests
 import requests_mock
+from cli.client import UploadManifest, main, make_session, upload_dir, upload_file_chunked
 
 def test_register():
     """
@@ -122,3 +125,150 @@ def test_get_user_data():
         data = response.json()
         assert isinstance(data, list)
         assert all("id" in entry and "content" in entry for entry in data)
+
+def test_upload_dir_skips_completed_files(tmp_path):
+    """
+    Tests that `upload-dir` uploads every CSV file once and skips them on a rerun.
+
+    Test Steps:
+        1. Create a directory with two CSV files and a file of another type.
+        2. Mock the API response for a file upload.
+        3. Upload the directory and assert that both CSV files were uploaded.
+        4. Upload the directory again and assert that no request was sent.
+        5. Upload it for another user and assert that both files were uploaded again.
+
+    Expected API Response:
+        {"message": "File uploaded successfully", "id": 1}
+    """
+    (tmp_path / "a.csv").write_text("id,name\n1,A")
+    (tmp_path / "b.csv").write_text("id,name\n2,B")
+    (tmp_path / "notes.txt").write_text("not a CSV file")
+
+    with requests_mock.Mocker() as m:
+        m.post("http://127.0.0.1:8000/files/upload",
+               json={"message": "File uploaded successfully", "id": 1})
+
+        summary = upload_dir(str(tmp_path), user_id=1, workers=2)
+        assert summary["uploaded"] == 2 and summary["failed"] == 0
+        assert m.call_count == 2
+        assert all(request.qs == {"user_id": ["1"]} for request in m.request_history)
+        assert os.path.exists(tmp_path / ".upload_manifest.json")
+
+        summary = upload_dir(str(tmp_path), user_id=1, workers=2)
+        assert summary["skipped"] == 2 and summary["uploaded"] == 0
+        assert m.call_count == 2
+
+        summary = upload_dir(str(tmp_path / "*.csv"), user_id=2, manifest_path=str(tmp_path / ".upload_manifest.json"))
+        assert summary["uploaded"] == 2
+        assert m.call_count == 4
+
+def test_upload_dir_retries_transient_failures(tmp_path):
+    """
+    Tests that `upload-dir` retries transient failures but not rejected files.
+
+    Test Steps:
+        1. Create a directory with one CSV file.
+        2. Mock the upload to fail with 503 and a connection error, then succeed.
+        3. Upload the directory and assert that the file was uploaded on the third attempt.
+        4. Mock the upload to fail with 400, upload another file and assert that it
+           failed after one attempt and was not recorded in the manifest.
+
+    Expected API Response:
+        {"message": "File uploaded successfully", "id": 1}
+    """
+    (tmp_path / "a.csv").write_text("id,name\n1,A")
+
+    with requests_mock.Mocker() as m:
+        m.post("http://127.0.0.1:8000/files/upload", [
+            {"status_code": 503},
+            {"exc": requests.exceptions.ConnectionError},
+            {"json": {"message": "File uploaded successfully", "id": 1}},
+        ])
+        summary = upload_dir(str(tmp_path), user_id=1, retries=3, backoff=0)
+        assert summary["uploaded"] == 1
+        assert m.call_count == 3
+
+    (tmp_path / "b.csv").write_text("id,name\n2,B")
+
+    with requests_mock.Mocker() as m:
+        m.post("http://127.0.0.1:8000/files/upload", status_code=400, json={"detail": "File is not valid UTF-8 text"})
+        summary = upload_dir(str(tmp_path), user_id=1, retries=3, backoff=0)
+        assert summary["failed"] == 1 and summary["skipped"] == 1
+        assert m.call_count == 1
+
+        summary = upload_dir(str(tmp_path), user_id=1, retries=3, backoff=0)
+        assert summary["failed"] == 1
+
+def test_upload_file_chunked_resumes(tmp_path):
+    """
+    Tests that a chunked upload resumes with the chunks the server is missing.
+
+    Test Steps:
+        1. Create a 25-byte CSV file and mock a new upload session with 10-byte chunks.
+        2. Mock the chunk at offset 10 to be rejected and assert that the upload
+           fails, keeping its session in the local record.
+        3. Mock the session state to report only that chunk as missing.
+        4. Upload again and assert that only the missing chunk is sent, that the
+           upload is completed with the file's checksum and that the session is forgotten.
+
+    Expected API Response:
+        {"message": "File uploaded successfully", "id": 1}
+    """
+    path = tmp_path / "big.csv"
+    path.write_bytes(b"id,name\n1,Alice\n2,Bob\n3,Eve\n")
+    sessions = UploadManifest(str(tmp_path / ".upload_sessions.json"))
+    uploads_url = "http://127.0.0.1:8000/files/uploads"
+
+    with requests_mock.Mocker() as m:
+        m.post(uploads_url, json={"upload_id": "abc", "size": 25, "chunk_size": 10, "missing": [0, 10, 20]})
+        m.put(f"{uploads_url}/abc?offset=0", json={"offset": 0, "size": 10})
+        m.put(f"{uploads_url}/abc?offset=10", status_code=400)
+        m.put(f"{uploads_url}/abc?offset=20", json={"offset": 20, "size": 5})
+
+        try:
+            upload_file_chunked(make_session(2), str(path), 1, sessions, chunk_size=10, workers=2, backoff=0)
+            assert False, "The upload should have failed"
+        except requests.HTTPError:
+            pass
+        assert sessions.entries and next(iter(sessions.entries.values()))["upload_id"] == "abc"
+
+    with requests_mock.Mocker() as m:
+        m.get(f"{uploads_url}/abc", json={"upload_id": "abc", "size": 25, "chunk_size": 10, "missing": [10]})
+        m.put(f"{uploads_url}/abc", json={"offset": 10, "size": 10})
+        m.post(f"{uploads_url}/abc/complete", json={"message": "File uploaded successfully", "id": 1})
+
+        sessions = UploadManifest(str(tmp_path / ".upload_sessions.json"))
+        result = upload_file_chunked(make_session(2), str(path), 1, sessions, chunk_size=10, workers=2, backoff=0)
+
+        assert result["message"] == "File uploaded successfully"
+        puts = [request for request in m.request_history if request.method == "PUT"]
+        assert len(puts) == 1 and puts[0].qs == {"offset": ["10"]}
+        assert puts[0].body == path.read_bytes()[10:20]
+        assert m.request_history[-1].qs["sha256"] == [hashlib.sha256(path.read_bytes()).hexdigest()]
+        assert sessions.entries == {}
+
+def test_upload_file_command_reports_rejection(tmp_path, capsys):
+    """
+    Tests that the `upload-file` command tells a rejected upload from an interrupted one.
+
+    Test Steps:
+        1. Mock the server to reject the new upload session with 422.
+        2. Run `upload-file` and assert that it fails without asking to resume.
+        3. Mock the server to refuse connections and run the command again.
+
+    Expected Result:
+        A rejection is reported as such; only the connection failure asks to run the command again.
+    """
+    path = tmp_path / "data.csv"
+    path.write_bytes(b"id,name\n1,Alice\n")
+    argv = ["upload-file", str(path), "--user-id", "1", "--retries", "0", "--sessions", str(tmp_path / "sessions.json")]
+
+    with requests_mock.Mocker() as m:
+        m.post("http://127.0.0.1:8000/files/uploads", status_code=422)
+        assert main(argv) == 1
+        output = capsys.readouterr().out
+        assert "rejected" in output and "run the command again" not in output
+
+        m.post("http://127.0.0.1:8000/files/uploads", exc=requests.ConnectionError)
+        assert main(argv) == 1
+        assert "run the command again" in capsys.readouterr().out
@@ -1,14 +1,55 @@
+import os
+import tempfile
+
+# The tests run against their own database and blob store, created empty for every run.
+TEST_DATA_DIR = tempfile.mkdtemp()
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(TEST_DATA_DIR, 'test.db')}")
+os.environ.setdefault("BLOB_STORE_DIR", os.path.join(TEST_DATA_DIR, "blobs"))
+
 from fastapi.testclient import TestClient
 from app.main import app
+import asyncio
+import functools
+import hashlib
+import json
 import io
-from app.database import SessionLocal
+import pytest
+from sqlalchemy import inspect, text
+from app.columnar import parse_csv_columnar
+from app.database import Base, SessionLocal, add_missing_columns, create_db_engine
 from app.models import User
+from app import parallel_parse
+from app.parallel_parse import (
+    ParallelParser, _iter_file_ranges, _next_boundary, _parse_chunk, _read_file_header, _read_header, split_records,
+)
+from app.parse_csv import CSVStreamParser, parse_csv
+from app.routes import files as files_routes
+from app import upload_sessions
+from app.upload_sessions import MAX_UPLOAD_SIZE, UploadStore
 
 
 # Create a test client for the FastAPI application
 client = TestClient(app)
 
 
+def create_user(username, password="test"):
+    """
+    Registers a user unless it exists.
+
+    Returns:
+        int: ID of the user.
+    """
+    db = SessionLocal()
+    try:
+        user = db.query(User).filter(User.username == username).first()
+        if user is None:
+            client.post("/users/register", json={"username": username, "password": password})
+            user = db.query(User).filter(User.username == username).first()
+        return user.id
+    finally:
+        db.close()
+
+
 def test_register_user():
     """
     Tests the user registration endpoint.
@@ -29,8 +70,10 @@ def test_register_user():
     db = SessionLocal()
 
     user = db.query(User).filter(User.username == "test").first()
-    db.delete(user)
-    db.commit()
+    if user is not None:
+        db.delete(user)
+        db.commit()
+    db.close()
 
     response = client.post(
         "/users/register", json={"username": "test", "password": "test"})
@@ -98,7 +141,7 @@ def test_get_user_data():
     and verifies that the response contains valid data entries.
 
     Test Steps:
-        1. Define a test user ID.
+        1. Create a test user and upload a file for them.
         2. Send a GET request to retrieve data for the specified user.
         3. Assert that the response status code is 200.
         4. Verify that the response is a list of data entries.
@@ -110,9 +153,689 @@ def test_get_user_data():
             {"id": 2, "content": "data2"}
         ]
     """
-    user_id = 2
+    user_id = create_user("data_owner")
+    files = {"file": ("test.csv", io.BytesIO(b"id,name\n1,Test"), "text/csv")}
+    client.post(f"/files/upload?user_id={user_id}", files=files)
     response = client.get(f"/users/{user_id}/data")
     assert response.status_code == 200
     data = response.json()
     assert isinstance(data, list)
-    assert all("id" in entry and "content" in entry for entry in data)
\ No newline at end of file
+    assert all("id" in entry and "content" in entry for entry in data)
+
+def test_get_json_quoted_fields():
+    """
+    Tests parsing a CSV string with quoted fields.
+
+    This function sends a CSV string whose quoted values contain a comma
+    and a line break to `/files/json/{string}` and verifies that each
+    quoted value stays a single field.
+
+    Test Steps:
+        1. Send a GET request with a URL-encoded CSV string.
+        2. Assert that the response status code is 200.
+        3. Verify that the quoted values are parsed as single fields.
+
+    Expected API Response:
+        [
+            {"name": "Doe, John", "note": "line1\nline2"}
+        ]
+    """
+    response = client.get("/files/json/name,note%0A%22Doe, John%22,%22line1%0Aline2%22")
+    assert response.status_code == 200
+    assert response.json() == [{"name": "Doe, John", "note": "line1\nline2"}]
+
+
+def test_get_json_columnar():
+    """
+    Tests the columnar representation of a parsed CSV string.
+
+    This function requests `/files/json/{string}?format=columnar` and verifies
+    that column types are inferred and string columns are dictionary-encoded.
+
+    Test Steps:
+        1. Send a GET request with a CSV string and `format=columnar`.
+        2. Assert that the response status code is 200.
+        3. Verify the inferred type and values of each column.
+
+    Expected API Response:
+        {
+            "num_rows": 3,
+            "columns": [
+                {"name": "id", "type": "int", "values": [1, 2, 3]},
+                {"name": "city", "type": "str", "dictionary": ["Paris", "Rome"], "codes": [0, 1, 0]}
+            ]
+        }
+    """
+    response = client.get("/files/json/id,city%0A1,Paris%0A2,Rome%0A3,Paris?format=columnar")
+    assert response.status_code == 200
+    table = response.json()
+    assert table["num_rows"] == 3
+    id_column, city_column = table["columns"]
+    assert id_column == {"name": "id", "type": "int", "values": [1, 2, 3]}
+    assert city_column == {"name": "city", "type": "str", "dictionary": ["Paris", "Rome"], "codes": [0, 1, 0]}
+
+
+def test_columnar_fallback_keeps_original_strings():
+    """
+    Tests that a column falling back to str keeps the values as they were read.
+
+    This function parses CSV data whose typed columns get a non-matching value
+    after the sample rows used for type inference.
+
+    Test Steps:
+        1. Parse float, bool and date columns with `sample_size=2`.
+        2. Let the third row hold a value that fits none of these types.
+        3. Verify that every column is str and that earlier values are unchanged.
+
+    Expected Result:
+        "1.50", "1e3", "true" and "20240101" are kept, not "1.5", "1000.0", "True" or "2024-01-01".
+    """
+    table = parse_csv_columnar("price,flag,day\n1.50,true,20240101\n1e3,,2024-01-02\nn/a,maybe,soon", sample_size=2)
+
+    assert [column.type for column in table.columns] == ["str", "str", "str"]
+    assert [dict(row) for row in table] == [
+        {"price": "1.50", "flag": "true", "day": "20240101"},
+        {"price": "1e3", "flag": "", "day": "2024-01-02"},
+        {"price": "n/a", "flag": "maybe", "day": "soon"},
+    ]
+
+
+def test_columnar_keeps_integers_beyond_int64():
+    """
+    Tests that integers outside the int64 range are kept as strings.
+
+    Test Steps:
+        1. Request `/files/json/{string}?format=columnar` for a column with one such integer.
+        2. Parse a column whose sample rows are small integers followed by a large one.
+
+    Expected Result:
+        Both columns are str and keep every digit of the original values.
+    """
+    response = client.get("/files/json/a%0A99999999999999999999?format=columnar")
+    assert response.status_code == 200
+    assert response.json()["columns"] == [{"name": "a", "type": "str", "dictionary": ["99999999999999999999"], "codes": [0]}]
+
+    table = parse_csv_columnar("a\n1\n2\n-99999999999999999999", sample_size=2)
+    assert table.columns[0].type == "str"
+    assert [row["a"] for row in table] == ["1", "2", "-99999999999999999999"]
+
+
+def test_split_records_on_boundaries():
+    """
+    Tests that CSV text is split only between records.
+
+    This function splits text whose quoted fields contain line breaks into
+    many small ranges and checks every range boundary.
+
+    Test Steps:
+        1. Verify that `_next_boundary` skips line breaks inside quotes.
+        2. Split the records after the header into ranges with `split_records`.
+        3. Assert that the ranges are contiguous, cover the text and parse to the same rows.
+
+    Expected Result:
+        Every range holds whole records.
+    """
+    text = 'id,note\n1,"a\nb"\n2,plain\n3,"x ""quoted""\nline"\n4,end\n'
+    assert _next_boundary(text, 0, len(text)) == len("id,note\n")
+    assert _next_boundary(text, 8, len(text)) == len('id,note\n1,"a\nb"\n')
+    assert _next_boundary(text, 11, len(text), quotes=1) == len('id,note\n1,"a\nb"\n')
+    assert _next_boundary("no line break", 0, 13) == 13
+
+    header, start = _read_header(text)
+    ranges = split_records(text, 10, start)
+    assert ranges[0][0] == start and ranges[-1][1] == len(text)
+    assert all(end == begin for (_, end), (begin, _) in zip(ranges, ranges[1:]))
+    rows = [row for begin, end in ranges for row in _parse_chunk(text[begin:end], header)]
+    assert rows == parse_csv(text)
+
+
+def test_parallel_parse_matches_parse_csv():
+    """
+    Tests that parsing in the process pool gives the same rows as `parse_csv`.
+
+    This function parses text with quoted line breaks in a pool of two
+    workers, with a threshold of 0 so that even small inputs are split.
+
+    Test Steps:
+        1. Build CSV text whose quoted fields span chunk boundaries.
+        2. Parse and serialize it with `ParallelParser(workers=2, threshold=0)`.
+        3. Assert that the results equal `parse_csv` and its JSON form.
+
+    Expected Result:
+        The rows are identical and in input order.
+    """
+    lines = ["id,note,city"]
+    for number in range(300):
+        note = f'"line {number}\nnext, ""quoted""\n"' if number % 3 == 0 else f"note {number}"
+        lines.append(f"{number},{note},Paris")
+    text = "\n".join(lines) + "\n"
+
+    parser = ParallelParser(workers=2, threshold=0, chunks_per_worker=8)
+    try:
+        assert parser.parse(text) == parse_csv(text)
+        assert json.loads(parser.serialize(text)) == parse_csv(text)
+    finally:
+        parser.shutdown()
+
+
+def test_parse_file_in_ranges(tmp_path, monkeypatch):
+    """
+    Tests parsing a CSV file in the process pool by record-aligned byte ranges.
+
+    This function scans a file in blocks of 16 bytes, so that quoted fields
+    and multibyte characters span block and range boundaries.
+
+    Test Steps:
+        1. Write CSV text with quoted line breaks and non-ASCII values to a file.
+        2. Split it with `_iter_file_ranges` and parse it with `ParallelParser.parse_file`.
+        3. Parse it again counting rows only.
+        4. Verify that an unclosed quote and invalid UTF-8 are rejected.
+
+    Expected Result:
+        The ranges are contiguous and the rows equal those of `parse_csv`.
+    """
+    monkeypatch.setattr(parallel_parse, "SCAN_BLOCK_SIZE", 16)
+    lines = ["id,note"]
+    for number in range(50):
+        note = f'"städte {number}\n""quoted"""' if number % 4 == 0 else f"Zürich {number}"
+        lines.append(f"{number},{note}")
+    path = tmp_path / "upload.csv"
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    expected = parse_csv(path.read_text(encoding="utf-8"))
+
+    header, start = _read_file_header(str(path))
+    assert (header, start) == (["id", "note"], len("id,note\n"))
+    ranges = list(_iter_file_ranges(str(path), start, 40))
+    assert ranges[0][0] == start and ranges[-1][1] == path.stat().st_size
+    assert all(end == begin for (_, end), (begin, _) in zip(ranges, ranges[1:]))
+
+    parser = ParallelParser(workers=2, threshold=0, range_size=40, max_record_size=64)
+    try:
+        header, results = parser.parse_file(str(path))
+        assert header == ["id", "note"]
+        assert [row for rows in results for row in rows] == expected
+        assert sum(parser.parse_file(str(path), rows=False)[1]) == len(expected)
+
+        path.write_bytes(b'id,note\n1,"unclosed' + b"x" * 200 + b"\n2,end\n")
+        with pytest.raises(ValueError):
+            list(parser.parse_file(str(path))[1])
+        path.write_bytes(b"id,note\n1,\xff\n")
+        with pytest.raises(UnicodeDecodeError):
+            list(parser.parse_file(str(path))[1])
+    finally:
+        parser.shutdown()
+
+
+def test_upload_file_parsed_in_pool(monkeypatch):
+    """
+    Tests that uploads above the threshold are parsed in the process pool.
+
+    This function reads uploads in chunks of 100 bytes and lowers the
+    threshold of the parser, so that parsing moves to the pool in the middle
+    of the file.
+
+    Test Steps:
+        1. Upload a CSV file with `ingest=rows` and another with the default mode.
+        2. Assert that the row counts are reported.
+        3. Read all stored rows back from `/files/{file_id}/rows`.
+
+    Expected Result:
+        Every row is stored once, in file order, as `parse_csv` parses it.
+    """
+    parser = ParallelParser(workers=2, threshold=150, range_size=128)
+    monkeypatch.setattr(files_routes, "parallel_parser", parser)
+    monkeypatch.setattr(files_routes, "CHUNK_SIZE", 100)
+    lines = ["id,name,note"] + [f'{number},name {number},"line\n{number}"' for number in range(60)]
+    content = ("\n".join(lines) + "\n").encode()
+    expected = parse_csv(content.decode())
+
+    try:
+        files = {"file": ("pool.csv", io.BytesIO(content), "text/csv")}
+        result = client.post("/files/upload?user_id=1&ingest=rows", files=files).json()
+        assert result["row_count"] == len(expected)
+        rows = client.get(f"/files/{result['id']}/rows?limit=1000").json()
+        assert rows == expected
+
+        files = {"file": ("pool.csv", io.BytesIO(content), "text/csv")}
+        result = client.post("/files/upload?user_id=1", files=files).json()
+        assert result["row_count"] == len(expected)
+    finally:
+        parser.shutdown()
+
+
+def test_upload_file_metadata():
+    """
+    Tests the metadata returned for a streamed upload.
+
+    This function uploads a CSV file whose quoted field contains a line break
+    and verifies the stored metadata and the parsed content of the stored file.
+
+    Test Steps:
+        1. Upload a CSV file with two data rows to `/files/upload`.
+        2. Assert that the row count, size and hash are reported.
+        3. Request `/files/{file_id}/json` and verify the parsed rows.
+
+    Expected API Response:
+        {"message": "File uploaded successfully", "id": 1, "sha256": "...", "size": 32, "row_count": 2}
+    """
+    content = b'id,name\n1,"Multi\nline"\n2,Test\n'
+    files = {"file": ("test.csv", io.BytesIO(content), "text/csv")}
+    response = client.post("/files/upload?user_id=1", files=files)
+
+    assert response.status_code == 200
+    result = response.json()
+    assert result["row_count"] == 2
+    assert result["size"] == len(content)
+    assert result["sha256"] == hashlib.sha256(content).hexdigest()
+
+    response = client.get(f"/files/{result['id']}/json")
+    assert response.json() == [{"id": "1", "name": "Multi\nline"}, {"id": "2", "name": "Test"}]
+
+
+def test_upload_file_unclosed_quote(monkeypatch):
+    """
+    Tests that an upload whose record never ends is rejected.
+
+    This function lowers the maximum record size of the upload parser and
+    uploads a file with an unclosed quote, fed to the parser in small chunks.
+
+    Test Steps:
+        1. Verify that the parser returns rows split across chunks and rejects
+           a record longer than `max_record_size`.
+        2. Upload a file with an unclosed quote to `/files/upload`.
+        3. Assert that the response status code is 400.
+
+    Expected API Response:
+        {"detail": "CSV record is longer than 64 characters"}
+    """
+    parser = CSVStreamParser(max_record_size=64)
+    assert parser.feed(b'id,name\n1,"a\nb') == []
+    assert parser.feed(b'"\n2,') == [{"id": "1", "name": "a\nb"}]
+    with pytest.raises(ValueError):
+        for _ in range(10):
+            parser.feed(b'"unclosed')
+
+    monkeypatch.setattr(files_routes, "CSVStreamParser", functools.partial(CSVStreamParser, max_record_size=64))
+    content = b'id,name\n1,"unclosed' + b"x" * 100 + b"\n2,Test\n"
+    files = {"file": ("test.csv", io.BytesIO(content), "text/csv")}
+    response = client.post("/files/upload?user_id=1", files=files)
+
+    assert response.status_code == 400
+    assert response.json() == {"detail": "CSV record is longer than 64 characters"}
+
+
+def test_upload_file_rows():
+    """
+    Tests the `rows` ingestion mode of the file upload endpoint.
+
+    This function uploads a CSV file with row storage enabled and reads a
+    range of its rows back.
+
+    Test Steps:
+        1. Upload a CSV file with three data rows to `/files/upload?ingest=rows`.
+        2. Request `/files/{file_id}/rows` with an offset and a limit.
+        3. Assert that only the requested rows are returned.
+        4. Verify that a file uploaded without row storage returns 409.
+
+    Expected API Response:
+        [{"id": "2", "name": "Bob"}]
+    """
+    content = b"id,name\n1,Alice\n2,Bob\n3,Carol\n"
+    files = {"file": ("test.csv", io.BytesIO(content), "text/csv")}
+    response = client.post("/files/upload?user_id=1&ingest=rows", files=files)
+
+    assert response.status_code == 200
+    file_id = response.json()["id"]
+
+    response = client.get(f"/files/{file_id}/rows?offset=1&limit=1")
+    assert response.status_code == 200
+    assert response.json() == [{"id": "2", "name": "Bob"}]
+
+    files = {"file": ("test.csv", io.BytesIO(content), "text/csv")}
+    file_id = client.post("/files/upload?user_id=1", files=files).json()["id"]
+    assert client.get(f"/files/{file_id}/rows").status_code == 409
+
+
+def test_get_users_pagination():
+    """
+    Tests cursor pagination, NDJSON streaming and field projection on `/users`.
+
+    Test Steps:
+        1. Create two users.
+        2. Request the first page of one user and read the `X-Next-Cursor` header.
+        3. Request the next page with the cursor and assert it holds a different user.
+        4. Stream all users as NDJSON and assert both pages are among them.
+        5. Upload a file for the second user.
+        6. Request user data with `fields=id,size` and assert `content` is skipped.
+        7. Assert that an unknown field is rejected with 400.
+
+    Expected API Response:
+        [{"id": "1"}]  # first page with `fields=id&limit=1`
+    """
+    create_user("page_a")
+    user_id = create_user("page_b")
+
+    response = client.get("/users?limit=1&fields=id")
+    assert response.status_code == 200
+    first_page = response.json()
+    assert first_page == [{"id": first_page[0]["id"]}]
+    cursor = response.headers["X-Next-Cursor"]
+
+    second_page = client.get(f"/users?limit=1&fields=id&cursor={cursor}").json()
+    assert len(second_page) == 1
+    assert int(second_page[0]["id"]) > int(first_page[0]["id"])
+
+    response = client.get("/users?format=ndjson")
+    assert response.headers["content-type"] == "application/x-ndjson"
+    streamed = [json.loads(line) for line in response.text.splitlines()]
+    streamed_ids = [user["id"] for user in streamed]
+    assert first_page[0]["id"] in streamed_ids and second_page[0]["id"] in streamed_ids
+
+    files = {"file": ("test.csv", io.BytesIO(b"id,name\n1,Test"), "text/csv")}
+    client.post(f"/files/upload?user_id={user_id}", files=files)
+    response = client.get(f"/users/{user_id}/data?fields=id,size")
+    assert response.status_code == 200
+    entries = response.json()
+    assert entries and all(set(entry) == {"id", "size"} for entry in entries)
+
+    assert client.get("/users?fields=password").status_code == 400
+
+
+def test_metrics():
+    """
+    Tests the database metrics endpoint.
+
+    This function makes a request that queries the database and verifies
+    that it is counted in the metrics exposed on `/metrics`.
+
+    Test Steps:
+        1. Read the number of request sessions from `/metrics`.
+        2. Send a GET request to `/users`.
+        3. Read `/metrics` again and assert that one more session is counted.
+        4. Verify that the query count and pool wait histograms are present.
+
+    Expected API Response:
+        db_sessions_total 5
+        db_queries_total 12
+        ...
+    """
+    def sessions_total():
+        text = client.get("/metrics").text
+        line = next(line for line in text.splitlines() if line.startswith("db_sessions_total "))
+        return int(line.split()[1])
+
+    before = sessions_total()
+    client.get("/users/")
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert sessions_total() == before + 1
+    assert "db_request_queries_count" in response.text
+    assert "db_pool_wait_seconds_sum" in response.text
+
+
+def test_login_rehashes_legacy_password():
+    """
+    Tests the login endpoint and the rehash of outdated password hashes.
+
+    Test Steps:
+        1. Store a user whose password is an unsalted SHA-256 digest, as before
+           encoded hashes were introduced.
+        2. Send a login request with a wrong password and assert 401.
+        3. Send a login request with the right password and assert 200.
+        4. Verify that the stored hash was replaced with an encoded hash.
+        5. Log in again with the new hash.
+
+    Expected API Response:
+        {"message": "Login successful", "id": 3}
+    """
+    db = SessionLocal()
+    db.query(User).filter(User.username == "legacy").delete()
+    db.add(User(username="legacy", password=hashlib.sha256(b"secret").hexdigest()))
+    db.commit()
+
+    response = client.post("/users/login", json={"username": "legacy", "password": "wrong"})
+    assert response.status_code == 401
+
+    response = client.post("/users/login", json={"username": "legacy", "password": "secret"})
+    assert response.status_code == 200
+    assert response.json()["message"] == "Login successful"
+
+    db.expire_all()
+    stored = db.query(User).filter(User.username == "legacy").first().password
+    db.close()
+    assert stored.startswith("scrypt$")
+
+    response = client.post("/users/login", json={"username": "legacy", "password": "secret"})
+    assert response.status_code == 200
+
+
+def test_register_users_bulk():
+    """
+    Tests bulk registration from a JSON array and from an NDJSON body.
+
+    Test Steps:
+        1. Delete the users left by a previous run and create the user `test`.
+        2. Register a JSON array with a new user, a repeated username,
+           an existing username and an invalid item.
+        3. Assert that every item has its own result and the batch is not aborted.
+        4. Register two users sent as NDJSON, one of them already registered.
+        5. Verify that the new user can log in.
+
+    Expected API Response:
+        {
+            "created": 1, "conflicts": 2, "invalid": 1,
+            "results": [{"index": 0, "username": "bulk_a", "status": "created", "id": 7}, ...]
+        }
+    """
+    db = SessionLocal()
+    db.query(User).filter(User.username.in_(["bulk_a", "bulk_b"])).delete()
+    db.commit()
+    db.close()
+    create_user("test")
+
+    response = client.post("/users/register/bulk", json=[
+        {"username": "bulk_a", "password": "a"},
+        {"username": "bulk_a", "password": "other"},
+        {"username": "test", "password": "test"},
+        {"username": "bulk_c"},
+    ])
+    assert response.status_code == 200
+    result = response.json()
+    assert (result["created"], result["conflicts"], result["invalid"]) == (1, 2, 1)
+    assert [item["status"] for item in result["results"]] == ["created", "conflict", "conflict", "invalid"]
+
+    lines = b'{"username": "bulk_b", "password": "b"}\n{"username": "bulk_a", "password": "a"}\n'
+    response = client.post("/users/register/bulk", content=lines, headers={"Content-Type": "application/x-ndjson"})
+    assert [item["status"] for item in response.json()["results"]] == ["created", "conflict"]
+
+    response = client.post("/users/login", json={"username": "bulk_b", "password": "b"})
+    assert response.status_code == 200
+
+
+def test_get_json_etag():
+    """
+    Tests caching and conditional requests on the CSV parsing endpoint.
+
+    Test Steps:
+        1. Request `/files/json/{string}` and read the `ETag` header.
+        2. Request it again with `If-None-Match` set to the ETag and assert 304.
+        3. Request it again without the header and assert the same body.
+        4. Verify that the cache hit is counted on `/metrics`.
+
+    Expected API Response:
+        [{"name": "Alice", "age": "25"}]  # with an ETag header, or 304 Not Modified
+    """
+    def cache_hits():
+        text = client.get("/metrics").text
+        line = next(line for line in text.splitlines() if line.startswith("parse_cache_hits_total "))
+        return int(line.split()[1])
+
+    url = "/files/json/name,age%0AAlice,25"
+    response = client.get(url)
+    assert response.status_code == 200
+    etag = response.headers["ETag"]
+
+    response = client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+
+    hits = cache_hits()
+    response = client.get(url)
+    assert response.json() == [{"name": "Alice", "age": "25"}]
+    assert response.headers["ETag"] == etag
+    assert cache_hits() == hits + 1
+
+
+def test_file_json_cache_is_shared_by_content():
+    """
+    Tests that cached views of stored files are keyed by their content.
+
+    Test Steps:
+        1. Upload a file and request `/files/{file_id}/json`.
+        2. Upload the same content again and request the new entry.
+        3. Upload other content and request that entry.
+
+    Expected Result:
+        The identical upload gets the same ETag and body from the cache; the
+        other content gets another ETag and its own rows.
+    """
+    user_id = create_user("cache_owner")
+
+    def upload(content):
+        files = {"file": ("cached.csv", io.BytesIO(content), "text/csv")}
+        return client.post(f"/files/upload?user_id={user_id}", files=files).json()["id"]
+
+    content = b"k,v\ncache,1"
+    first = client.get(f"/files/{upload(content)}/json")
+    misses = files_routes.parse_cache.misses
+    second = client.get(f"/files/{upload(content)}/json")
+    other = client.get(f"/files/{upload(content[:-1] + b'2')}/json")
+
+    assert second.headers["ETag"] == first.headers["ETag"] and second.content == first.content
+    assert files_routes.parse_cache.misses == misses + 1
+    assert other.headers["ETag"] != first.headers["ETag"]
+    assert other.json() == [{"k": "cache", "v": "2"}]
+
+
+def test_chunked_upload_session():
+    """
+    Tests the resumable upload session API of `/files/uploads`.
+
+    Test Steps:
+        1. Create a session for a 24-byte file with 10-byte chunks.
+        2. Send the last chunk, then the first one twice, and assert that a
+           chunk of the wrong size is rejected.
+        3. Assert that the session reports the middle chunk as missing and that
+           completing it is rejected with 409.
+        4. Send the middle chunk and assert that completing with a wrong
+           checksum is rejected with 400.
+        5. Complete with the right checksum and assert that the file is stored
+           and the session is deleted.
+        6. Assert that a session larger than `MAX_UPLOAD_SIZE` is rejected.
+
+    Expected API Response:
+        {"message": "File uploaded successfully", "id": ..., "sha256": ..., "size": 24, "row_count": 2}
+    """
+    content = b"id,name\n1,Alice\n2,Bobby\n"
+    sha256 = hashlib.sha256(content).hexdigest()
+    response = client.post("/files/uploads?user_id=1&size=24&chunk_size=10")
+    assert response.status_code == 200
+    upload_id = response.json()["upload_id"]
+    assert response.json()["missing"] == [0, 10, 20]
+
+    assert client.put(f"/files/uploads/{upload_id}?offset=20", content=content[20:]).status_code == 200
+    assert client.put(f"/files/uploads/{upload_id}?offset=0", content=content[:10]).status_code == 200
+    assert client.put(f"/files/uploads/{upload_id}?offset=0", content=content[:10]).status_code == 200
+    assert client.put(f"/files/uploads/{upload_id}?offset=10", content=content[10:15]).status_code == 400
+    assert client.put(f"/files/uploads/{upload_id}?offset=5", content=content[5:15]).status_code == 400
+
+    assert client.get(f"/files/uploads/{upload_id}").json()["missing"] == [10]
+    assert client.post(f"/files/uploads/{upload_id}/complete?sha256={sha256}").status_code == 409
+
+    assert client.put(f"/files/uploads/{upload_id}?offset=10", content=content[10:20]).status_code == 200
+    assert client.post(f"/files/uploads/{upload_id}/complete?sha256={'0' * 64}").status_code == 400
+
+    response = client.post(f"/files/uploads/{upload_id}/complete?sha256={sha256}")
+    assert response.status_code == 200
+    assert response.json()["sha256"] == sha256
+    assert response.json()["size"] == 24 and response.json()["row_count"] == 2
+    assert client.get(f"/files/{response.json()['id']}/json").json() == [
+        {"id": "1", "name": "Alice"}, {"id": "2", "name": "Bobby"},
+    ]
+    assert client.get(f"/files/uploads/{upload_id}").status_code == 404
+    assert client.post(f"/files/uploads?user_id=1&size={MAX_UPLOAD_SIZE + 1}").status_code == 422
+
+
+def test_upload_store_writes_in_threadpool(tmp_path, monkeypatch):
+    """
+    Tests that chunks of upload sessions are written outside the event loop.
+
+    This function lowers `CHUNK_SIZE` to 4 bytes and records the calls that
+    `UploadStore` sends to the threadpool.
+
+    Test Steps:
+        1. Create a part file and write a chunk received in pieces of 3 bytes.
+        2. Write a chunk that is longer than announced.
+
+    Expected Result:
+        The chunk is written at its offset in pieces of at least 4 bytes, every
+        write runs in the threadpool, and the oversized chunk is rejected.
+    """
+    calls = []
+    run_in_threadpool = upload_sessions.run_in_threadpool
+
+    async def spy(function, *args):
+        calls.append(function.__name__)
+        return await run_in_threadpool(function, *args)
+
+    async def pieces(data):
+        for start in range(0, len(data), 3):
+            yield data[start:start + 3]
+
+    monkeypatch.setattr(upload_sessions, "CHUNK_SIZE", 4)
+    store = UploadStore(str(tmp_path))
+    store.create("session", 12)
+    monkeypatch.setattr(upload_sessions, "run_in_threadpool", spy)
+
+    assert asyncio.run(store.write("session", 2, 10, pieces(b"0123456789")))
+    assert calls == ["open", "seek", "write", "write", "write", "close"]
+    assert asyncio.run(store.write("session", 0, 2, pieces(b"abcd"))) is False
+    with store.open("session") as part:
+        assert part.read() == b"\0\0" + b"0123456789"
+
+
+def test_add_missing_columns_to_old_database():
+    """
+    Tests the startup migration of a database created by an older version.
+
+    Test Steps:
+        1. Create a database whose `csv_data` table only has `id`, `user_id` and `content`.
+        2. Run `create_all` and `add_missing_columns` twice, as two application starts would.
+        3. Read the columns of `csv_data` and the existing row.
+
+    Expected Result:
+        The new columns and the `sha256` index exist, and the old row keeps its content
+        with `rows_stored` set to false.
+    """
+    engine = create_db_engine(f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'old.db')}")
+    with engine.begin() as connection:
+        connection.execute(text("CREATE TABLE users (id INTEGER PRIMARY KEY, username VARCHAR, password VARCHAR)"))
+        connection.execute(text(
+            "CREATE TABLE csv_data (id INTEGER PRIMARY KEY, user_id INTEGER REFERENCES users (id), content VARCHAR)"
+        ))
+        connection.execute(text("INSERT INTO csv_data (user_id, content) VALUES (1, 'a,b\n1,2')"))
+
+    for _ in range(2):
+        Base.metadata.create_all(bind=engine)
+        add_missing_columns(engine, Base.metadata)
+
+    inspector = inspect(engine)
+    columns = [column["name"] for column in inspector.get_columns("csv_data")]
+    assert columns == ["id", "user_id", "content", "sha256", "size", "row_count", "header", "rows_stored"]
+    assert "ix_csv_data_sha256" in [index["name"] for index in inspector.get_indexes("csv_data")]
+    with engine.connect() as connection:
+        row = connection.execute(text("SELECT content, sha256, rows_stored FROM csv_data")).one()
+    assert tuple(row) == ("a,b\n1,2", None, 0)
+    engine.dispose()
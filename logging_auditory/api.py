@@ -1,21 +1,137 @@
+import atexit
+import gzip
+import json
 import logging
-from flask import Flask, request, jsonify
+import os
+from flask import Flask, abort, request, jsonify
+from storage import LogIndex, RotatingLogStore, parse_ndjson, query_from_params
 
 FORMATTER_STRING = "%(asctime)s — %(name)s — %(levelname)s — %(message)s"
 FORMATTER = logging.Formatter(FORMATTER_STRING)
 
+# Directory for received logs; records are written there instead of stdout.
+LOG_STORE_DIR = os.environ.get("LOG_STORE_DIR", "received_logs")
+
+# SQLite database with the time/level/name index used by the /logs endpoint.
+LOG_INDEX_PATH = os.environ.get("LOG_INDEX_PATH", os.path.join(LOG_STORE_DIR, "index.db"))
+
+# Number of NDJSON lines handed to the store at once while reading a stream.
+STREAM_BATCH_LINES = 1000
+
 app = Flask(__name__)
 
+store = RotatingLogStore(LOG_STORE_DIR, index=LogIndex(LOG_INDEX_PATH))
+atexit.register(store.close)
+
+
+def read_json():
+    """
+    Reads the JSON body of the current request.
+
+    Bodies sent with ``Content-Encoding: gzip`` are decompressed first.
+
+    Returns:
+        dict | list: Decoded JSON payload.
+
+    Raises:
+        werkzeug.exceptions.BadRequest: If the body is not valid (gzip-compressed) JSON.
+    """
+    body = request.get_data()
+    try:
+        if request.content_encoding == "gzip":
+            body = gzip.decompress(body)
+        return json.loads(body)
+    except (ValueError, OSError) as error:
+        abort(400, description=f"Invalid request body: {error}")
 
 
 @app.route("/log", methods=["POST"])
 def receive_log():
     """
-    Receives and prints critical logs sent via HTTP.
+    Receives critical logs sent via HTTP and writes them to the log store.
+
+    Accepts either a single JSON log entry or a JSON array of entries,
+    as sent by ``JSONHTTPHandler`` in batching mode.
+    """
+    log_data = read_json()
+    records = log_data if isinstance(log_data, list) else [log_data]
+    store.write(records)
+    return jsonify({"status": "received", "count": len(records)}), 200
+
+
+@app.route("/log/bulk", methods=["POST"])
+def receive_bulk():
+    """
+    Receives a JSON array of log entries.
+
+    Returns:
+        tuple: JSON response with the number of stored records, or an error
+        with status 400 if the body is not a JSON array.
+    """
+    records = read_json()
+    if not isinstance(records, list):
+        return jsonify({"status": "error", "detail": "Expected a JSON array"}), 400
+    store.write(records)
+    return jsonify({"status": "received", "count": len(records)}), 200
+
+
+@app.route("/log/stream", methods=["POST"])
+def receive_stream():
+    """
+    Receives an NDJSON stream (one JSON log entry per line).
+
+    The body is read line by line and stored in batches, so the whole
+    stream is never held in memory.
+
+    Returns:
+        tuple: JSON response with the number of stored records.
+
+    Raises:
+        werkzeug.exceptions.BadRequest: If a line is not valid JSON or the
+            body is not valid gzip. Batches stored before the error are kept.
+    """
+    stream = request.stream
+    if request.content_encoding == "gzip":
+        stream = gzip.GzipFile(fileobj=stream)
+    count = 0
+    lines = []
+    try:
+        for line in stream:
+            lines.append(line)
+            if len(lines) >= STREAM_BATCH_LINES:
+                records = parse_ndjson(lines)
+                store.write(records)
+                count += len(records)
+                lines = []
+        records = parse_ndjson(lines)
+    except (ValueError, OSError) as error:
+        abort(400, description=f"Invalid request body: {error}")
+    store.write(records)
+    count += len(records)
+    return jsonify({"status": "received", "count": count}), 200
+
+
+@app.route("/logs", methods=["GET"])
+def query_logs():
+    """
+    Searches received logs.
+
+    Query parameters:
+        start, end: Time range (timestamps or ``YYYY-MM-DD HH:MM:SS``).
+        level: Level name, e.g. ``CRITICAL``.
+        name: Logger name.
+        cursor: ``next_cursor`` from the previous page.
+        limit: Page size (at most 1000).
+
+    Returns:
+        tuple: JSON page of records with ``next_cursor``, or an error with
+        status 400 if a parameter is invalid.
     """
-    log_data = request.get_json()
-    print("Received Critical Log:", log_data)
-    return jsonify({"status": "received"}), 200
+    try:
+        page = query_from_params(store.index, request.args)
+    except ValueError as error:
+        return jsonify({"status": "error", "detail": str(error)}), 400
+    return jsonify(page), 200
 
 if __name__ == "__main__":
-    app.run(debug=True, use_reloader=False)
\ No newline at end of file
+    app.run(debug=True, use_reloader=False)
@@ -0,0 +1,183 @@
+"""
+Asynchronous ingestion server for critical logs.
+
+A dependency-free ASGI application with the same endpoints as ``api.py``,
+meant for production use behind an ASGI server, e.g.:
+
+    uvicorn asgi:app --workers 4 --port 5000
+
+Endpoints:
+    POST /log         a single JSON log entry or a JSON array of entries
+    POST /log/bulk    a JSON array of log entries
+    POST /log/stream  an NDJSON stream, stored while it is being received
+    GET  /logs        search by time range, level and logger name
+"""
+import asyncio
+import json
+import os
+import zlib
+from urllib.parse import parse_qsl
+from storage import LogIndex, RotatingLogStore, parse_ndjson, query_from_params
+
+# Directory for received logs.
+LOG_STORE_DIR = os.environ.get("LOG_STORE_DIR", "received_logs")
+
+# SQLite database with the time/level/name index used by the /logs endpoint.
+LOG_INDEX_PATH = os.environ.get("LOG_INDEX_PATH", os.path.join(LOG_STORE_DIR, "index.db"))
+
+store = None
+
+
+async def read_chunks(scope, receive):
+    """
+    Yields the request body chunk by chunk, decompressing gzip bodies on the fly.
+
+    Args:
+        scope (dict): ASGI connection scope.
+        receive (callable): ASGI receive channel.
+
+    Yields:
+        bytes: Body chunks.
+    """
+    headers = dict(scope["headers"])
+    decompressor = None
+    if headers.get(b"content-encoding") == b"gzip":
+        decompressor = zlib.decompressobj(wbits=31)
+    more_body = True
+    while more_body:
+        message = await receive()
+        chunk = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if decompressor is not None:
+            chunk = decompressor.decompress(chunk)
+        if chunk:
+            yield chunk
+
+
+async def read_json(scope, receive):
+    """
+    Reads and decodes a JSON request body.
+
+    Returns:
+        dict | list: Decoded JSON payload.
+    """
+    return json.loads(b"".join([chunk async for chunk in read_chunks(scope, receive)]))
+
+
+async def send_json(send, status, payload):
+    """
+    Sends a JSON response.
+
+    Args:
+        send (callable): ASGI send channel.
+        status (int): HTTP status code.
+        payload (dict): Response body.
+    """
+    body = json.dumps(payload).encode()
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+async def receive_log(scope, receive, send):
+    """
+    Stores a single log entry or a JSON array of entries.
+    """
+    log_data = await read_json(scope, receive)
+    records = log_data if isinstance(log_data, list) else [log_data]
+    store.write(records)
+    await send_json(send, 200, {"status": "received", "count": len(records)})
+
+
+async def receive_bulk(scope, receive, send):
+    """
+    Stores a JSON array of log entries.
+    """
+    records = await read_json(scope, receive)
+    if not isinstance(records, list):
+        await send_json(send, 400, {"status": "error", "detail": "Expected a JSON array"})
+        return
+    store.write(records)
+    await send_json(send, 200, {"status": "received", "count": len(records)})
+
+
+async def receive_stream(scope, receive, send):
+    """
+    Stores an NDJSON stream chunk by chunk as it arrives.
+
+    Only the last incomplete line of a chunk is kept between chunks, so
+    memory use does not depend on the stream length.
+    """
+    count = 0
+    tail = b""
+    async for chunk in read_chunks(scope, receive):
+        lines = (tail + chunk).split(b"\n")
+        tail = lines.pop()
+        records = parse_ndjson(lines)
+        store.write(records)
+        count += len(records)
+    records = parse_ndjson([tail])
+    store.write(records)
+    count += len(records)
+    await send_json(send, 200, {"status": "received", "count": count})
+
+
+async def query_logs(scope, receive, send):
+    """
+    Returns one page of received logs matching the query string filters.
+    """
+    params = dict(parse_qsl(scope["query_string"].decode()))
+    # SQLite blocks, so the query runs in a worker thread with its own connection.
+    page = await asyncio.to_thread(query_from_params, store.index, params)
+    await send_json(send, 200, page)
+
+
+ROUTES = {
+    "/log": ("POST", receive_log),
+    "/log/bulk": ("POST", receive_bulk),
+    "/log/stream": ("POST", receive_stream),
+    "/logs": ("GET", query_logs),
+}
+
+
+async def lifespan(receive, send):
+    """
+    Opens the log store on startup and flushes it on shutdown.
+    """
+    global store
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            store = RotatingLogStore(LOG_STORE_DIR, index=LogIndex(LOG_INDEX_PATH))
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            store.close()
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+async def app(scope, receive, send):
+    """
+    ASGI entry point.
+    """
+    if scope["type"] == "lifespan":
+        await lifespan(receive, send)
+        return
+    if scope["type"] != "http":
+        return
+
+    route = ROUTES.get(scope["path"])
+    if route is None:
+        await send_json(send, 404, {"status": "error", "detail": "Not found"})
+        return
+    method, handler = route
+    if scope["method"] != method:
+        await send_json(send, 405, {"status": "error", "detail": "Method not allowed"})
+        return
+    try:
+        await handler(scope, receive, send)
+    except (ValueError, zlib.error) as error:
+        await send_json(send, 400, {"status": "error", "detail": str(error) or "Invalid request"})
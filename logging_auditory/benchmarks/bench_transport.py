@@ -0,0 +1,105 @@
+"""
+Micro-benchmark of the log shipper transport.
+
+Starts the receiver from ``api.py`` on a local port and measures how many
+records per second ``JSONHTTPHandler`` delivers with and without connection
+pooling.
+
+The Werkzeug development server answers every request with
+``Connection: close``, so against it pooling can only save the per-record
+setup work. To see the keep-alive effect, serve ``api.py`` with a server that
+supports it and point the benchmark at it:
+
+    gunicorn -k gthread --threads 8 -b 127.0.0.1:5000 api:app
+    python benchmarks/bench_transport.py --host 127.0.0.1:5000
+
+Usage:
+    python benchmarks/bench_transport.py --records 2000
+"""
+import argparse
+import contextlib
+import io
+import logging
+import os
+import sys
+import threading
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from werkzeug.serving import make_server
+import api
+from logging_ import JSONHTTPHandler
+
+
+def start_receiver(port):
+    """
+    Runs the Flask receiver in a background thread.
+
+    Args:
+        port (int): Port to listen on.
+
+    Returns:
+        werkzeug.serving.BaseWSGIServer: Running server.
+    """
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    server = make_server("127.0.0.1", port, api.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def run(records, host, **handler_options):
+    """
+    Sends records through a handler and measures the throughput.
+
+    Args:
+        records (int): Number of records to send.
+        host (str): Receiver address (``host:port``).
+        **handler_options: Options passed to ``JSONHTTPHandler``.
+
+    Returns:
+        float: Delivered records per second.
+    """
+    handler = JSONHTTPHandler(host=host, url="/log", **handler_options)
+    handler.setFormatter(logging.Formatter())
+    record = logging.LogRecord("bench", logging.CRITICAL, __file__, 0, "benchmark record", None, None)
+    start = time.perf_counter()
+    for _ in range(records):
+        handler.emit(record)
+    handler.flush(timeout=None)
+    elapsed = time.perf_counter() - start
+    handler.close()
+    return records / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--records", type=int, default=2000)
+    parser.add_argument("--port", type=int, default=5099)
+    parser.add_argument("--host", help="use an already running receiver instead of a local one")
+    args = parser.parse_args()
+
+    server = None
+    host = args.host
+    if host is None:
+        server = start_receiver(args.port)
+        host = f"127.0.0.1:{args.port}"
+    modes = {
+        "requests.post per record": {"pooled": False},
+        "pooled session": {"pooled": True},
+        "pooled session + gzip": {"pooled": True, "compress": True},
+        "pooled session + batching": {"pooled": True, "batching": True, "batch_size": 500},
+    }
+    try:
+        for title, options in modes.items():
+            # The receiver prints every record; keep the benchmark output readable.
+            with contextlib.redirect_stdout(io.StringIO()):
+                rate = run(args.records, host, **options)
+            print(f"{title:<28} {rate:10.0f} records/sec")
+    finally:
+        if server is not None:
+            server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
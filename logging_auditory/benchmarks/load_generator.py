@@ -0,0 +1,121 @@
+"""
+Load generator for the log ingestion server.
+
+Sends log records from several concurrent clients and reports request
+latency percentiles and the sustained ingestion rate.
+
+Usage:
+    uvicorn asgi:app --workers 4 --port 5000
+    python benchmarks/load_generator.py --url http://127.0.0.1:5000 --mode bulk --batch 500
+
+Modes:
+    single  one record per request to /log
+    bulk    a JSON array of ``--batch`` records per request to /log/bulk
+    stream  an NDJSON stream of ``--batch`` records per request to /log/stream
+"""
+import argparse
+import json
+import statistics
+import threading
+import time
+import requests
+
+
+def make_record(client, number):
+    """
+    Builds a log record shaped like the ones ``JSONHTTPHandler`` sends.
+
+    Args:
+        client (int): Index of the client thread.
+        number (int): Sequence number of the record.
+
+    Returns:
+        dict: Log record.
+    """
+    return {
+        "time": time.strftime("%Y-%m-%d %H:%M:%S,000"),
+        "level": "CRITICAL",
+        "message": f"load test record {number} from client {client}",
+        "name": f"loadgen.client{client}",
+    }
+
+
+def build_request(mode, url, client, number, batch):
+    """
+    Prepares the URL, body and headers of one request.
+
+    Returns:
+        tuple[str, bytes, dict, int]: URL, body, headers and number of records.
+    """
+    if mode == "single":
+        body = json.dumps(make_record(client, number)).encode()
+        return f"{url}/log", body, {"Content-Type": "application/json"}, 1
+    records = [make_record(client, number + i) for i in range(batch)]
+    if mode == "bulk":
+        body = json.dumps(records).encode()
+        return f"{url}/log/bulk", body, {"Content-Type": "application/json"}, batch
+    body = "".join(json.dumps(record) + "\n" for record in records).encode()
+    return f"{url}/log/stream", body, {"Content-Type": "application/x-ndjson"}, batch
+
+
+def client_loop(client, args, deadline, latencies, counts):
+    """
+    Sends requests over one keep-alive session until the deadline.
+    """
+    session = requests.Session()
+    number = 0
+    sent = 0
+    while time.perf_counter() < deadline:
+        target, body, headers, records = build_request(args.mode, args.url, client, number, args.batch)
+        start = time.perf_counter()
+        response = session.post(target, data=body, headers=headers)
+        latencies.append(time.perf_counter() - start)
+        response.raise_for_status()
+        number += records
+        sent += records
+    counts[client] = sent
+
+
+def percentile(values, fraction):
+    """
+    Returns:
+        float: The value below which ``fraction`` of the sorted values fall.
+    """
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://127.0.0.1:5000")
+    parser.add_argument("--mode", choices=("single", "bulk", "stream"), default="bulk")
+    parser.add_argument("--batch", type=int, default=500, help="records per bulk/stream request")
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds")
+    args = parser.parse_args()
+
+    latencies = []
+    counts = [0] * args.clients
+    started = time.perf_counter()
+    deadline = started + args.duration
+    threads = [
+        threading.Thread(target=client_loop, args=(client, args, deadline, latencies, counts))
+        for client in range(args.clients)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    print(f"mode={args.mode} clients={args.clients} batch={args.batch if args.mode != 'single' else 1}")
+    print(f"requests:   {len(latencies)}")
+    print(f"p50:        {percentile(latencies, 0.50) * 1000:.2f} ms")
+    print(f"p99:        {percentile(latencies, 0.99) * 1000:.2f} ms")
+    print(f"mean:       {statistics.mean(latencies) * 1000:.2f} ms")
+    print(f"throughput: {sum(counts) / elapsed:.0f} records/sec")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+
+
+OVERFLOW_POLICIES = ("drop-oldest", "block", "spill")
+
+
+class BatchQueue:
+    """
+    Bounded in-memory buffer between a logging handler and its delivery worker.
+
+    When the buffer is full the configured overflow policy decides what
+    happens to a new entry:
+
+    - ``"drop-oldest"`` discards the oldest buffered entry;
+    - ``"block"`` makes the logging call wait for free space;
+    - ``"spill"`` writes the new entry to the disk spool.
+    """
+    def __init__(self, maxsize=10000, overflow="drop-oldest", spill=None, block_timeout=None):
+        """
+        Args:
+            maxsize (int): Maximum number of buffered entries.
+            overflow (str): One of ``OVERFLOW_POLICIES``.
+            spill (spool.Spool, optional): Destination for the ``"spill"`` policy.
+            block_timeout (float, optional): How long the ``"block"`` policy waits
+                before the new entry is dropped. ``None`` waits indefinitely.
+
+        Raises:
+            ValueError: If the overflow policy is unknown or ``"spill"`` is used
+                without a spill destination.
+        """
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy: {overflow!r}")
+        if overflow == "spill" and spill is None:
+            raise ValueError("The 'spill' overflow policy requires a spill destination")
+        self.maxsize = maxsize
+        self.overflow = overflow
+        self.spill = spill
+        self.block_timeout = block_timeout
+        self.dropped = 0
+        self._items = deque()
+        self._unfinished = 0
+        self._closed = False
+        self._cond = threading.Condition()
+
+    def put(self, entry):
+        """
+        Adds a log entry to the buffer, applying the overflow policy if it is full.
+
+        Args:
+            entry (dict): Log entry to deliver.
+        """
+        with self._cond:
+            if len(self._items) >= self.maxsize:
+                if self.overflow == "spill":
+                    self.spill.append([entry])
+                    return
+                if self.overflow == "block":
+                    has_space = self._cond.wait_for(
+                        lambda: len(self._items) < self.maxsize or self._closed,
+                        self.block_timeout,
+                    )
+                    if not has_space or self._closed:
+                        self.dropped += 1
+                        return
+                else:
+                    self._items.popleft()
+                    self._unfinished -= 1
+                    self.dropped += 1
+            self._items.append(entry)
+            self._unfinished += 1
+            self._cond.notify_all()
+
+    def get_batch(self, max_items, linger):
+        """
+        Waits for a batch of entries.
+
+        Returns as soon as ``max_items`` entries are buffered or ``linger``
+        seconds have passed since the first entry of the batch became available.
+
+        Args:
+            max_items (int): Maximum batch size.
+            linger (float): Maximum time to wait for the batch to fill up.
+
+        Returns:
+            list[dict]: Buffered entries; empty once the queue is closed and drained.
+        """
+        with self._cond:
+            self._cond.wait_for(lambda: self._items or self._closed)
+            deadline = time.monotonic() + linger
+            while len(self._items) < max_items and not self._closed:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            count = min(max_items, len(self._items))
+            batch = [self._items.popleft() for _ in range(count)]
+            self._cond.notify_all()
+            return batch
+
+    def task_done(self, count):
+        """
+        Marks entries returned by ``get_batch`` as delivered (or given up on).
+
+        Args:
+            count (int): Number of processed entries.
+        """
+        with self._cond:
+            self._unfinished -= count
+            self._cond.notify_all()
+
+    def join(self, timeout=None):
+        """
+        Waits until every buffered entry has been processed.
+
+        Args:
+            timeout (float, optional): Maximum time to wait.
+
+        Returns:
+            bool: ``True`` if the buffer was drained in time.
+        """
+        with self._cond:
+            return self._cond.wait_for(lambda: self._unfinished <= 0, timeout)
+
+    def close(self):
+        """
+        Stops accepting new batches and wakes up all waiters.
+        """
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def __len__(self):
+        return len(self._items)
+
+
+class BatchWorker(threading.Thread):
+    """
+    Background thread that drains a ``BatchQueue`` and delivers entries in batches.
+    """
+    def __init__(self, queue, send, batch_size=100, linger=1.0):
+        """
+        Args:
+            queue (BatchQueue): Buffer to drain.
+            send (callable): Function that delivers a list of entries and raises
+                on failure.
+            batch_size (int): Maximum number of entries per delivery.
+            linger (float): Maximum time an entry waits for its batch to fill up.
+        """
+        super().__init__(name="log-batch-worker", daemon=True)
+        self.queue = queue
+        self.send = send
+        self.batch_size = batch_size
+        self.linger = linger
+
+    def run(self):
+        """
+        Delivers batches until the queue is closed and empty.
+        """
+        while True:
+            batch = self.queue.get_batch(self.batch_size, self.linger)
+            if not batch:
+                break
+            self._deliver(batch)
+            self.queue.task_done(len(batch))
+
+    def _deliver(self, batch):
+        """
+        Sends a single batch, reporting failures the same way ``logging`` does.
+
+        Args:
+            batch (list[dict]): Entries to deliver.
+        """
+        try:
+            self.send(batch)
+        except Exception:
+            if logging.raiseExceptions:
+                sys.stderr.write(f"--- Failed to deliver a batch of {len(batch)} log records ---\n")
+                traceback.print_exc(file=sys.stderr)
+
+    def stop(self, timeout=None):
+        """
+        Closes the queue and waits for the remaining entries to be delivered.
+
+        Args:
+            timeout (float, optional): Maximum time to wait for the thread.
+        """
+        self.queue.close()
+        self.join(timeout)
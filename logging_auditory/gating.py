@@ -0,0 +1,148 @@
+import logging
+import random
+import threading
+import time
+import structlog
+
+
+class Lazy:
+    """
+    A log value that is computed only if the record is actually emitted.
+
+    Example:
+        log.info("cart updated", cart=lazy(render_cart, cart))
+    """
+    __slots__ = ("func", "args", "kwargs")
+
+    def __init__(self, func, *args, **kwargs):
+        """
+        Args:
+            func (callable): Function that computes the value.
+            *args: Positional arguments for ``func``.
+            **kwargs: Keyword arguments for ``func``.
+        """
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+
+    def __call__(self):
+        return self.func(*self.args, **self.kwargs)
+
+
+lazy = Lazy
+
+
+class LogSampler:
+    """
+    Per-logger rate limiting and probabilistic sampling of noisy levels.
+
+    Only records of ``levels`` (INFO and WARNING by default) are affected;
+    errors always pass. A record is first kept with probability
+    ``sample_rate`` and then has to fit into a token bucket of ``rate_limit``
+    records per second. Dropped records are counted and, once per
+    ``report_interval`` seconds, reported through ``report``.
+    """
+    def __init__(self, rate_limit=None, sample_rate=1.0, levels=(logging.INFO, logging.WARNING),
+                 report_interval=60.0, report=None):
+        """
+        Args:
+            rate_limit (float, optional): Maximum records per second; ``None`` disables the limit.
+            sample_rate (float): Probability of keeping a record, from 0 to 1.
+            levels (Iterable[int]): Levels the sampler applies to.
+            report_interval (float): Seconds between reports of dropped counts.
+            report (callable, optional): Called as ``report(sampled, rate_limited, interval)``
+                with the numbers of records dropped since the previous report.
+        """
+        self.rate_limit = rate_limit
+        self.sample_rate = sample_rate
+        self.levels = frozenset(levels)
+        self.report_interval = report_interval
+        self.report = report
+        self.sampled = 0
+        self.rate_limited = 0
+        self._tokens = rate_limit or 0.0
+        self._refilled_at = time.monotonic()
+        self._reported_at = self._refilled_at
+        self._lock = threading.Lock()
+
+    def allow(self, level):
+        """
+        Decides whether a record of the given level is kept.
+
+        Args:
+            level (int): Numeric level of the record.
+
+        Returns:
+            bool: ``True`` if the record should be logged.
+        """
+        if level not in self.levels:
+            return True
+        with self._lock:
+            now = time.monotonic()
+            allowed = True
+            if self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+                self.sampled += 1
+                allowed = False
+            elif self.rate_limit is not None:
+                self._tokens = min(self.rate_limit, self._tokens + (now - self._refilled_at) * self.rate_limit)
+                self._refilled_at = now
+                if self._tokens < 1.0:
+                    self.rate_limited += 1
+                    allowed = False
+                else:
+                    self._tokens -= 1.0
+            report = None
+            if now - self._reported_at >= self.report_interval:
+                if self.sampled or self.rate_limited:
+                    report = (self.sampled, self.rate_limited, now - self._reported_at)
+                self.sampled = self.rate_limited = 0
+                self._reported_at = now
+        if report is not None and self.report is not None:
+            self.report(*report)
+        return allowed
+
+
+class GatedBoundLogger(structlog.BoundLoggerBase):
+    """
+    structlog wrapper around a standard library logger that filters records
+    before any event dictionary is built.
+
+    The level check and the logger's ``LogSampler`` (if any) run first; only
+    records that pass them go through the processor chain, and ``Lazy``
+    values are evaluated only then.
+    """
+    # Samplers by logger name; bound copies of a logger share its sampler.
+    samplers = {}
+
+    def _log(self, level, method_name, event, event_kw):
+        if not self._logger.isEnabledFor(level):
+            return None
+        sampler = self.samplers.get(self._logger.name)
+        if sampler is not None and not sampler.allow(level):
+            return None
+        if isinstance(event, Lazy):
+            event = event()
+        for key, value in event_kw.items():
+            if isinstance(value, Lazy):
+                event_kw[key] = value()
+        return self._proxy_to_logger(method_name, event, **event_kw)
+
+    def debug(self, event=None, **event_kw):
+        return self._log(logging.DEBUG, "debug", event, event_kw)
+
+    def info(self, event=None, **event_kw):
+        return self._log(logging.INFO, "info", event, event_kw)
+
+    def warning(self, event=None, **event_kw):
+        return self._log(logging.WARNING, "warning", event, event_kw)
+
+    warn = warning
+
+    def error(self, event=None, **event_kw):
+        return self._log(logging.ERROR, "error", event, event_kw)
+
+    def exception(self, event=None, **event_kw):
+        return self._log(logging.ERROR, "exception", event, event_kw)
+
+    def critical(self, event=None, **event_kw):
+        return self._log(logging.CRITICAL, "critical", event, event_kw)
@@ -1,9 +1,21 @@
 import logging
 import sys
+import threading
 import structlog
-import json
 from logging.handlers import HTTPHandler
-import requests
+from delivery import BatchQueue, BatchWorker
+from gating import GatedBoundLogger, LogSampler, lazy
+from pseudonymize import Pseudonymizer, load_key
+from redaction import RedactionEngine, fast_renderer
+from spool import CircuitBreaker, ReplayWorker, Spool
+from transport import HTTPTransport, is_transient
+
+# `lazy` is re-exported so applications wrap expensive values with the loggers they get here.
+__all__ = [
+    "FORMATTER", "FORMATTER_STRING", "JSONHTTPHandler", "censor_password", "get_logger",
+    "get_struct_logger", "lazy", "log", "pseudonymizer", "redaction", "render_metrics",
+    "replace_user", "user_token",
+]
 
 FORMATTER_STRING = "%(asctime)s — %(name)s — %(levelname)s — %(message)s"
 FORMATTER = logging.Formatter(FORMATTER_STRING)
@@ -12,13 +24,99 @@ FORMATTER = logging.Formatter(FORMATTER_STRING)
 class JSONHTTPHandler(HTTPHandler):
     """
     Custom HTTPHandler that sends logs in JSON format.
+
+    By default every record is posted synchronously from the logging call.
+    With ``batching=True`` records are put into a bounded in-memory buffer and
+    a background worker posts them as JSON arrays, so the caller never waits
+    for the network.
+
+    With ``spool_dir`` set, a circuit breaker stops delivery attempts after
+    repeated failures and records go to an on-disk spool instead of being
+    lost. A replay worker sends the spool back in order, at a capped rate,
+    once the server is reachable again.
     """
-    def emit(self, record):
+    def __init__(self, host, url, method="POST", secure=False, credentials=None,
+                 context=None, batching=False, batch_size=100, linger=1.0,
+                 queue_size=10000, overflow="drop-oldest", block_timeout=None,
+                 pooled=True, pool_size=10, timeout=5.0, retries=None,
+                 backoff_factor=0.5, compress=False, spool_dir=None,
+                 failure_threshold=5, reset_timeout=30.0,
+                 spool_segment_bytes=1024 * 1024, spool_max_bytes=64 * 1024 * 1024,
+                 replay_rate=500.0):
         """
-        Processes and sends log records in JSON format.
+        Args:
+            host (str): Address of the logging server (``host:port``).
+            url (str): Endpoint that receives the logs.
+            method (str): HTTP method used to send the logs.
+            secure (bool): Use HTTPS instead of HTTP.
+            credentials (tuple, optional): Basic auth ``(username, password)``.
+            context (ssl.SSLContext, optional): SSL context for HTTPS.
+            batching (bool): Deliver records from a background worker in batches.
+            batch_size (int): Maximum number of records per batch.
+            linger (float): Maximum time in seconds a record waits for its batch to fill up.
+            queue_size (int): Capacity of the in-memory buffer.
+            overflow (str): What to do when the buffer is full:
+                ``"drop-oldest"``, ``"block"`` or ``"spill"``.
+            block_timeout (float, optional): How long the ``"block"`` policy waits for
+                free space before dropping the record. ``None`` waits indefinitely.
+            pooled (bool): Reuse keep-alive connections through a pooled session.
+            pool_size (int): Maximum number of kept-alive connections.
+            timeout (float): Connect and read timeout in seconds.
+            retries (int, optional): Number of retries with exponential backoff.
+                Defaults to 0 for synchronous delivery, so a logging call never
+                waits out backoff delays, and to 3 with batching.
+            backoff_factor (float): Base delay between retries in seconds.
+            compress (bool): Send gzip-compressed request bodies.
+            spool_dir (str, optional): Directory of the disk spool. Required by the
+                ``"spill"`` overflow policy.
+            failure_threshold (int): Consecutive failures that trip the circuit breaker.
+            reset_timeout (float): Seconds before a tripped breaker probes the server again.
+            spool_segment_bytes (int): Size of a single spool segment file.
+            spool_max_bytes (int): Maximum disk usage of the spool.
+            replay_rate (float): Maximum records per second replayed from the spool.
+        """
+        super().__init__(host, url, method, secure, credentials, context)
+        scheme = "https" if secure else "http"
+        if retries is None:
+            retries = 3 if batching else 0
+        self.transport = HTTPTransport(
+            f"{scheme}://{host}{url}",
+            pooled=pooled,
+            pool_size=pool_size,
+            timeout=timeout,
+            retries=retries,
+            backoff_factor=backoff_factor,
+            compress=compress,
+            credentials=credentials,
+        )
+        self.spool = None
+        self.breaker = None
+        self._replay = None
+        if spool_dir:
+            self.spool = Spool(spool_dir, spool_segment_bytes, spool_max_bytes)
+            self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+            self._replay = ReplayWorker(
+                self.spool, self.breaker, self.transport.post, is_transient,
+                batch_size=batch_size, max_rate=replay_rate,
+            )
+            self._replay.start()
+
+        self._queue = None
+        self._worker = None
+        if batching:
+            self._queue = BatchQueue(queue_size, overflow, self.spool, block_timeout)
+            self._worker = BatchWorker(self._queue, self.send, batch_size, linger)
+            self._worker.start()
+
+    def format_entry(self, record):
+        """
+        Converts a log record into a JSON-serializable dictionary.
 
         Args:
-            record (logging.LogRecord): The log record to be sent.
+            record (logging.LogRecord): The log record to convert.
+
+        Returns:
+            dict: Log entry with time, level, message, logger name and exception.
         """
         log_entry = {
             "time": self.formatter.formatTime(record),
@@ -28,30 +126,118 @@ class JSONHTTPHandler(HTTPHandler):
         }
         if record.exc_info:
             log_entry["exception"] = self.formatter.formatException(record.exc_info)
+        return log_entry
+
+    def send(self, payload):
+        """
+        Posts a log entry or a list of log entries to the logging server.
+
+        When a spool is configured, the payload is spooled instead if the
+        circuit breaker is open, the spool still holds older records (to keep
+        the order) or the delivery fails with a transient error.
+
+        Args:
+            payload (dict | list[dict]): Data to send as JSON.
+        """
+        if self.spool is None:
+            self.transport.post(payload)
+            return
 
-        # Send the log data as JSON
-        headers = {"Content-Type": "application/json"}
+        entries = payload if isinstance(payload, list) else [payload]
+        if self.spool.pending or not self.breaker.allow_request():
+            self._spool(entries)
+            return
         try:
-            requests.post(
-                f"http://{self.host}{self.url}",
-                data=json.dumps(log_entry),
-                headers=headers
-            )
+            self.transport.post(payload)
+        except Exception as error:
+            if not is_transient(error):
+                # The server answered, so it is up; only the payload was rejected.
+                self.breaker.record_success()
+                raise
+            self.breaker.record_failure()
+            self._spool(entries)
+        else:
+            self.breaker.record_success()
+
+    def _spool(self, entries):
+        self.spool.append(entries)
+        self._replay.notify()
+
+    def emit(self, record):
+        """
+        Processes and sends log records in JSON format.
+
+        Args:
+            record (logging.LogRecord): The log record to be sent.
+        """
+        try:
+            log_entry = self.format_entry(record)
+            if self._queue is not None:
+                self._queue.put(log_entry)
+            else:
+                # Send the log data as JSON
+                self.send(log_entry)
         except Exception as e:
             self.handleError(record)
 
+    def flush(self, timeout=5.0):
+        """
+        Waits until the buffered records have been delivered.
+
+        Args:
+            timeout (float, optional): Maximum time to wait.
+        """
+        if self._queue is not None:
+            self._queue.join(timeout)
+
+    def close(self):
+        """
+        Stops the background workers after delivering the buffered records.
+
+        Records that are still spooled stay on disk and are replayed by the
+        next handler that uses the same ``spool_dir``.
+        """
+        if self._worker is not None:
+            self._worker.stop(timeout=5.0)
+            self._worker = None
+        if self._replay is not None:
+            self._replay.stop(timeout=5.0)
+            self._replay = None
+            self.spool.close()
+        self.transport.close()
+        super().close()
+
+
+
+# Loggers configured by `get_logger`, by name.
+_loggers = {}
+_loggers_lock = threading.Lock()
 
 
-def get_logger(logger_name):
+def get_logger(logger_name, **http_options):
     """
     Creates and configures a logger.
 
+    The logger is configured once: later calls with the same name return
+    the same logger without adding handlers again.
+
     Args:
         logger_name (str): The name of the logger.
+        **http_options: Extra keyword arguments for ``JSONHTTPHandler``,
+            e.g. ``batching=True, batch_size=500, overflow="spill"``.
+            Only used by the first call for a name.
 
     Returns:
         logging.Logger: Configured logger instance.
     """
+    with _loggers_lock:
+        logger = _loggers.get(logger_name)
+        if logger is None:
+            logger = _loggers[logger_name] = _configure_logger(logger_name, http_options)
+    return logger
+
+
+def _configure_logger(logger_name, http_options):
     logger = logging.getLogger(logger_name)
     logger.setLevel(logging.INFO)
 
@@ -63,7 +249,8 @@ def get_logger(logger_name):
     http_handler = JSONHTTPHandler(
         host="127.0.0.1:5000",  # Local logging server
         url="/log",  # API endpoint
-        method="POST"  # Request method
+        method="POST",  # Request method
+        **http_options
     )
     http_handler.setLevel(logging.CRITICAL)
     http_handler.setFormatter(logging.Formatter('{"time": "%(asctime)s", "level": "%(levelname)s", "message": "%(message)s"}'))
@@ -84,10 +271,27 @@ def replace_user(_, __, event_dict):
     """
     user = event_dict.get("user")
     if user:
-        user_token = "some_string_that_we_can_learn_username_from"
-        event_dict["user"] = user_token
+        event_dict["user"] = user_token(user)
     return event_dict
 
+def user_token(user):
+    """
+    Returns the token that replaces a username in logs.
+
+    The token is a keyed HMAC of the username (see ``pseudonymize.py``): the
+    same user always gets the same token, and only the holder of the key
+    can look the username up.
+
+    Args:
+        user (str): The username.
+
+    Returns:
+        str: Token to log instead of the username.
+    """
+    if not user:
+        return user
+    return pseudonymizer.token(user)
+
 def censor_password(_, __, event_dict):
     """
     Masks passwords in logs to protect sensitive information.
@@ -102,14 +306,80 @@ def censor_password(_, __, event_dict):
         event_dict["password"] = "*CENSORED*"
     return event_dict
 
-log = structlog.wrap_logger(
-    get_logger("my_app_logger"),
-    processors=[
-        censor_password,
-        replace_user,
-        structlog.processors.JSONRenderer(indent=1, sort_keys=True),
-    ],
-)
+# Keyed, cached username tokens; the key comes from LOG_PSEUDONYM_KEY(_FILE)
+# or is generated once into `pseudonymize.DEFAULT_KEY_FILE`.
+pseudonymizer = Pseudonymizer(load_key())
+
+
+def render_metrics():
+    """
+    Renders the metrics of the logging pipeline in the Prometheus text format,
+    for the application to serve on its metrics endpoint.
+
+    Returns:
+        str: The metrics of the username token cache.
+    """
+    return pseudonymizer.render_metrics()
+
+# Sensitive fields of the application events, compiled into a single-pass processor.
+# It does the work of `censor_password` and `replace_user` in one walk over the event.
+redaction = RedactionEngine(keys=["password"], transforms={"user": user_token})
+
+# structlog loggers created by `get_struct_logger`, by name.
+_struct_loggers = {}
+
+
+def get_struct_logger(logger_name, processors=None, rate_limit=None, sample_rate=1.0,
+                      report_interval=60.0, **http_options):
+    """
+    Returns a cached structlog logger on top of ``get_logger``.
+
+    Level checks, sampling and rate limiting happen before the processor
+    chain runs, so filtered calls cost almost nothing; values wrapped in
+    ``lazy(...)`` are computed only for emitted records. Sampling and rate
+    limiting apply to INFO and WARNING records; the number of dropped
+    records is logged as a warning every ``report_interval`` seconds.
+
+    Args:
+        logger_name (str): The name of the logger.
+        processors (list[callable], optional): structlog processors. Defaults to
+            the redaction processor followed by the compact JSON renderer.
+        rate_limit (float, optional): Maximum INFO/WARNING records per second.
+        sample_rate (float): Share of INFO/WARNING records to keep, from 0 to 1.
+        report_interval (float): Seconds between reports of dropped records.
+        **http_options: Extra keyword arguments for ``JSONHTTPHandler``.
+
+    Returns:
+        GatedBoundLogger: Logger instance.
+    """
+    with _loggers_lock:
+        struct_logger = _struct_loggers.get(logger_name)
+        if struct_logger is not None:
+            return struct_logger
+    logger = get_logger(logger_name, **http_options)
+
+    if rate_limit is not None or sample_rate < 1.0:
+        def report(sampled, rate_limited, interval):
+            logger.warning(
+                "Dropped %d sampled and %d rate-limited records in the last %.1f s",
+                sampled, rate_limited, interval,
+            )
+        GatedBoundLogger.samplers[logger_name] = LogSampler(
+            rate_limit=rate_limit,
+            sample_rate=sample_rate,
+            report_interval=report_interval,
+            report=report,
+        )
+
+    if processors is None:
+        processors = [redaction.compile(), fast_renderer()]
+    with _loggers_lock:
+        return _struct_loggers.setdefault(
+            logger_name, structlog.wrap_logger(logger, processors=processors, wrapper_class=GatedBoundLogger)
+        )
+
+
+log = get_struct_logger("my_app_logger")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,218 @@
+"""
+Keyed pseudonymization of usernames in logs.
+
+Every username is replaced by a stable token ``HMAC-SHA256(key, username)``,
+so events of the same user can still be correlated, but the username can
+only be recovered by someone who has the key. Recent tokens are kept in a
+bounded LRU cache, so a repeated user costs a dictionary lookup instead of
+an HMAC computation.
+
+The module also works as an offline lookup tool for people who have the key:
+
+    python pseudonymize.py token --key-file secret.key alice bob
+    python pseudonymize.py lookup --key-file secret.key --users usernames.txt u_3f1a9c0e5b7d2468
+"""
+import argparse
+import hashlib
+import hmac
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+
+# Environment variables with the pseudonymization key (hex string) or a file that contains it.
+KEY_ENV = "LOG_PSEUDONYM_KEY"
+KEY_FILE_ENV = "LOG_PSEUDONYM_KEY_FILE"
+# Key file used when neither variable is set.
+DEFAULT_KEY_FILE = os.path.join(os.path.expanduser("~"), ".log_pseudonym.key")
+
+
+def load_key(path=None):
+    """
+    Loads the pseudonymization key.
+
+    The key is read from ``path``, then from the file named by
+    ``LOG_PSEUDONYM_KEY_FILE``, then from ``LOG_PSEUDONYM_KEY``, and finally
+    from ``DEFAULT_KEY_FILE``. A missing key file is created with a new random
+    key, readable only by its owner, so tokens stay the same across restarts
+    and can be looked up later with the same file.
+
+    Args:
+        path (str, optional): File with the key as a hex string.
+
+    Returns:
+        bytes: The key.
+    """
+    path = path or os.environ.get(KEY_FILE_ENV)
+    if not path and os.environ.get(KEY_ENV):
+        return bytes.fromhex(os.environ[KEY_ENV])
+    path = path or DEFAULT_KEY_FILE
+    try:
+        # Exclusive creation: of two processes starting at once, only one writes the key.
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    except FileExistsError:
+        with open(path) as key_file:
+            return bytes.fromhex(key_file.read().strip())
+    key = os.urandom(32)
+    with os.fdopen(fd, "w") as key_file:
+        key_file.write(key.hex() + "\n")
+    return key
+
+
+class Pseudonymizer:
+    """
+    Turns usernames into keyed tokens with a bounded LRU cache.
+    """
+    def __init__(self, key, cache_size=10000, prefix="u_", length=16):
+        """
+        Args:
+            key (bytes): Secret HMAC key.
+            cache_size (int): Maximum number of cached tokens.
+            prefix (str): Prefix of every token, so tokens are recognizable in logs.
+            length (int): Number of hex digits of the HMAC kept in the token.
+        """
+        self._key = key
+        self.cache_size = cache_size
+        self.prefix = prefix
+        self.length = length
+        self.hits = 0
+        self.misses = 0
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def compute(self, user):
+        """
+        Computes the token of a username without using the cache.
+
+        Args:
+            user (str): The username.
+
+        Returns:
+            str: The token.
+        """
+        digest = hmac.new(self._key, str(user).encode(), hashlib.sha256).hexdigest()
+        return self.prefix + digest[:self.length]
+
+    def token(self, user):
+        """
+        Returns the token of a username, using the cache when possible.
+
+        Args:
+            user (str): The username.
+
+        Returns:
+            str: The token.
+        """
+        with self._lock:
+            token = self._cache.get(user)
+            if token is not None:
+                self._cache.move_to_end(user)
+                self.hits += 1
+                return token
+        token = self.compute(user)
+        with self._lock:
+            self.misses += 1
+            self._cache[user] = token
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return token
+
+    def processor(self, field="user"):
+        """
+        Creates a structlog processor that pseudonymizes one event field.
+
+        Args:
+            field (str): Name of the field with the username.
+
+        Returns:
+            callable: Processor ``(logger, method_name, event_dict) -> event_dict``.
+        """
+        def pseudonymize(_, __, event_dict):
+            user = event_dict.get(field)
+            if user:
+                event_dict[field] = self.token(user)
+            return event_dict
+        return pseudonymize
+
+    def metrics(self):
+        """
+        Reports cache statistics.
+
+        Returns:
+            dict: Hits, misses, hit rate, current size and capacity of the cache.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "size": len(self._cache),
+                "capacity": self.cache_size,
+            }
+
+    def render_metrics(self, namespace="log_pseudonym_cache"):
+        """
+        Renders the cache statistics in the Prometheus text exposition format.
+
+        Args:
+            namespace (str): Prefix of the metric names.
+
+        Returns:
+            str: The metrics.
+        """
+        metrics = self.metrics()
+        lines = []
+        for name, key, kind, help in (
+            ("hits_total", "hits", "counter", "Tokens answered from the cache."),
+            ("misses_total", "misses", "counter", "Tokens computed with HMAC."),
+            ("entries", "size", "gauge", "Cached tokens."),
+            ("capacity", "capacity", "gauge", "Maximum number of cached tokens."),
+        ):
+            lines += [f"# HELP {namespace}_{name} {help}", f"# TYPE {namespace}_{name} {kind}",
+                      f"{namespace}_{name} {metrics[key]}"]
+        return "\n".join(lines) + "\n"
+
+
+def main():
+    """
+    Offline lookup tool: computes tokens and maps tokens back to usernames.
+    """
+    parser = argparse.ArgumentParser(description="Offline lookup of pseudonymized usernames")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    token_parser = subparsers.add_parser("token", help="print the tokens of usernames")
+    token_parser.add_argument("users", nargs="+")
+
+    lookup_parser = subparsers.add_parser("lookup", help="find the usernames behind tokens")
+    lookup_parser.add_argument("--users", required=True,
+                               help="file with candidate usernames, one per line ('-' for stdin)")
+    lookup_parser.add_argument("tokens", nargs="+")
+
+    for sub in (token_parser, lookup_parser):
+        sub.add_argument("--key-file", help=f"file with the hex key (default: ${KEY_FILE_ENV} or ${KEY_ENV})")
+        sub.add_argument("--length", type=int, default=16, help="hex digits per token")
+    args = parser.parse_args()
+
+    pseudonymizer = Pseudonymizer(load_key(args.key_file), length=args.length)
+    if args.command == "token":
+        for user in args.users:
+            print(f"{user}\t{pseudonymizer.compute(user)}")
+        return
+
+    wanted = set(args.tokens)
+    found = {}
+    candidates = sys.stdin if args.users == "-" else open(args.users, encoding="utf-8")
+    with candidates:
+        for line in candidates:
+            user = line.rstrip("\n")
+            token = pseudonymizer.compute(user)
+            if token in wanted:
+                found[token] = user
+    for token in args.tokens:
+        print(f"{token}\t{found.get(token, '<unknown>')}")
+
+
+if __name__ == "__main__":
+    main()
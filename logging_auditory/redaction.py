@@ -0,0 +1,128 @@
+import json
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; the standard json module is used without it
+    orjson = None
+
+
+DEFAULT_MASK = "*CENSORED*"
+
+
+class RedactionEngine:
+    """
+    Declarative redaction of sensitive fields in structlog event dictionaries.
+
+    Sensitive top-level keys and nested dotted paths (``"request.headers.authorization"``)
+    are compiled once into a rule tree. The compiled processor walks only that
+    tree, not the whole event, so each log call costs one lookup per rule.
+    The event dictionary, which structlog builds anew for every call, is
+    changed in place; nested dictionaries on a rule path belong to the caller
+    and are copied before they are changed.
+
+    Besides masking, a key can be mapped through a transform function, which
+    lets value replacements such as user tokens run in the same pass.
+
+    Example:
+        engine = RedactionEngine(keys=["password"], paths=["request.headers.authorization"])
+        log = structlog.wrap_logger(logger, processors=[engine.compile(), fast_renderer()])
+    """
+    def __init__(self, keys=(), paths=(), transforms=None, mask=DEFAULT_MASK):
+        """
+        Args:
+            keys (Iterable[str]): Top-level keys whose values are masked.
+            paths (Iterable[str]): Dotted paths into nested dictionaries whose values are masked.
+            transforms (dict[str, callable], optional): Top-level keys mapped to
+                functions that compute the replacement value from the original one.
+            mask (str): Replacement for masked values.
+        """
+        self.keys = frozenset(keys)
+        self.paths = tuple(paths)
+        self.transforms = dict(transforms or {})
+        self.mask = mask
+
+    def _rule_tree(self):
+        """
+        Builds the nested rule tree.
+
+        Leaves are either ``None`` (mask the value) or a transform function;
+        inner nodes are dictionaries of child rules.
+
+        Returns:
+            dict: Rule tree keyed by field name.
+        """
+        tree = {}
+        for key in self.keys:
+            tree[key] = None
+        for path in self.paths:
+            *parents, leaf = path.split(".")
+            node = tree
+            for part in parents:
+                child = node.get(part)
+                if not isinstance(child, dict):
+                    child = node[part] = {}
+                node = child
+            node[leaf] = None
+        for key, transform in self.transforms.items():
+            tree[key] = transform
+        return tree
+
+    def compile(self):
+        """
+        Compiles the rules into a structlog processor.
+
+        Returns:
+            callable: Processor ``(logger, method_name, event_dict) -> event_dict``.
+        """
+        mask = self.mask
+
+        def compile_node(node):
+            rules = []
+            for key, rule in node.items():
+                if isinstance(rule, dict):
+                    rules.append((key, 2, compile_node(rule)))
+                elif rule is None:
+                    rules.append((key, 0, None))
+                else:
+                    rules.append((key, 1, rule))
+            return tuple(rules)
+
+        def apply(event, rules):
+            for key, kind, rule in rules:
+                if key in event:
+                    if kind == 0:
+                        event[key] = mask
+                    elif kind == 1:
+                        event[key] = rule(event[key])
+                    elif isinstance(event[key], dict):
+                        event[key] = nested = dict(event[key])
+                        apply(nested, rule)
+
+        rules = compile_node(self._rule_tree())
+
+        def redact(_, __, event_dict):
+            apply(event_dict, rules)
+            return event_dict
+
+        return redact
+
+
+def fast_renderer():
+    """
+    Creates a compact JSON renderer for the end of a structlog processor chain.
+
+    Unlike ``JSONRenderer(indent=1, sort_keys=True)`` it neither indents nor
+    sorts keys. When ``orjson`` is installed it is used for serialization.
+
+    Returns:
+        callable: Processor that turns the event dictionary into a JSON string.
+    """
+    if orjson is not None:
+        def render(_, __, event_dict):
+            return orjson.dumps(event_dict, default=repr).decode()
+    else:
+        encoder = json.JSONEncoder(separators=(",", ":"), default=repr)
+
+        def render(_, __, event_dict):
+            return encoder.encode(event_dict)
+    return render
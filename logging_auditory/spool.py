@@ -0,0 +1,354 @@
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+
+
+class CircuitBreaker:
+    """
+    Stops delivery attempts to an unreachable logging server.
+
+    After ``failure_threshold`` consecutive failures the breaker opens and
+    ``allow_request`` returns ``False`` for ``reset_timeout`` seconds, so the
+    logging call does not pay a connect timeout for every record. Then a
+    single probe request is allowed ("half-open"): any answer from the
+    server closes the breaker, even one that rejects the payload; a
+    transient failure opens it again.
+    """
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        """
+        Args:
+            failure_threshold (int): Consecutive failures that trip the breaker.
+            reset_timeout (float): Seconds to wait before probing the server again.
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self._opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def allow_request(self):
+        """
+        Tells whether a delivery attempt may be made now.
+
+        Returns:
+            bool: ``True`` if the request should be sent.
+        """
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                return True
+            return False
+
+    def retry_in(self):
+        """
+        Returns:
+            float: Seconds left until the next probe is allowed.
+        """
+        with self._lock:
+            if self.state != self.OPEN:
+                return 0.0
+            return max(0.0, self._opened_at + self.reset_timeout - time.monotonic())
+
+    def record_success(self):
+        """
+        Closes the breaker after a successful delivery.
+        """
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+
+    def record_failure(self):
+        """
+        Counts a failed delivery and opens the breaker if needed.
+        """
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+
+
+class Spool:
+    """
+    Append-only, segment-rotated store of log entries on local disk.
+
+    Entries are written as JSON lines into numbered segment files. A reader
+    consumes them strictly in the order they were written and commits its
+    position; fully replayed segments are deleted. The read position is
+    saved in a ``cursor.json`` file, so a restarted process continues where
+    the previous one stopped.
+
+    Once the spool holds ``max_bytes`` new entries are rejected and counted
+    in ``dropped`` instead of filling the disk.
+    """
+    SEGMENT_SUFFIX = ".jsonl"
+    CURSOR_FILE = "cursor.json"
+
+    def __init__(self, directory, segment_bytes=1024 * 1024, max_bytes=64 * 1024 * 1024):
+        """
+        Args:
+            directory (str): Directory that holds the segment files.
+            segment_bytes (int): Size after which a new segment is started.
+            max_bytes (int): Maximum disk usage of the spool.
+        """
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.max_bytes = max_bytes
+        self.dropped = 0
+        self._lock = threading.Lock()
+        self._sizes = {}
+        self._segments = deque()
+        self._bytes = 0
+        self._read_offset = 0
+        self._active = None
+        self._active_seq = None
+        self._load()
+
+    def _path(self, seq):
+        return os.path.join(self.directory, f"{seq:012d}{self.SEGMENT_SUFFIX}")
+
+    def _load(self):
+        """
+        Picks up segments and the read position left by a previous process.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        for name in sorted(os.listdir(self.directory)):
+            if name.endswith(self.SEGMENT_SUFFIX):
+                seq = int(name[:-len(self.SEGMENT_SUFFIX)])
+                size = os.path.getsize(self._path(seq))
+                self._segments.append(seq)
+                self._sizes[seq] = size
+                self._bytes += size
+        try:
+            with open(os.path.join(self.directory, self.CURSOR_FILE)) as cursor_file:
+                cursor = json.load(cursor_file)
+        except (OSError, ValueError):
+            return
+        if self._segments and cursor.get("segment") == self._segments[0]:
+            self._read_offset = min(cursor.get("offset", 0), self._sizes[self._segments[0]])
+
+    def _save_cursor(self):
+        path = os.path.join(self.directory, self.CURSOR_FILE)
+        segment = self._segments[0] if self._segments else None
+        with open(path + ".tmp", "w") as cursor_file:
+            json.dump({"segment": segment, "offset": self._read_offset}, cursor_file)
+        os.replace(path + ".tmp", path)
+
+    def _rotate(self):
+        """
+        Seals the active segment; the next append starts a new one.
+        """
+        if self._active is not None:
+            self._active.close()
+            self._active = None
+            self._active_seq = None
+
+    def append(self, entries):
+        """
+        Writes log entries to the end of the spool.
+
+        Args:
+            entries (list[dict]): Log entries to persist.
+
+        Returns:
+            bool: ``False`` if the entries were dropped because the spool is full.
+        """
+        data = "".join(json.dumps(entry, separators=(",", ":")) + "\n" for entry in entries).encode()
+        with self._lock:
+            if self._bytes + len(data) > self.max_bytes:
+                self.dropped += len(entries)
+                return False
+            if self._active is None:
+                self._active_seq = self._segments[-1] + 1 if self._segments else 1
+                self._active = open(self._path(self._active_seq), "ab")
+                self._segments.append(self._active_seq)
+                self._sizes[self._active_seq] = 0
+            self._active.write(data)
+            self._active.flush()
+            self._sizes[self._active_seq] += len(data)
+            self._bytes += len(data)
+            if self._sizes[self._active_seq] >= self.segment_bytes:
+                self._rotate()
+            return True
+
+    def read(self, max_items):
+        """
+        Reads the oldest entries that have not been committed yet.
+
+        Args:
+            max_items (int): Maximum number of entries to return.
+
+        Returns:
+            tuple[list[dict], tuple]: Entries and a cursor to pass to ``commit``
+            once they have been delivered.
+        """
+        while True:
+            with self._lock:
+                if not self._segments:
+                    return [], None
+                seq = self._segments[0]
+                if seq == self._active_seq:
+                    # Never read a segment that is still being written.
+                    self._rotate()
+                offset = self._read_offset
+                size = self._sizes[seq]
+            entries = []
+            with open(self._path(seq), "rb") as segment:
+                segment.seek(offset)
+                while len(entries) < max_items and offset < size:
+                    line = segment.readline()
+                    if not line:
+                        break
+                    offset += len(line)
+                    try:
+                        entries.append(json.loads(line))
+                    except ValueError:
+                        # A line torn by a crash while writing; skip it.
+                        continue
+            if entries or offset < size:
+                return entries, (seq, offset)
+            self.commit((seq, size))
+
+    def commit(self, cursor):
+        """
+        Marks entries returned by ``read`` as delivered.
+
+        Args:
+            cursor (tuple): Cursor returned by ``read``.
+        """
+        seq, offset = cursor
+        with self._lock:
+            if not self._segments or self._segments[0] != seq:
+                return
+            self._read_offset = offset
+            if seq != self._active_seq and offset >= self._sizes[seq]:
+                os.remove(self._path(seq))
+                self._segments.popleft()
+                self._bytes -= self._sizes.pop(seq)
+                self._read_offset = 0
+            self._save_cursor()
+
+    @property
+    def pending(self):
+        """
+        bool: ``True`` while the spool holds entries that were not replayed yet.
+        """
+        return self._bytes > self._read_offset
+
+    @property
+    def disk_usage(self):
+        """
+        int: Bytes currently used by the segment files.
+        """
+        return self._bytes
+
+    def close(self):
+        """
+        Closes the active segment.
+        """
+        with self._lock:
+            self._rotate()
+
+
+class ReplayWorker(threading.Thread):
+    """
+    Background thread that sends spooled entries back to the logging server.
+
+    Replay only starts when the circuit breaker lets requests through, keeps
+    the order in which entries were spooled and never sends more than
+    ``max_rate`` records per second, so a recovering server is not flooded.
+    """
+    def __init__(self, spool, breaker, post, is_transient, batch_size=100, max_rate=500.0,
+                 poll_interval=1.0):
+        """
+        Args:
+            spool (Spool): Spool to replay.
+            breaker (CircuitBreaker): Breaker shared with the live delivery path.
+            post (callable): Function that sends a list of entries and raises on failure.
+            is_transient (callable): Tells whether a delivery error is worth retrying.
+            batch_size (int): Maximum number of entries per request.
+            max_rate (float): Maximum replayed records per second.
+            poll_interval (float): How often an idle worker checks the spool.
+        """
+        super().__init__(name="log-replay-worker", daemon=True)
+        self.spool = spool
+        self.breaker = breaker
+        self.post = post
+        self.is_transient = is_transient
+        self.batch_size = batch_size
+        self.max_rate = max_rate
+        self.poll_interval = poll_interval
+        self.replayed = 0
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+
+    def notify(self):
+        """
+        Wakes the worker up after new entries were spooled.
+        """
+        self._wakeup.set()
+
+    def run(self):
+        """
+        Replays the spool until the worker is stopped.
+        """
+        while not self._stopped.is_set():
+            if not self.spool.pending:
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+                continue
+            if not self.breaker.allow_request():
+                self._stopped.wait(self.breaker.retry_in() or self.poll_interval)
+                continue
+
+            entries, cursor = self.spool.read(self.batch_size)
+            if cursor is None:
+                continue
+            started = time.monotonic()
+            try:
+                if entries:
+                    self.post(entries)
+            except Exception as error:
+                if self.is_transient(error):
+                    self.breaker.record_failure()
+                    continue
+                # The server rejected the batch itself; retrying would block the spool forever.
+                # It did answer, though, so it is up and the breaker can close.
+                self.breaker.record_success()
+                self._report(len(entries))
+            else:
+                self.breaker.record_success()
+                self.replayed += len(entries)
+            self.spool.commit(cursor)
+
+            pause = len(entries) / self.max_rate - (time.monotonic() - started)
+            if pause > 0:
+                self._stopped.wait(pause)
+
+    def _report(self, count):
+        if logging.raiseExceptions:
+            sys.stderr.write(f"--- Dropped {count} spooled log records rejected by the server ---\n")
+            traceback.print_exc(file=sys.stderr)
+
+    def stop(self, timeout=None):
+        """
+        Stops the worker. Entries left in the spool stay on disk.
+
+        Args:
+            timeout (float, optional): Maximum time to wait for the thread.
+        """
+        self._stopped.set()
+        self._wakeup.set()
+        self.join(timeout)
@@ -0,0 +1,433 @@
+import base64
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+# Numeric values of the standard level names, used as compact index keys.
+LEVELS = {
+    "DEBUG": logging.DEBUG,
+    "INFO": logging.INFO,
+    "WARNING": logging.WARNING,
+    "ERROR": logging.ERROR,
+    "CRITICAL": logging.CRITICAL,
+}
+LEVEL_NAMES = {value: name for name, value in LEVELS.items()}
+
+
+class RotatingLogStore:
+    """
+    Buffered, size-rotated on-disk store for received log records.
+
+    Records are kept in memory and written as NDJSON (one JSON object per line)
+    by a background thread, either every ``flush_interval`` seconds or as soon
+    as ``buffer_records`` records are waiting. Request handlers therefore only
+    append to a list and never wait for the disk.
+
+    A file is closed once it reaches ``max_bytes`` and a new one is started.
+    File names contain the creation time and the process id, so several
+    server workers can share one directory. Only the newest ``max_files``
+    files are kept.
+
+    If a ``LogIndex`` is given, every flushed batch is also added to it, and
+    the index rows of deleted files are removed with them.
+    """
+    def __init__(self, directory, max_bytes=64 * 1024 * 1024, max_files=100,
+                 buffer_records=1000, flush_interval=1.0, index=None):
+        """
+        Args:
+            directory (str): Directory that holds the log files.
+            max_bytes (int): Size after which a new file is started.
+            max_files (int): Number of files to keep; older files are deleted.
+            buffer_records (int): Number of buffered records that triggers a flush.
+            flush_interval (float): Maximum time in seconds a record stays in memory.
+            index (LogIndex, optional): Query index updated on every flush.
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_files = max_files
+        self.buffer_records = buffer_records
+        self.flush_interval = flush_interval
+        self.index = index
+        self.written = 0
+        self._buffer = []
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._file = None
+        self._file_name = None
+        self._file_bytes = 0
+        self._file_seq = 0
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        os.makedirs(directory, exist_ok=True)
+        self._flusher = threading.Thread(target=self._run, name="log-store-flusher", daemon=True)
+        self._flusher.start()
+
+    def write(self, records):
+        """
+        Buffers received records for writing.
+
+        Args:
+            records (list[dict]): Received log records.
+        """
+        with self._lock:
+            self._buffer.extend(records)
+            pending = len(self._buffer)
+        if pending >= self.buffer_records:
+            self._wakeup.set()
+
+    def flush(self):
+        """
+        Writes every buffered record to disk.
+        """
+        with self._lock:
+            records, self._buffer = self._buffer, []
+        if not records:
+            return
+        lines = [json.dumps(record, separators=(",", ":")) + "\n" for record in records]
+        data = "".join(lines).encode()
+        with self._write_lock:
+            if self._file is None or self._file_bytes >= self.max_bytes:
+                self._open_next()
+            self._file.write(data)
+            self._file.flush()
+            self._file_bytes += len(data)
+            self.written += len(lines)
+            if self.index is not None:
+                self.index.add(records, lines, self._file_name)
+
+    def _open_next(self):
+        """
+        Closes the current file, starts a new one and removes the oldest files.
+        """
+        if self._file is not None:
+            self._file.close()
+        self._file_seq += 1
+        name = f"logs-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{self._file_seq:04d}.ndjson"
+        self._file = open(os.path.join(self.directory, name), "ab")
+        self._file_name = name
+        self._file_bytes = 0
+
+        files = sorted(f for f in os.listdir(self.directory) if f.endswith(".ndjson"))
+        removed = files[:-self.max_files]
+        for old in removed:
+            os.remove(os.path.join(self.directory, old))
+        if removed and self.index is not None:
+            self.index.remove_files(removed)
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+
+    def close(self):
+        """
+        Stops the background thread and writes the remaining records.
+        """
+        self._stopped.set()
+        self._wakeup.set()
+        self._flusher.join()
+        self.flush()
+        with self._write_lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+        if self.index is not None:
+            self.index.close()
+
+
+def parse_time(value, default=None):
+    """
+    Converts a log timestamp into seconds since the epoch.
+
+    Accepts numbers and strings such as ``"2025-03-03 17:40:57,123"``
+    (the format of ``logging.Formatter.formatTime``) or ISO 8601 timestamps.
+    Timestamps without a time zone are treated as local time, like
+    ``formatTime`` produces them.
+
+    Args:
+        value (str | int | float): Timestamp to convert.
+        default (float, optional): Value returned for missing or invalid timestamps.
+
+    Returns:
+        float: Seconds since the epoch, or ``default``.
+    """
+    if isinstance(value, (int, float)):
+        return float(value)
+    if not isinstance(value, str):
+        return default
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        return datetime.fromisoformat(value.replace(",", ".")).timestamp()
+    except ValueError:
+        return default
+
+
+class LogIndex:
+    """
+    Compact SQLite store of received records keyed by time, with secondary
+    indexes on ``level`` and ``name``.
+
+    Levels are stored as their numeric values and logger names are interned
+    in a separate table, so the indexes stay small. Each filter combination is
+    served by an index range scan ordered by ``(time, id)``; pagination
+    continues from the last returned key instead of using an offset, so
+    every page costs the same no matter how deep it is.
+
+    Every row also records the store file it was written to, so the rows of
+    a file are deleted when the store rotates it away.
+    """
+    MAX_LIMIT = 1000
+
+    def __init__(self, path):
+        """
+        Args:
+            path (str): Location of the SQLite database file.
+        """
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._writer = self._connect()
+        self._writer.executescript("""
+            CREATE TABLE IF NOT EXISTS names (id INTEGER PRIMARY KEY, name TEXT UNIQUE NOT NULL);
+            CREATE TABLE IF NOT EXISTS files (id INTEGER PRIMARY KEY, name TEXT UNIQUE NOT NULL);
+            CREATE TABLE IF NOT EXISTS logs (
+                id INTEGER PRIMARY KEY,
+                ts REAL NOT NULL,
+                level INTEGER NOT NULL,
+                name_id INTEGER NOT NULL,
+                record TEXT NOT NULL,
+                file_id INTEGER
+            );
+        """)
+        # Databases created before rows were linked to their files lack the column.
+        columns = [row[1] for row in self._writer.execute("PRAGMA table_info(logs)")]
+        if "file_id" not in columns:
+            self._writer.execute("ALTER TABLE logs ADD COLUMN file_id INTEGER")
+        self._writer.executescript("""
+            CREATE INDEX IF NOT EXISTS logs_ts ON logs (ts, id);
+            CREATE INDEX IF NOT EXISTS logs_level_ts ON logs (level, ts, id);
+            CREATE INDEX IF NOT EXISTS logs_name_ts ON logs (name_id, ts, id);
+            CREATE INDEX IF NOT EXISTS logs_file ON logs (file_id);
+        """)
+        self._names = dict(self._writer.execute("SELECT name, id FROM names"))
+        self._files = dict(self._writer.execute("SELECT name, id FROM files"))
+
+    def _connect(self):
+        connection = sqlite3.connect(self.path, check_same_thread=False)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    def _reader(self):
+        """
+        Returns:
+            sqlite3.Connection: Connection owned by the calling thread.
+        """
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = self._local.connection = self._connect()
+        return connection
+
+    def _name_id(self, name):
+        name_id = self._names.get(name)
+        if name_id is None:
+            self._writer.execute("INSERT OR IGNORE INTO names (name) VALUES (?)", (name,))
+            name_id = self._writer.execute("SELECT id FROM names WHERE name = ?", (name,)).fetchone()[0]
+            self._names[name] = name_id
+        return name_id
+
+    def _file_id(self, file):
+        if file is None:
+            return None
+        file_id = self._files.get(file)
+        if file_id is None:
+            self._writer.execute("INSERT OR IGNORE INTO files (name) VALUES (?)", (file,))
+            file_id = self._writer.execute("SELECT id FROM files WHERE name = ?", (file,)).fetchone()[0]
+            self._files[file] = file_id
+        return file_id
+
+    def add(self, records, lines=None, file=None):
+        """
+        Adds records to the index in a single transaction.
+
+        Args:
+            records (list[dict]): Received log records.
+            lines (list[str], optional): Already serialized records.
+            file (str, optional): Name of the store file the records were written to.
+        """
+        if lines is None:
+            lines = [json.dumps(record, separators=(",", ":")) for record in records]
+        received = time.time()
+        with self._lock, self._writer:
+            file_id = self._file_id(file)
+            rows = [
+                (
+                    parse_time(record.get("time"), received),
+                    LEVELS.get(str(record.get("level", "")).upper(), 0),
+                    self._name_id(str(record.get("name", ""))),
+                    line.rstrip("\n"),
+                    file_id,
+                )
+                for record, line in zip(records, lines)
+                if isinstance(record, dict)
+            ]
+            self._writer.executemany(
+                "INSERT INTO logs (ts, level, name_id, record, file_id) VALUES (?, ?, ?, ?, ?)", rows,
+            )
+
+    def remove_files(self, files):
+        """
+        Deletes the rows of store files that were removed from disk.
+
+        Args:
+            files (list[str]): Names of the removed files.
+        """
+        with self._lock, self._writer:
+            for file in files:
+                # The file may have been written by another server process.
+                row = self._writer.execute("SELECT id FROM files WHERE name = ?", (file,)).fetchone()
+                self._files.pop(file, None)
+                if row is not None:
+                    self._writer.execute("DELETE FROM logs WHERE file_id = ?", row)
+                    self._writer.execute("DELETE FROM files WHERE id = ?", row)
+
+    def query(self, start=None, end=None, level=None, name=None, cursor=None, limit=100):
+        """
+        Returns one page of records matching the filters, ordered by time.
+
+        Args:
+            start (float, optional): Earliest record time (inclusive).
+            end (float, optional): Latest record time (inclusive).
+            level (str, optional): Level name, e.g. ``"CRITICAL"``.
+            name (str, optional): Logger name.
+            cursor (str, optional): ``next_cursor`` of the previous page.
+            limit (int): Page size, at most ``MAX_LIMIT``.
+
+        Returns:
+            dict: ``records`` of the page and ``next_cursor`` (``None`` on the last page).
+
+        Raises:
+            ValueError: If the level or the cursor is invalid.
+        """
+        limit = max(1, min(int(limit), self.MAX_LIMIT))
+        conditions = []
+        params = []
+        if level is not None:
+            if level.upper() not in LEVELS:
+                raise ValueError(f"Unknown level: {level}")
+            conditions.append("level = ?")
+            params.append(LEVELS[level.upper()])
+        if name is not None:
+            name_id = self._names.get(name)
+            if name_id is None:
+                # The name may have been added by another server process.
+                row = self._reader().execute("SELECT id FROM names WHERE name = ?", (name,)).fetchone()
+                if row is None:
+                    return {"records": [], "next_cursor": None}
+                name_id = row[0]
+            conditions.append("name_id = ?")
+            params.append(name_id)
+        if start is not None:
+            conditions.append("ts >= ?")
+            params.append(start)
+        if end is not None:
+            conditions.append("ts <= ?")
+            params.append(end)
+        if cursor is not None:
+            last_ts, last_id = decode_cursor(cursor)
+            conditions.append("(ts, id) > (?, ?)")
+            params.extend((last_ts, last_id))
+
+        sql = "SELECT id, ts, record FROM logs"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " ORDER BY ts, id LIMIT ?"
+        rows = self._reader().execute(sql, (*params, limit + 1)).fetchall()
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1][1], rows[-1][0])
+        return {"records": [json.loads(row[2]) for row in rows], "next_cursor": next_cursor}
+
+    def close(self):
+        """
+        Closes the writer connection.
+        """
+        with self._lock:
+            self._writer.close()
+
+
+def query_from_params(index, params):
+    """
+    Runs a ``LogIndex`` query described by URL query parameters.
+
+    Recognized parameters: ``start``, ``end``, ``level``, ``name``,
+    ``cursor`` and ``limit``.
+
+    Args:
+        index (LogIndex): Index to query.
+        params (Mapping[str, str]): Query string parameters.
+
+    Returns:
+        dict: Page of records with ``next_cursor``.
+
+    Raises:
+        ValueError: If a parameter is invalid.
+    """
+    bounds = {}
+    for key in ("start", "end"):
+        if params.get(key) is not None:
+            bounds[key] = parse_time(params[key])
+            if bounds[key] is None:
+                raise ValueError(f"Invalid {key} time: {params[key]}")
+    return index.query(
+        level=params.get("level"),
+        name=params.get("name"),
+        cursor=params.get("cursor"),
+        limit=params.get("limit", 100),
+        **bounds,
+    )
+
+
+def encode_cursor(ts, row_id):
+    """
+    Builds an opaque pagination cursor from the last returned key.
+    """
+    return base64.urlsafe_b64encode(json.dumps([ts, row_id]).encode()).decode()
+
+
+def decode_cursor(cursor):
+    """
+    Reads the key stored in a pagination cursor.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    try:
+        ts, row_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return float(ts), int(row_id)
+    except (TypeError, ValueError) as error:
+        raise ValueError("Invalid cursor") from error
+
+
+def parse_ndjson(lines):
+    """
+    Decodes NDJSON lines, skipping blank ones.
+
+    Args:
+        lines (Iterable[bytes | str]): Lines of an NDJSON document.
+
+    Returns:
+        list[dict]: Decoded records.
+    """
+    return [json.loads(line) for line in lines if line.strip()]
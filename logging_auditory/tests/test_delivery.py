@@ -0,0 +1,88 @@
+import json
+import logging
+import os
+import sys
+import requests_mock
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from delivery import BatchQueue, BatchWorker
+from logging_ import JSONHTTPHandler
+
+LOG_URL = "http://127.0.0.1:5000/log"
+
+
+def make_record(message, level=logging.CRITICAL):
+    return logging.LogRecord("test_logger", level, __file__, 1, message, None, None)
+
+
+def test_batching_handler_flushes_in_batches():
+    """
+    Tests that a batching handler delivers every record in JSON arrays of at most `batch_size`.
+
+    Test Steps:
+        1. Mock the logging server.
+        2. Emit five records through a handler with `batching=True, batch_size=2`.
+        3. Call `flush` and assert that every record was posted once, in order,
+           in batches of at most two records.
+
+    Expected Result:
+        Three POST requests with 2, 2 and 1 records.
+    """
+    with requests_mock.Mocker() as m:
+        m.post(LOG_URL, json={"status": "received"})
+        handler = JSONHTTPHandler("127.0.0.1:5000", "/log", batching=True, batch_size=2, linger=0.05, retries=0)
+        handler.setFormatter(logging.Formatter())
+        for number in range(5):
+            handler.emit(make_record(f"message {number}"))
+
+        handler.flush(timeout=5.0)
+        batches = [json.loads(request.body) for request in m.request_history]
+        handler.close()
+
+    assert all(isinstance(batch, list) and len(batch) <= 2 for batch in batches)
+    assert [entry["message"] for batch in batches for entry in batch] == [f"message {n}" for n in range(5)]
+    assert batches[0][0]["level"] == "CRITICAL" and batches[0][0]["name"] == "test_logger"
+
+
+def test_batch_queue_drop_oldest():
+    """
+    Tests the `drop-oldest` overflow policy of `BatchQueue`.
+
+    Test Steps:
+        1. Put four entries into a queue of capacity two.
+        2. Assert that the two oldest entries were dropped and counted.
+
+    Expected Result:
+        The batch holds entries 2 and 3, and `dropped` is 2.
+    """
+    queue = BatchQueue(maxsize=2, overflow="drop-oldest")
+    for number in range(4):
+        queue.put({"n": number})
+
+    assert queue.dropped == 2
+    assert queue.get_batch(10, linger=0) == [{"n": 2}, {"n": 3}]
+
+
+def test_batch_worker_delivers_remaining_entries_on_stop():
+    """
+    Tests that stopping a `BatchWorker` delivers the entries that are still buffered.
+
+    Test Steps:
+        1. Start a worker with a long linger time and put three entries into its queue.
+        2. Stop the worker and assert that all three entries were sent.
+
+    Expected Result:
+        All entries are delivered without waiting for the linger time.
+    """
+    sent = []
+    queue = BatchQueue()
+    worker = BatchWorker(queue, sent.extend, batch_size=100, linger=60.0)
+    worker.start()
+    for number in range(3):
+        queue.put({"n": number})
+
+    worker.stop(timeout=5.0)
+
+    assert not worker.is_alive()
+    assert sent == [{"n": 0}, {"n": 1}, {"n": 2}]
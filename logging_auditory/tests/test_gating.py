@@ -0,0 +1,118 @@
+import logging
+import os
+import sys
+import structlog
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from gating import GatedBoundLogger, LogSampler, lazy
+from logging_ import get_logger, get_struct_logger
+
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
+
+def make_logger(name, sampler=None):
+    logger = logging.getLogger(name)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    handler = ListHandler()
+    logger.addHandler(handler)
+    if sampler is not None:
+        GatedBoundLogger.samplers[name] = sampler
+    renderer = structlog.processors.KeyValueRenderer(key_order=["event"])
+    return structlog.wrap_logger(logger, processors=[renderer], wrapper_class=GatedBoundLogger), handler
+
+
+def test_sampling_drops_info_but_not_errors():
+    """
+    Tests that a sample rate of 0 drops INFO and WARNING records only.
+
+    Test Steps:
+        1. Attach a sampler with `sample_rate=0` to a logger.
+        2. Log records of every level.
+
+    Expected Result:
+        Only the ERROR and CRITICAL records are emitted; the dropped ones are counted.
+    """
+    sampler = LogSampler(sample_rate=0.0)
+    log, handler = make_logger("gating_sampled", sampler)
+
+    log.info("info")
+    log.warning("warning")
+    log.error("error")
+    log.critical("critical")
+
+    assert handler.messages == ["event='error'", "event='critical'"]
+    assert sampler.sampled == 2
+
+
+def test_rate_limit_and_report():
+    """
+    Tests the token bucket rate limit and the report of dropped records.
+
+    Test Steps:
+        1. Create a sampler that allows two records per second and reports at once.
+        2. Ask it about five INFO records in a row.
+
+    Expected Result:
+        The first two records pass, the other three are rate-limited and reported.
+    """
+    reports = []
+    sampler = LogSampler(rate_limit=2.0, report_interval=0.0, report=lambda *counts: reports.append(counts[:2]))
+
+    decisions = [sampler.allow(logging.INFO) for _ in range(5)]
+
+    assert decisions == [True, True, False, False, False]
+    assert reports == [(0, 1), (0, 1), (0, 1)]
+    assert sampler.allow(logging.ERROR)
+
+
+def test_lazy_values_only_for_emitted_records():
+    """
+    Tests that `lazy` values are evaluated only when the record is emitted.
+
+    Test Steps:
+        1. Log a DEBUG record, which the INFO logger filters, with a lazy value.
+        2. Log an INFO record with a lazy value.
+
+    Expected Result:
+        The function is called once, for the INFO record.
+    """
+    calls = []
+
+    def render(value):
+        calls.append(value)
+        return value
+
+    log, handler = make_logger("gating_lazy")
+    log.debug("hidden", value=lazy(render, "debug"))
+    log.info("shown", value=lazy(render, "info"))
+
+    assert calls == ["info"]
+    assert handler.messages == ["event='shown' value='info'"]
+
+
+def test_loggers_are_configured_once():
+    """
+    Tests that repeated `get_logger` and `get_struct_logger` calls reuse the logger.
+
+    Test Steps:
+        1. Call `get_logger` and `get_struct_logger` twice for one name.
+        2. Assert that the same objects are returned and no handlers were added.
+
+    Expected Result:
+        The logger has one console handler and one HTTP handler.
+    """
+    first = get_logger("gating_cached")
+    handlers = list(first.handlers)
+
+    assert get_logger("gating_cached") is first
+    assert get_struct_logger("gating_cached") is get_struct_logger("gating_cached")
+    assert first.handlers == handlers and len(handlers) == 2
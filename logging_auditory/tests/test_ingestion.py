@@ -0,0 +1,82 @@
+import gzip
+import json
+import os
+import sys
+import tempfile
+from starlette.testclient import TestClient
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+os.environ.setdefault("LOG_STORE_DIR", tempfile.mkdtemp())
+
+import api
+import asgi
+
+
+def stored_messages(store, name):
+    store.flush()
+    return [record["message"] for record in store.index.query(name=name)["records"]]
+
+
+def test_flask_bulk_and_stream():
+    """
+    Tests the bulk and NDJSON stream endpoints of the Flask server.
+
+    Test Steps:
+        1. Post a JSON array to `/log/bulk` and an NDJSON stream to `/log/stream`.
+        2. Assert that the counts are reported and that every record was stored.
+        3. Assert that `/log/bulk` rejects a body that is not an array and
+           `/log/stream` malformed lines and invalid gzip bodies.
+
+    Expected API Response:
+        {"status": "received", "count": 2}
+    """
+    client = api.app.test_client()
+    records = [{"message": "bulk 0", "name": "flask_ingest"}, {"message": "bulk 1", "name": "flask_ingest"}]
+
+    response = client.post("/log/bulk", json=records)
+    assert response.get_json() == {"status": "received", "count": 2}
+
+    stream = b"".join(json.dumps({"message": f"stream {n}", "name": "flask_ingest"}).encode() + b"\n" for n in range(3))
+    response = client.post("/log/stream", data=b"\n" + stream + b"\n", content_type="application/x-ndjson")
+    assert response.get_json() == {"status": "received", "count": 3}
+
+    assert client.post("/log/bulk", json={"message": "single"}).status_code == 400
+    assert client.post("/log/stream", data=b'{"message": "ok"}\n{not json\n').status_code == 400
+    assert client.post("/log/stream", data=b"plain", headers={"Content-Encoding": "gzip"}).status_code == 400
+    assert stored_messages(api.store, "flask_ingest") == ["bulk 0", "bulk 1", "stream 0", "stream 1", "stream 2"]
+
+
+def test_asgi_endpoints():
+    """
+    Tests the endpoints of the ASGI server.
+
+    Test Steps:
+        1. Start the application with its lifespan.
+        2. Post a single record to `/log`, an array to `/log/bulk` and a
+           gzip-compressed NDJSON stream split across lines to `/log/stream`.
+        3. Assert that every record was stored.
+        4. Assert that invalid bodies get 400 and unknown paths 404.
+
+    Expected API Response:
+        {"status": "received", "count": 3}  # for the stream
+    """
+    with TestClient(asgi.app) as client:
+        record = {"message": "single", "name": "asgi_ingest"}
+        assert client.post("/log", json=record).json() == {"status": "received", "count": 1}
+        response = client.post("/log/bulk", json=[{"message": f"bulk {n}", "name": "asgi_ingest"} for n in range(2)])
+        assert response.json()["count"] == 2
+
+        stream = "".join(json.dumps({"message": f"stream {n}", "name": "asgi_ingest"}) + "\n" for n in range(3))
+        response = client.post(
+            "/log/stream", content=gzip.compress(stream.encode()), headers={"Content-Encoding": "gzip"},
+        )
+        assert response.json() == {"status": "received", "count": 3}
+
+        assert client.post("/log", content=b"{not json").status_code == 400
+        assert client.post("/log/bulk", json={"message": "single"}).status_code == 400
+        assert client.get("/unknown").status_code == 404
+        assert client.get("/log").status_code == 405
+
+        assert stored_messages(asgi.store, "asgi_ingest") == [
+            "single", "bulk 0", "bulk 1", "stream 0", "stream 1", "stream 2",
+        ]
@@ -0,0 +1,106 @@
+import os
+import sqlite3
+import sys
+import tempfile
+from starlette.testclient import TestClient
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+os.environ.setdefault("LOG_STORE_DIR", tempfile.mkdtemp())
+
+import asgi
+from storage import LogIndex, RotatingLogStore
+
+
+def make_records(count, name="query_logger"):
+    levels = ["INFO", "CRITICAL"]
+    return [
+        {"message": f"message {n}", "name": name, "level": levels[n % 2], "time": 1000.0 + n}
+        for n in range(count)
+    ]
+
+
+def test_query_filters(tmp_path):
+    """
+    Tests the level, name and time filters of `LogIndex.query`.
+
+    Test Steps:
+        1. Index ten records of alternating levels and one of another logger.
+        2. Query by level, by name and by time range.
+        3. Assert that an unknown level is rejected.
+
+    Expected Result:
+        Each query returns exactly the matching records, ordered by time.
+    """
+    index = LogIndex(str(tmp_path / "index.db"))
+    index.add(make_records(10) + [{"message": "other", "name": "other_logger", "level": "INFO", "time": 1003.5}])
+
+    def messages(**filters):
+        return [record["message"] for record in index.query(**filters)["records"]]
+
+    assert messages(level="critical", name="query_logger") == [f"message {n}" for n in (1, 3, 5, 7, 9)]
+    assert messages(name="other_logger") == ["other"]
+    assert messages(name="missing_logger") == []
+    assert messages(start=1003, end=1005) == ["message 3", "other", "message 4", "message 5"]
+    try:
+        index.query(level="LOUD")
+        assert False, "An unknown level should be rejected"
+    except ValueError:
+        pass
+    index.close()
+
+
+def test_logs_endpoint_pagination():
+    """
+    Tests cursor pagination of the `/logs` endpoint of the ASGI server.
+
+    Test Steps:
+        1. Store seven records and follow `next_cursor` with `limit=3`.
+        2. Assert that the pages hold every record once, in order.
+        3. Assert that an invalid cursor gets 400.
+
+    Expected API Response:
+        Pages of 3, 3 and 1 records; the last page has `next_cursor` set to `null`.
+    """
+    with TestClient(asgi.app) as client:
+        client.post("/log/bulk", json=make_records(7, name="paged_logger"))
+        asgi.store.flush()
+
+        pages = []
+        params = {"name": "paged_logger", "limit": 3}
+        while True:
+            page = client.get("/logs", params=params).json()
+            pages.append([record["message"] for record in page["records"]])
+            if page["next_cursor"] is None:
+                break
+            params["cursor"] = page["next_cursor"]
+
+        assert pages == [["message 0", "message 1", "message 2"], ["message 3", "message 4", "message 5"], ["message 6"]]
+        assert client.get("/logs", params={"cursor": "not-a-cursor"}).status_code == 400
+
+
+def test_rotation_prunes_index(tmp_path):
+    """
+    Tests that the index rows of rotated-away files are deleted.
+
+    Test Steps:
+        1. Open a store that starts a new file on every flush and keeps two files.
+        2. Flush four batches of one record each.
+        3. Assert that only the records of the two kept files can be found
+           and that no rows of deleted files remain.
+
+    Expected Result:
+        Only messages 2 and 3 are returned.
+    """
+    index = LogIndex(str(tmp_path / "index.db"))
+    store = RotatingLogStore(str(tmp_path / "logs"), max_bytes=1, max_files=2, flush_interval=60.0, index=index)
+    for number in range(4):
+        store.write([{"message": f"message {number}", "name": "rotated_logger", "time": 1000.0 + number}])
+        store.flush()
+
+    assert len(os.listdir(tmp_path / "logs")) == 2
+    assert [record["message"] for record in index.query()["records"]] == ["message 2", "message 3"]
+    store.close()
+
+    with sqlite3.connect(tmp_path / "index.db") as connection:
+        assert connection.execute("SELECT COUNT(*) FROM logs").fetchone()[0] == 2
+        assert connection.execute("SELECT COUNT(*) FROM files").fetchone()[0] == 2
@@ -0,0 +1,131 @@
+import hashlib
+import hmac
+import os
+import stat
+import sys
+import warnings
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from pseudonymize import Pseudonymizer, load_key
+
+KEY = bytes.fromhex("00112233445566778899aabbccddeeff")
+
+
+def test_tokens_are_stable():
+    """
+    Tests that tokens depend only on the key and the username.
+
+    Test Steps:
+        1. Compute the token of a username with two pseudonymizers that share a key.
+        2. Compute it with a pseudonymizer that has another key.
+        3. Compare with the truncated HMAC-SHA256 of the username.
+
+    Expected Result:
+        The same key gives the same token, a different key a different token.
+    """
+    first, second = Pseudonymizer(KEY), Pseudonymizer(KEY)
+    other = Pseudonymizer(b"another key")
+    expected = "u_" + hmac.new(KEY, b"alice", hashlib.sha256).hexdigest()[:16]
+
+    assert first.token("alice") == second.token("alice") == first.compute("alice") == expected
+    assert other.token("alice") != expected
+    assert first.token("bob") != expected
+    assert Pseudonymizer(KEY, prefix="user-", length=8).token("alice") == "user-" + expected[2:10]
+
+
+def test_cache_metrics_and_eviction():
+    """
+    Tests the LRU cache of tokens and its metrics.
+
+    Test Steps:
+        1. Look up three users with a cache of two entries, repeating the first one.
+        2. Look up a fourth user, which evicts the least recently used one.
+
+    Expected Result:
+        Repeated lookups are hits, and the cache never holds more than two tokens.
+    """
+    pseudonymizer = Pseudonymizer(KEY, cache_size=2)
+    for user in ("alice", "bob", "alice", "alice"):
+        pseudonymizer.token(user)
+
+    assert pseudonymizer.metrics() == {"hits": 2, "misses": 2, "hit_rate": 0.5, "size": 2, "capacity": 2}
+
+    pseudonymizer.token("carol")
+    pseudonymizer.token("alice")
+    pseudonymizer.token("bob")
+    metrics = pseudonymizer.metrics()
+    assert (metrics["hits"], metrics["misses"], metrics["size"]) == (3, 4, 2)
+
+
+def test_processor_and_key_file(tmp_path):
+    """
+    Tests the structlog processor and loading the key from a file.
+
+    Test Steps:
+        1. Write the key to a file and load it.
+        2. Run events with and without a user through the processor.
+
+    Expected Result:
+        The user field is replaced by its token; events without a user are unchanged.
+    """
+    key_file = tmp_path / "secret.key"
+    key_file.write_text(KEY.hex() + "\n")
+    pseudonymizer = Pseudonymizer(load_key(str(key_file)))
+    process = pseudonymizer.processor()
+
+    assert process(None, None, {"event": "login", "user": "alice"}) == {
+        "event": "login", "user": Pseudonymizer(KEY).compute("alice"),
+    }
+    assert process(None, None, {"event": "ping"}) == {"event": "ping"}
+
+
+def test_missing_key_is_generated_once(tmp_path, monkeypatch):
+    """
+    Tests that a missing key is generated once and reused after a restart.
+
+    Test Steps:
+        1. Point `LOG_PSEUDONYM_KEY_FILE` at a file that does not exist.
+        2. Load the key twice, as two processes would, with warnings turned into errors.
+
+    Expected Result:
+        Both loads return the same key, which is stored in a file readable only by its owner.
+    """
+    key_file = tmp_path / "generated.key"
+    monkeypatch.setenv("LOG_PSEUDONYM_KEY_FILE", str(key_file))
+    monkeypatch.delenv("LOG_PSEUDONYM_KEY", raising=False)
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        first = load_key()
+        second = load_key()
+
+    assert first == second and len(first) == 32
+    assert key_file.read_text().strip() == first.hex()
+    assert stat.S_IMODE(key_file.stat().st_mode) == 0o600
+
+
+def test_render_metrics():
+    """
+    Tests the Prometheus rendering of the cache statistics.
+
+    Test Steps:
+        1. Look up one user twice and another once.
+        2. Render the metrics.
+
+    Expected Result:
+        The counters and gauges report one hit, two misses and two cached tokens.
+    """
+    pseudonymizer = Pseudonymizer(KEY, cache_size=5)
+    for user in ("alice", "alice", "bob"):
+        pseudonymizer.token(user)
+
+    lines = pseudonymizer.render_metrics().splitlines()
+
+    assert "# TYPE log_pseudonym_cache_hits_total counter" in lines
+    assert [line for line in lines if not line.startswith("#")] == [
+        "log_pseudonym_cache_hits_total 1",
+        "log_pseudonym_cache_misses_total 2",
+        "log_pseudonym_cache_entries 2",
+        "log_pseudonym_cache_capacity 5",
+    ]
@@ -0,0 +1,79 @@
+import copy
+import json
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from redaction import DEFAULT_MASK, RedactionEngine, fast_renderer
+
+
+def test_redaction_output():
+    """
+    Tests masking of top-level keys and nested paths, and transforms.
+
+    Test Steps:
+        1. Compile an engine with a masked key, a nested path and a transform.
+        2. Run an event through the processor and the renderer.
+
+    Expected Result:
+        The password and the authorization header are masked, the user is
+        transformed and every other field is kept.
+    """
+    engine = RedactionEngine(
+        keys=["password"], paths=["request.headers.authorization"], transforms={"user": str.upper},
+    )
+    redact = engine.compile()
+    event = {
+        "event": "login",
+        "password": "secret",
+        "user": "alice",
+        "request": {"path": "/login", "headers": {"authorization": "Bearer abc", "accept": "*/*"}},
+    }
+
+    output = json.loads(fast_renderer()(None, None, redact(None, None, event)))
+
+    assert output == {
+        "event": "login",
+        "password": DEFAULT_MASK,
+        "user": "ALICE",
+        "request": {"path": "/login", "headers": {"authorization": DEFAULT_MASK, "accept": "*/*"}},
+    }
+
+
+def test_redaction_keeps_caller_objects():
+    """
+    Tests that nested dictionaries passed by the caller are not changed.
+
+    Test Steps:
+        1. Log an event whose nested `request` dictionary is owned by the caller.
+        2. Assert that the caller's dictionary still holds the original values.
+
+    Expected Result:
+        Only the event returned by the processor is redacted.
+    """
+    redact = RedactionEngine(paths=["request.headers.authorization", "request.token"]).compile()
+    request = {"token": "abc", "headers": {"authorization": "Bearer abc"}}
+    original = copy.deepcopy(request)
+
+    event = redact(None, None, {"event": "call", "request": request})
+
+    assert request == original
+    assert event["request"] == {"token": DEFAULT_MASK, "headers": {"authorization": DEFAULT_MASK}}
+
+
+def test_redaction_skips_missing_and_non_dict_values():
+    """
+    Tests that rules for missing keys and non-dictionary values are ignored.
+
+    Test Steps:
+        1. Run events without the redacted keys, and with a string where a
+           dictionary is expected, through the processor.
+
+    Expected Result:
+        The events are returned unchanged.
+    """
+    redact = RedactionEngine(keys=["password"], paths=["request.headers.authorization"]).compile()
+
+    assert redact(None, None, {"event": "ping"}) == {"event": "ping"}
+    assert redact(None, None, {"event": "call", "request": "GET /"}) == {"event": "call", "request": "GET /"}
@@ -0,0 +1,165 @@
+import json
+import logging
+import os
+import sys
+import time
+import requests
+import requests_mock
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from logging_ import JSONHTTPHandler
+from spool import CircuitBreaker, Spool
+
+LOG_URL = "http://127.0.0.1:5000/log"
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def make_handler(spool_dir):
+    handler = JSONHTTPHandler(
+        "127.0.0.1:5000", "/log", retries=0, spool_dir=str(spool_dir),
+        failure_threshold=1, reset_timeout=0.05, replay_rate=10000.0,
+    )
+    handler.setFormatter(logging.Formatter())
+    return handler
+
+
+def make_record(message):
+    return logging.LogRecord("test_logger", logging.CRITICAL, __file__, 1, message, None, None)
+
+
+def test_spool_replay_after_outage(tmp_path):
+    """
+    Tests that records logged while the server is down are spooled and replayed in order.
+
+    Test Steps:
+        1. Mock a server that refuses connections and log three records.
+        2. Assert that the breaker opened and the records are in the spool.
+        3. Bring the server back and assert that the replay worker delivers
+           the records in order and empties the spool.
+        4. Log one more record and assert that it is sent directly.
+
+    Expected Result:
+        The server receives records 0, 1, 2 and then 3.
+    """
+    received = []
+    server_up = False
+
+    def receive(request, context):
+        if not server_up:
+            raise requests.ConnectionError("Connection refused")
+        payload = json.loads(request.body)
+        received.extend(payload if isinstance(payload, list) else [payload])
+        return {"status": "received"}
+
+    with requests_mock.Mocker() as m:
+        m.post(LOG_URL, json=receive)
+        handler = make_handler(tmp_path)
+        for number in range(3):
+            handler.emit(make_record(f"message {number}"))
+        assert handler.breaker.state == CircuitBreaker.OPEN
+        assert handler.spool.pending
+
+        server_up = True
+        assert wait_for(lambda: not handler.spool.pending)
+        assert handler.breaker.state == CircuitBreaker.CLOSED
+
+        handler.emit(make_record("message 3"))
+        handler.close()
+
+    assert [entry["message"] for entry in received] == [f"message {n}" for n in range(4)]
+
+
+def test_breaker_closes_after_rejected_probe(tmp_path):
+    """
+    Tests that a 4xx answer to the half-open probe closes the circuit breaker.
+
+    Test Steps:
+        1. Mock a server that refuses the first connection, answers the next
+           request with 400 and accepts later ones.
+        2. Log a record, so that the breaker opens and the record is spooled.
+        3. Wait until the replay worker has probed the server with it.
+        4. Assert that the breaker is closed and that a new record is sent directly.
+
+    Expected Result:
+        The rejected record is dropped, the breaker is closed and the spool is empty.
+    """
+    with requests_mock.Mocker() as m:
+        m.post(LOG_URL, [
+            {"exc": requests.ConnectionError},
+            {"status_code": 400, "json": {"status": "error"}},
+            {"json": {"status": "received"}},
+        ])
+        handler = make_handler(tmp_path)
+        logging.raiseExceptions, raise_exceptions = False, logging.raiseExceptions
+        try:
+            handler.emit(make_record("rejected"))
+            assert handler.breaker.state == CircuitBreaker.OPEN
+
+            assert wait_for(lambda: m.call_count >= 2 and not handler.spool.pending)
+            assert handler.breaker.state == CircuitBreaker.CLOSED
+            assert handler.breaker.allow_request()
+
+            handler.emit(make_record("accepted"))
+            assert m.call_count == 3
+            assert json.loads(m.last_request.body)["message"] == "accepted"
+        finally:
+            logging.raiseExceptions = raise_exceptions
+            handler.close()
+
+
+def test_send_closes_half_open_breaker_on_rejection(tmp_path):
+    """
+    Tests that a rejected live delivery in the half-open state closes the breaker.
+
+    Test Steps:
+        1. Trip the breaker of a handler, so that the next request is a probe.
+        2. Send a record that the server rejects with 400.
+        3. Assert that the error is raised and the breaker is closed.
+
+    Expected Result:
+        `requests.HTTPError` is raised and the breaker state is `closed`.
+    """
+    with requests_mock.Mocker() as m:
+        m.post(LOG_URL, status_code=400)
+        handler = make_handler(tmp_path)
+        handler.breaker.record_failure()
+        time.sleep(0.06)
+        try:
+            handler.send({"message": "rejected"})
+            assert False, "The rejected record should raise"
+        except requests.HTTPError:
+            pass
+        assert handler.breaker.state == CircuitBreaker.CLOSED
+        handler.close()
+
+
+def test_spool_resumes_from_cursor(tmp_path):
+    """
+    Tests that a reopened spool continues after the last committed entry.
+
+    Test Steps:
+        1. Append three entries, read two of them and commit.
+        2. Reopen the spool from the same directory.
+        3. Assert that only the third entry is read.
+
+    Expected Result:
+        [{"n": 2}]
+    """
+    spool = Spool(str(tmp_path))
+    spool.append([{"n": 0}, {"n": 1}, {"n": 2}])
+    entries, cursor = spool.read(2)
+    assert entries == [{"n": 0}, {"n": 1}]
+    spool.commit(cursor)
+    spool.close()
+
+    spool = Spool(str(tmp_path))
+    assert spool.read(10)[0] == [{"n": 2}]
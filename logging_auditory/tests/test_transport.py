@@ -0,0 +1,127 @@
+import gzip
+import json
+import logging
+import os
+import socket
+import sys
+import tempfile
+import time
+import requests
+import requests_mock
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+os.environ.setdefault("LOG_STORE_DIR", tempfile.mkdtemp())
+
+from api import app
+from logging_ import JSONHTTPHandler
+from transport import HTTPTransport, is_transient
+
+LOG_URL = "http://127.0.0.1:5000/log"
+
+
+def test_transport_reuses_session_and_compresses():
+    """
+    Tests that the pooled transport sends gzip-compressed JSON over one session.
+
+    Test Steps:
+        1. Mock the logging server.
+        2. Post two payloads through a pooled transport with `compress=True`.
+        3. Assert that both bodies are gzip-compressed JSON with the right headers.
+
+    Expected Result:
+        The decompressed bodies equal the posted payloads.
+    """
+    transport = HTTPTransport(LOG_URL, compress=True, retries=0)
+    with requests_mock.Mocker() as m:
+        m.post(LOG_URL, json={"status": "received"})
+        transport.post({"message": "one"})
+        transport.post([{"message": "two"}])
+    transport.close()
+
+    assert [json.loads(gzip.decompress(request.body)) for request in m.request_history] == [
+        {"message": "one"}, [{"message": "two"}],
+    ]
+    assert all(request.headers["Content-Encoding"] == "gzip" for request in m.request_history)
+
+
+def test_is_transient():
+    """
+    Tests the classification of delivery errors.
+
+    Test Steps:
+        1. Post to a server that answers 503, then 400.
+        2. Assert that 503 and connection errors are transient and 400 is not.
+
+    Expected Result:
+        Only the rejection of the payload itself is permanent.
+    """
+    transport = HTTPTransport(LOG_URL, retries=0)
+    errors = []
+    with requests_mock.Mocker() as m:
+        for status in (503, 400):
+            m.post(LOG_URL, status_code=status)
+            try:
+                transport.post({"message": "test"})
+            except requests.HTTPError as error:
+                errors.append(error)
+
+    assert [is_transient(error) for error in errors] == [True, False]
+    assert is_transient(requests.ConnectionError())
+    assert not is_transient(ValueError())
+
+
+def test_receive_log_rejects_invalid_body():
+    """
+    Tests that the Flask server answers 400 to malformed JSON and gzip bodies.
+
+    Test Steps:
+        1. Post a malformed JSON body to `/log`.
+        2. Post a body that claims to be gzip-compressed but is not.
+        3. Post a valid gzip-compressed array and assert that it is accepted.
+
+    Expected API Response:
+        {"status": "received", "count": 2}  # for the valid body
+    """
+    client = app.test_client()
+
+    assert client.post("/log", data=b"{not json", content_type="application/json").status_code == 400
+    response = client.post("/log", data=b"plain", headers={"Content-Encoding": "gzip"})
+    assert response.status_code == 400
+
+    body = gzip.compress(json.dumps([{"message": "a"}, {"message": "b"}]).encode())
+    response = client.post("/log", data=body, headers={"Content-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert response.get_json() == {"status": "received", "count": 2}
+
+
+def test_synchronous_handler_fails_fast():
+    """
+    Tests that a synchronous handler does not retry on the caller's thread.
+
+    Test Steps:
+        1. Find a local port nobody listens on.
+        2. Log a record through a synchronous and a batching handler pointed at it.
+        3. Measure how long the synchronous logging call takes.
+
+    Expected Result:
+        The synchronous call returns at once; only the batching handler retries.
+    """
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        host = f"127.0.0.1:{probe.getsockname()[1]}"
+
+    handler = JSONHTTPHandler(host, "/log")
+    handler.setFormatter(logging.Formatter())
+    record = logging.LogRecord("test_logger", logging.CRITICAL, __file__, 1, "lost", None, None)
+    logging.raiseExceptions, raise_exceptions = False, logging.raiseExceptions
+    try:
+        start = time.perf_counter()
+        handler.emit(record)
+        assert time.perf_counter() - start < 1.0
+    finally:
+        logging.raiseExceptions = raise_exceptions
+        handler.close()
+
+    batching = JSONHTTPHandler(host, "/log", batching=True)
+    assert batching.transport._session.get_adapter(LOG_URL).max_retries.total == 3
+    batching.close()
@@ -0,0 +1,124 @@
+import gzip
+import json
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+# Responses that are worth retrying: the receiver is overloaded or restarting.
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+def is_transient(error):
+    """
+    Tells whether a delivery error may go away if the request is repeated later.
+
+    Connection problems, timeouts and ``RETRY_STATUSES`` responses are
+    transient; other HTTP errors mean the server rejected the payload itself.
+
+    Args:
+        error (Exception): Error raised by ``HTTPTransport.post``.
+
+    Returns:
+        bool: ``True`` for transient errors.
+    """
+    if isinstance(error, requests.HTTPError) and error.response is not None:
+        return error.response.status_code in RETRY_STATUSES
+    return isinstance(error, requests.RequestException)
+
+
+class HTTPTransport:
+    """
+    Delivers JSON log payloads to the logging server.
+
+    In pooled mode the transport owns a ``requests.Session`` with a keep-alive
+    connection pool and retry/backoff, so consecutive records reuse the same
+    TCP connection. The URL and headers are built once instead of per record.
+    """
+    def __init__(self, url, pooled=True, pool_size=10, timeout=5.0, retries=3,
+                 backoff_factor=0.5, compress=False, credentials=None):
+        """
+        Args:
+            url (str): Full URL of the log endpoint.
+            pooled (bool): Reuse connections through a session. When ``False``
+                every payload is sent with a standalone ``requests.post`` and
+                is not retried.
+            pool_size (int): Maximum number of kept-alive connections.
+            timeout (float): Connect and read timeout in seconds.
+            retries (int): Number of retries for connection errors and
+                ``RETRY_STATUSES`` responses. Read errors are not retried: the
+                server may already have stored the records.
+            backoff_factor (float): Base delay for exponential backoff between retries.
+            compress (bool): Send gzip-compressed request bodies.
+            credentials (tuple, optional): Basic auth ``(username, password)``.
+        """
+        self.url = url
+        self.timeout = timeout
+        self.compress = compress
+        self.credentials = credentials
+        self.headers = {"Content-Type": "application/json"}
+        if compress:
+            self.headers["Content-Encoding"] = "gzip"
+
+        self._session = None
+        if pooled:
+            retry = Retry(
+                total=retries,
+                read=0,
+                backoff_factor=backoff_factor,
+                status_forcelist=RETRY_STATUSES,
+                allowed_methods=frozenset({"POST"}),
+                raise_on_status=False,
+            )
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+            self._session = requests.Session()
+            self._session.mount("http://", adapter)
+            self._session.mount("https://", adapter)
+            self._session.headers.update(self.headers)
+            self._session.auth = credentials
+
+    def encode(self, payload):
+        """
+        Serializes a payload into the request body.
+
+        Args:
+            payload (dict | list[dict]): Log entry or batch of entries.
+
+        Returns:
+            bytes: JSON body, gzip-compressed if compression is enabled.
+        """
+        body = json.dumps(payload, separators=(",", ":")).encode()
+        if self.compress:
+            body = gzip.compress(body, compresslevel=5)
+        return body
+
+    def post(self, payload):
+        """
+        Sends a payload to the logging server.
+
+        Args:
+            payload (dict | list[dict]): Log entry or batch of entries.
+
+        Returns:
+            requests.Response: Server response.
+
+        Raises:
+            requests.RequestException: If the request fails or the server
+                answers with an error status.
+        """
+        body = self.encode(payload)
+        if self._session is not None:
+            response = self._session.post(self.url, data=body, timeout=self.timeout)
+        else:
+            response = requests.post(
+                self.url, data=body, headers=self.headers, auth=self.credentials, timeout=self.timeout
+            )
+        response.raise_for_status()
+        return response
+
+    def close(self):
+        """
+        Closes the pooled connections.
+        """
+        if self._session is not None:
+            self._session.close()